@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Rasterized Asset Cache for the Video Generators
+Rasterizes each SVG or photo once per size and keeps the RGBA pixels
+
+Every video needs the logo, the dime and two diamonds at specific pixel
+sizes. Rasterizing an SVG (cairosvg) or LANCZOS-resizing the dime photo
+for each of ~1,200 videos repeats the same work over and over, so results
+are cached at two levels:
+
+1. In memory, per process (an LRU of PIL images)
+2. On disk as .npy RGBA arrays under .cache/assets (or
+   CARATCOMPARE_CACHE_DIR), shared by batch workers and later runs
+
+Entries are keyed on the source file's content hash plus the target size
+and tint, so editing an SVG invalidates its sprites automatically. Returned
+images are shared between callers; treat them as read-only.
+"""
+
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = Path(os.environ.get('CARATCOMPARE_CACHE_DIR', PROJECT_ROOT / '.cache')) / 'assets'
+ASSET_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=None)
+def _content_hash(path, mtime_ns, size):
+    """sha256 of a file; mtime and size in the key re-hash files that change"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_hash(path):
+    """sha256 of a source asset, hashed once per process unless the file changes"""
+    stat = os.stat(path)
+    return _content_hash(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _tint(image, color):
+    """Multiply the RGB channels by `color` (hex or RGB tuple), keeping alpha"""
+    if isinstance(color, str):
+        color = tuple(int(color.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4))
+    rgba = np.asarray(image, dtype=np.float32)
+    rgba[..., :3] *= np.array(color[:3], dtype=np.float32) / 255.0
+    return Image.fromarray(np.round(rgba).astype(np.uint8), 'RGBA')
+
+
+def _rasterize_svg(path, size):
+    import cairosvg
+    png_data = cairosvg.svg2png(url=str(path), output_width=size[0], output_height=size[1])
+    return Image.open(BytesIO(png_data)).convert('RGBA')
+
+
+def _thumbnail(path, size):
+    image = Image.open(path).convert('RGBA')
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+    return image
+
+
+RASTERIZERS = {
+    'svg': _rasterize_svg,
+    'thumbnail': _thumbnail,
+}
+
+
+def _disk_path(kind, digest, size, tint):
+    key = hashlib.sha256(f"{kind}|{digest}|{size[0]}x{size[1]}|{tint}".encode()).hexdigest()
+    return CACHE_DIR / f"{kind}-{key[:32]}.npy"
+
+
+def _save(path, image):
+    """Write atomically so parallel workers never read a half-written file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, np.asarray(image))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+@lru_cache(maxsize=ASSET_CACHE_SIZE)
+def _load(kind, source, digest, size, tint):
+    disk_path = _disk_path(kind, digest, size, tint)
+    try:
+        return Image.fromarray(np.load(disk_path), 'RGBA')
+    except (OSError, ValueError):
+        pass  # missing or unreadable: rasterize again
+
+    image = RASTERIZERS[kind](source, size)
+    if tint is not None:
+        image = _tint(image, tint)
+    try:
+        _save(disk_path, image)
+    except OSError as e:
+        print(f"⚠ Could not write asset cache {disk_path}: {e}")
+    return image
+
+
+def cached_asset(kind, source, size, tint=None):
+    """Cached RGBA image produced by RASTERIZERS[kind](source, size), optionally tinted"""
+    size = (int(size[0]), int(size[1]))
+    return _load(kind, str(source), content_hash(source), size, tint)
+
+
+def rasterize_svg(svg_path, size, tint=None):
+    """SVG rendered at exactly `size` pixels"""
+    return cached_asset('svg', svg_path, size, tint)
+
+
+def load_image(image_path, size, tint=None):
+    """Photo scaled down to fit within `size`, keeping its aspect ratio"""
+    return cached_asset('thumbnail', image_path, size, tint)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Parallel Batch Renderer
+Spreads comparison videos across a process pool
+
+MoviePy's `threads=` only parallelizes the x264 encode; frame generation
+runs on one Python thread. For a batch, every core gets its own worker
+process rendering whole videos, and the encoder threads are split between
+them so the machine isn't oversubscribed.
+
+Usage (from a generator script):
+    from batch_render import run_batch, warm_worker
+
+    progress = run_batch(render_job, comparisons, workers=8, warmup=warm_worker)
+
+`render_job(job, threads=..., quiet=...)` must be a module-level function
+that renders one comparison and returns its slug; `quiet` asks it to skip
+MoviePy's progress bar when several workers share the terminal. Exceptions
+are caught and reported per job; the batch keeps going.
+
+Jobs that need network inputs first (narration) can pass `prefetch`, an
+async function awaited for each job on an event loop in the parent: jobs
+are prefetched concurrently and queued for the render workers as soon as
+their inputs are ready, so downloads overlap rendering.
+
+For several render nodes, `run_queue` pulls jobs from a shared WorkQueue
+(see work_queue.py) instead of a list, holding a lease on each job it
+renders and renewing it until the job finishes.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from functools import partial
+
+
+def default_workers():
+    """One worker per core"""
+    return os.cpu_count() or 1
+
+
+def encoder_threads(workers):
+    """x264 threads per worker so that workers * threads ~= cores"""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+class Progress:
+    """Aggregates results from the workers into one progress log"""
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.failed = []
+        self.started = time.time()
+
+    def update(self, name, ok, seconds, error=None):
+        """Record one finished job and print a progress line"""
+        self.done += 1
+        if not ok:
+            self.failed.append((name, error))
+
+        elapsed = time.time() - self.started
+        eta = elapsed / self.done * (self.total - self.done)
+        mark = '✓' if ok else '✗'
+        line = f"{mark} [{self.done}/{self.total}] {name} ({seconds:.1f}s) - ETA {eta / 60:.1f} min"
+        if error:
+            line += f" - {error}"
+        print(line, flush=True)
+
+    def summary(self):
+        """Print totals for the batch"""
+        elapsed = time.time() - self.started
+        succeeded = self.done - len(self.failed)
+        print("\n" + "=" * 60)
+        print(f"✓ Completed: {succeeded}/{self.total} videos in {elapsed / 60:.1f} min")
+        if self.done:
+            print(f"   {elapsed / self.done:.1f}s per video (wall clock)")
+        for name, error in self.failed:
+            print(f"✗ Failed: {name} - {error}")
+        print("=" * 60)
+
+
+def _timed(fn, job):
+    """Run one job in a worker; never raises so the pool keeps going"""
+    started = time.time()
+    try:
+        name = fn(job)
+        return name, True, time.time() - started, None
+    except Exception as e:
+        return str(job), False, time.time() - started, str(e)
+
+
+async def _render_queue(fn, jobs, workers, prefetch, progress, pool):
+    """Prefetch every job concurrently; render each one as soon as its prefetch completes"""
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Queue()
+
+    async def fetch(job):
+        started = time.time()
+        try:
+            await prefetch(job)
+        except Exception as e:
+            progress.update(str(job), False, time.time() - started, f"prefetch failed: {e}")
+            return
+        await ready.put(job)
+
+    async def render():
+        while True:
+            job = await ready.get()
+            if job is None:
+                return
+            progress.update(*await loop.run_in_executor(pool, _timed, fn, job))
+
+    renderers = [asyncio.create_task(render()) for _ in range(workers)]
+    await asyncio.gather(*(fetch(job) for job in jobs))
+    for _ in renderers:
+        await ready.put(None)
+    await asyncio.gather(*renderers)
+
+
+def run_batch(render_job, jobs, workers=None, warmup=None, warmup_args=(), prefetch=None):
+    """
+    Render jobs across a process pool
+
+    Args:
+        render_job: Module-level function `render_job(job, threads=n, quiet=bool)`
+        jobs: List of picklable job descriptions
+        workers: Worker processes (default: one per core)
+        warmup: Optional per-worker initializer (preload fonts/assets)
+        warmup_args: Arguments for `warmup`
+        prefetch: Optional `async prefetch(job)` run in this process before a job is rendered
+
+    Returns:
+        Progress with the totals and failed jobs
+    """
+    jobs = list(jobs)
+    workers = min(workers or default_workers(), max(1, len(jobs)))
+    threads = encoder_threads(workers)
+    fn = partial(render_job, threads=threads, quiet=workers > 1)
+    progress = Progress(len(jobs))
+
+    print(f"Rendering {len(jobs)} videos on {workers} workers ({threads} encoder threads each)\n")
+
+    if prefetch is not None:
+        if workers == 1:
+            # Render on a thread so the event loop keeps prefetching meanwhile
+            if warmup:
+                warmup(*warmup_args)
+            pool = ThreadPoolExecutor(max_workers=1)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=warmup, initargs=warmup_args)
+        with pool:
+            asyncio.run(_render_queue(fn, jobs, workers, prefetch, progress, pool))
+    elif workers == 1:
+        if warmup:
+            warmup(*warmup_args)
+        for job in jobs:
+            progress.update(*_timed(fn, job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=warmup,
+                                 initargs=warmup_args) as pool:
+            futures = [pool.submit(_timed, fn, job) for job in jobs]
+            for future in as_completed(futures):
+                progress.update(*future.result())
+
+    progress.summary()
+    return progress
+
+
+def run_queue(render_job, queue, workers=None, warmup=None, warmup_args=(), poll=5.0):
+    """
+    Render jobs claimed from a shared WorkQueue until none are left
+
+    Keeps up to `workers` leased jobs rendering and heartbeats their leases
+    every lease_seconds / 3. When the queue has nothing to claim but other
+    nodes still hold leases, it waits and reclaims any that expire. Jobs
+    come back from the queue as lists and are passed to `render_job` as tuples.
+
+    Returns:
+        Progress for the jobs this node rendered
+    """
+    workers = workers or default_workers()
+    threads = encoder_threads(workers)
+    fn = partial(render_job, threads=threads, quiet=workers > 1)
+    progress = Progress(queue.remaining())
+    interval = queue.lease_seconds / 3
+
+    print(f"Node {queue.node}: {progress.total} jobs left in the queue, "
+          f"{workers} workers ({threads} encoder threads each)\n")
+
+    running = {}  # future -> queue key
+    with ProcessPoolExecutor(max_workers=workers, initializer=warmup, initargs=warmup_args) as pool:
+        while True:
+            while len(running) < workers:
+                claimed = queue.claim()
+                if claimed is None:
+                    break
+                key, job = claimed
+                running[pool.submit(_timed, fn, tuple(job))] = key
+
+            if not running:
+                expiry = queue.next_expiry()
+                if expiry is None:
+                    break  # nothing pending and nothing leased elsewhere
+                # Another node is still working; wake up to reclaim its jobs if it dies
+                time.sleep(min(max(expiry - time.time(), 0) + 0.1, poll))
+                continue
+
+            done, _ = wait(running, timeout=interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = running.pop(future)
+                name, ok, seconds, error = future.result()
+                if ok:
+                    queue.complete(key)
+                else:
+                    queue.fail(key, error)
+                if progress.done >= progress.total:
+                    progress.total += 1  # reclaimed or retried jobs beyond the initial count
+                progress.update(name, ok, seconds, error)
+            queue.heartbeat(running.values())
+
+    progress.summary()
+    return progress
+
+
+def warm_worker(font_sizes=()):
+    """Default per-worker warmup: resolve fonts and load the common sizes"""
+    from fonts import preload
+    preload(font_sizes)
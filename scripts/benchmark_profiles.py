@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Encoder Profile Benchmark
+Measures encode speed and file size of each encoder profile on the pilot comparisons
+
+Every pilot comparison from generate_videos.py is rendered once per
+profile (plus x264's defaults at preset medium, the writer's behaviour
+without a profile) into a temporary directory, so nothing lands in
+generated_videos/. Frame generation is identical across profiles, so the
+differences in frames per second come from the encoder.
+
+Usage:
+    python3 scripts/benchmark_profiles.py
+    python3 scripts/benchmark_profiles.py --limit 5 --profiles draft batch
+"""
+
+import argparse
+import io
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from moviepy import VideoFileClip
+
+from fonts import preload
+from generate_videos import PILOT_COMPARISONS, generate_comparison_video, video_slug
+from video_writer import DEFAULT_BACKEND, PROFILES
+
+BASELINE = 'default'
+
+
+def measure(comparison, profile, work_dir, backend, threads):
+    """Render one comparison with one profile; returns (seconds, frames, bytes)"""
+    output_path = Path(work_dir) / f"{video_slug(*comparison)}-{profile}.mp4"
+    started = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        generate_comparison_video(*comparison, output_path, threads=threads, logger=None,
+                                  backend=backend, profile=None if profile == BASELINE else profile)
+    seconds = time.perf_counter() - started
+
+    clip = VideoFileClip(str(output_path))
+    frames = clip.n_frames
+    clip.close()
+    size = output_path.stat().st_size
+    output_path.unlink()
+    return seconds, frames, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the encoder profiles")
+    parser.add_argument('--limit', type=int, default=None,
+                        help="Only render the first N pilot comparisons")
+    parser.add_argument('--profiles', nargs='+', choices=[BASELINE, *PROFILES],
+                        default=[BASELINE, *PROFILES], help="Profiles to compare (default: all)")
+    parser.add_argument('--threads', type=int, default=None,
+                        help="x264 threads (default: let ffmpeg decide)")
+    parser.add_argument('--backend', default=DEFAULT_BACKEND, help="Video writer (default: %(default)s)")
+    args = parser.parse_args()
+
+    comparisons = PILOT_COMPARISONS[:args.limit]
+    totals = {profile: [0.0, 0, 0] for profile in args.profiles}
+    preload()
+
+    print(f"Benchmarking {len(comparisons)} pilot comparisons ({args.backend} writer)\n")
+    print(f"{'comparison':<32}" + ''.join(f"{profile:>20}" for profile in args.profiles))
+
+    with tempfile.TemporaryDirectory(prefix='profile_bench_') as work_dir:
+        for comparison in comparisons:
+            row = ''
+            for profile in args.profiles:
+                seconds, frames, size = measure(comparison, profile, work_dir, args.backend, args.threads)
+                total = totals[profile]
+                total[0] += seconds
+                total[1] += frames
+                total[2] += size
+                row += f"{frames / seconds:>9.1f}fps {size / 1024:>6.0f}KB"
+            print(f"{video_slug(*comparison):<32}{row}", flush=True)
+
+    print("-" * (32 + 20 * len(args.profiles)))
+    print(f"{'total':<32}" + ''.join(f"{frames / seconds:>9.1f}fps {size / 1024:>6.0f}KB"
+                                     for seconds, frames, size in totals.values()))
+
+    print("\nPer profile:")
+    for profile, (seconds, frames, size) in totals.items():
+        settings = PROFILES.get(profile)
+        described = (f"preset={settings.preset} crf={settings.crf} tune={settings.tune} "
+                     f"keyframes={settings.keyframe_interval}s {settings.pix_fmt}"
+                     if settings else "preset=medium, x264 defaults")
+        print(f"   {profile:<8} {frames / seconds:6.1f} fps, {size / max(1, len(comparisons)) / 1024:6.0f}KB "
+              f"per video  ({described})")
+
+
+if __name__ == '__main__':
+    main()
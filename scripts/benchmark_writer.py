@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Video Writer Benchmark
+Times the MoviePy and direct ffmpeg backends on the pilot comparisons
+
+Every pilot comparison from generate_videos.py is rendered once per
+backend into a temporary directory (nothing lands in generated_videos/).
+Both backends get identical timelines, presets and encoder threads, so the
+difference is the cost of getting frames into ffmpeg. x264 dominates at
+the default 'medium' preset; `--preset ultrafast` makes the writer
+overhead easier to see.
+
+Usage:
+    python3 scripts/benchmark_writer.py
+    python3 scripts/benchmark_writer.py --limit 5 --preset ultrafast
+"""
+
+import argparse
+import io
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from fonts import preload
+from generate_videos import PILOT_COMPARISONS, generate_comparison_video, video_slug
+from video_writer import BACKENDS
+
+
+def time_render(comparison, backend, work_dir, preset, threads):
+    """Render one comparison with one backend; returns the wall-clock seconds"""
+    output_path = Path(work_dir) / f"{video_slug(*comparison)}-{backend}.mp4"
+    started = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        generate_comparison_video(*comparison, output_path, threads=threads, logger=None,
+                                  backend=backend, preset=preset)
+    seconds = time.perf_counter() - started
+    output_path.unlink()
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the video writer backends")
+    parser.add_argument('--limit', type=int, default=None,
+                        help="Only render the first N pilot comparisons")
+    parser.add_argument('--preset', default='medium', help="x264 preset (default: %(default)s)")
+    parser.add_argument('--threads', type=int, default=None,
+                        help="x264 threads (default: let ffmpeg decide)")
+    args = parser.parse_args()
+
+    comparisons = PILOT_COMPARISONS[:args.limit]
+    totals = {backend: 0.0 for backend in BACKENDS}
+    preload()
+
+    print(f"Benchmarking {len(comparisons)} pilot comparisons (preset={args.preset})\n")
+    print(f"{'comparison':<32}" + ''.join(f"{backend:>12}" for backend in BACKENDS) + f"{'speedup':>10}")
+
+    with tempfile.TemporaryDirectory(prefix='writer_bench_') as work_dir:
+        for comparison in comparisons:
+            row = {}
+            for backend in BACKENDS:
+                seconds = time_render(comparison, backend, work_dir, args.preset, args.threads)
+                row[backend] = seconds
+                totals[backend] += seconds
+            speedup = row['moviepy'] / row['ffmpeg']
+            print(f"{video_slug(*comparison):<32}"
+                  + ''.join(f"{row[backend]:>11.2f}s" for backend in BACKENDS)
+                  + f"{speedup:>9.2f}x", flush=True)
+
+    print("-" * (32 + 12 * len(BACKENDS) + 10))
+    print(f"{'total':<32}" + ''.join(f"{totals[backend]:>11.2f}s" for backend in BACKENDS)
+          + f"{totals['moviepy'] / totals['ffmpeg']:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Comparison Catalog
+The site's comparison pages, in the same priority order as the sitemap
+
+Mirrors generateAllComparisonSlugs() in lib/generateStaticParams.ts, so
+the video batches cover exactly the comparisons that have a page on
+caratcompare.co. Comparisons are produced lazily, tier by tier, with
+duplicates dropped and the same 1,200 cap:
+
+    Tier 1 (0.9)  round vs round at popular carats, round vs every shape at the same carat
+    Tier 2 (0.8)  every shape pair at a popular carat, then adjacent popular carats
+    Tier 3 (0.7)  elongated shapes against each other
+    Tier 4 (0.7)  milestone carats across every shape
+
+Keep the lists below in sync with lib/urlHelpers.ts and
+lib/generateStaticParams.ts.
+
+Usage:
+    for entry in catalog():
+        render(entry.comparison)        # (carat1, shape1, carat2, shape2)
+
+    python3 scripts/catalog.py --limit 20           # print slugs in priority order
+    python3 scripts/catalog.py --shard 2/4 --count  # how many comparisons shard 2 of 4 gets
+"""
+
+import argparse
+from collections import namedtuple
+from itertools import islice
+
+# lib/urlHelpers.ts
+VALID_SHAPES = ['round', 'princess', 'cushion', 'emerald', 'asscher', 'oval', 'pear', 'marquise', 'radiant', 'heart']
+VALID_CARATS = [0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0, 2.25, 2.5, 2.75, 3.0, 3.25, 3.5, 3.75, 4.0]
+
+# lib/generateStaticParams.ts
+POPULAR_CARATS = [0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0, 2.5, 3.0]
+ELONGATED_SHAPES = ['oval', 'pear', 'emerald', 'marquise', 'radiant']
+ELONGATED_CARATS = [0.75, 1.0, 1.25, 1.5, 2.0, 2.5, 3.0]
+MILESTONE_CARATS = [1.0, 1.5, 2.0, 2.5, 3.0, 4.0]
+CATALOG_LIMIT = 1200
+
+# One comparison page; `comparison` is the tuple the video generators take
+CatalogEntry = namedtuple('CatalogEntry', 'slug comparison tier priority')
+
+
+def format_carat(carat):
+    """Carat as it appears in site URLs (1.0 -> 1, 0.50 -> 0.5)"""
+    if carat % 1 == 0:
+        return str(int(carat))
+    return f"{carat:.2f}".rstrip('0')
+
+
+def comparison_slug(carat1, shape1, carat2, shape2):
+    """Site URL slug, e.g. 0.5-round-vs-1-oval (generateComparisonSlug)"""
+    return f"{format_carat(carat1)}-{shape1}-vs-{format_carat(carat2)}-{shape2}"
+
+
+def should_include(carat1, shape1, carat2, shape2):
+    """Each pair once: smaller carat first, or alphabetical shapes at equal carats"""
+    return carat1 < carat2 or (carat1 == carat2 and shape1 < shape2)
+
+
+def _round_comparisons():
+    for c1 in POPULAR_CARATS:
+        for c2 in POPULAR_CARATS:
+            if should_include(c1, 'round', c2, 'round'):
+                yield c1, 'round', c2, 'round'
+        for shape in VALID_SHAPES:
+            if shape != 'round':
+                yield c1, 'round', c1, shape
+
+
+def _cross_shape_comparisons():
+    for c in POPULAR_CARATS:
+        for s1 in VALID_SHAPES:
+            for s2 in VALID_SHAPES:
+                if should_include(c, s1, c, s2):
+                    yield c, s1, c, s2
+
+    # Adjacent carat comparisons
+    for c1, c2 in zip(POPULAR_CARATS, POPULAR_CARATS[1:]):
+        for s1 in VALID_SHAPES:
+            for s2 in VALID_SHAPES:
+                if s1 != s2:
+                    yield c1, s1, c2, s2
+
+
+def _elongated_comparisons():
+    for c in ELONGATED_CARATS:
+        for s1 in ELONGATED_SHAPES:
+            for s2 in ELONGATED_SHAPES:
+                if should_include(c, s1, c, s2):
+                    yield c, s1, c, s2
+
+
+def _milestone_comparisons():
+    for c1 in MILESTONE_CARATS:
+        for c2 in MILESTONE_CARATS:
+            for s1 in VALID_SHAPES:
+                for s2 in VALID_SHAPES:
+                    if should_include(c1, s1, c2, s2) and not (c1 == c2 and s1 == s2):
+                        yield c1, s1, c2, s2
+
+
+# (tier, sitemap priority, comparisons) in the order the site lists them
+TIERS = [
+    (1, 0.9, _round_comparisons),
+    (2, 0.8, _cross_shape_comparisons),
+    (3, 0.7, _elongated_comparisons),
+    (4, 0.7, _milestone_comparisons),
+]
+
+
+def catalog(limit=CATALOG_LIMIT, max_tier=None):
+    """
+    Lazily yield every comparison page in priority order
+
+    Args:
+        limit: Stop after this many comparisons (the site builds 1,200; None for all)
+        max_tier: Only yield tiers up to and including this one
+
+    Yields:
+        CatalogEntry(slug, comparison, tier, priority); duplicates of an
+        earlier slug are skipped, as in generateAllComparisonSlugs()
+    """
+    seen = set()
+    for tier, priority, comparisons in TIERS:
+        if max_tier is not None and tier > max_tier:
+            return
+        for comparison in comparisons():
+            if limit is not None and len(seen) >= limit:
+                return
+            slug = comparison_slug(*comparison)
+            if slug in seen:
+                continue
+            seen.add(slug)
+            yield CatalogEntry(slug, comparison, tier, priority)
+
+
+def comparison_slugs(limit=CATALOG_LIMIT):
+    """All comparison slugs, identical to generateAllComparisonSlugs()"""
+    return [entry.slug for entry in catalog(limit)]
+
+
+def parse_shard(spec):
+    """'i/N' (1-based) -> (index, count)"""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {spec!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {index} is outside 1..{count}")
+    return index, count
+
+
+def shard(entries, index, count):
+    """Every `count`-th entry starting at `index` (1-based), so each shard gets a mix of tiers"""
+    return islice(entries, index - 1, None, count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the site's comparison pages in priority order")
+    parser.add_argument('--limit', type=int, default=CATALOG_LIMIT,
+                        help="Number of comparisons (default: %(default)s, as on the site)")
+    parser.add_argument('--tier', type=int, default=None, help="Only tiers up to this one")
+    parser.add_argument('--shard', type=parse_shard, default=None, metavar='i/N',
+                        help="Only this shard's share of the catalog")
+    parser.add_argument('--count', action='store_true', help="Print counts per tier instead of slugs")
+    args = parser.parse_args()
+
+    entries = catalog(args.limit, args.tier)
+    if args.shard:
+        entries = shard(entries, *args.shard)
+
+    if args.count:
+        counts = {}
+        for entry in entries:
+            counts[entry.tier] = counts.get(entry.tier, 0) + 1
+        for tier, count in counts.items():
+            print(f"Tier {tier}: {count}")
+        print(f"Total: {sum(counts.values())}")
+    else:
+        for entry in entries:
+            print(entry.slug)
+
+
+if __name__ == '__main__':
+    main()
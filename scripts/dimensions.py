@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Diamond Dimensions for the Video Generators
+Compiles data/diamond-sizes.json into one NumPy table, loaded once
+
+The table is indexed [shape, carat, (width, height)] in millimetres. Carats
+between table rows are interpolated linearly; shapes the table doesn't know
+and carats outside its range raise ValueError instead of quietly drawing a
+5mm stone.
+
+Usage:
+    from dimensions import get_dimensions, lookup_dimensions
+
+    width_mm, height_mm = get_dimensions(1.0, 'round')
+    mm = lookup_dimensions([1.0, 1.1, 2.0], ['round', 'oval', 'heart'])  # (3, 2) array
+"""
+
+import json
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+DATA_FILE = Path(__file__).parent.parent / 'data' / 'diamond-sizes.json'
+
+SizeTable = namedtuple('SizeTable', 'shapes carats mm')
+
+
+@lru_cache(maxsize=None)
+def load_table():
+    """Parse diamond-sizes.json into a SizeTable (shape names, carat grid, mm array)"""
+    with open(DATA_FILE, 'r') as f:
+        data = json.load(f)
+
+    shapes = tuple(data)
+    carats = sorted(float(key) for key in data[shapes[0]])
+    keys = [f"{carat:.2f}" for carat in carats]
+
+    mm = np.empty((len(shapes), len(carats), 2), dtype=np.float64)
+    for s, shape in enumerate(shapes):
+        rows = data[shape]
+        if sorted(rows) != sorted(keys):
+            raise ValueError(f"{DATA_FILE.name}: '{shape}' doesn't use the same carat rows as '{shapes[0]}'")
+        for c, key in enumerate(keys):
+            mm[s, c] = rows[key]['width'], rows[key]['height']
+
+    carats = np.array(carats)
+    carats.setflags(write=False)
+    mm.setflags(write=False)
+    return SizeTable(shapes, carats, mm)
+
+
+@lru_cache(maxsize=None)
+def _shape_index():
+    return {shape: i for i, shape in enumerate(load_table().shapes)}
+
+
+def shape_indices(shapes):
+    """Table rows for one or many shape names"""
+    index = _shape_index()
+    names = np.atleast_1d(np.asarray(shapes, dtype=str))
+    try:
+        return np.array([index[name.lower()] for name in names.ravel()]).reshape(names.shape)
+    except KeyError as e:
+        raise ValueError(f"Unknown diamond shape: {e.args[0]} "
+                         f"(expected one of {', '.join(load_table().shapes)})") from None
+
+
+def lookup_dimensions(carats, shapes):
+    """
+    Width and height in mm for many (carat, shape) pairs at once
+
+    Args:
+        carats: Carat weights (scalar or array)
+        shapes: Shape names, one per carat or a single name for all
+
+    Returns:
+        Array of shape (..., 2) holding (width, height) per pair
+    """
+    table = load_table()
+    carats, rows = np.broadcast_arrays(np.atleast_1d(np.asarray(carats, dtype=np.float64)),
+                                       shape_indices(shapes))
+
+    low, high = table.carats[0], table.carats[-1]
+    if carats.min() < low or carats.max() > high:
+        raise ValueError(f"Carat weight out of range: sizes are known from {low:g}ct to {high:g}ct")
+
+    # Fractional position on the carat grid, then blend the two neighbouring rows
+    position = np.interp(carats, table.carats, np.arange(len(table.carats)))
+    below = np.floor(position).astype(np.intp)
+    above = np.minimum(below + 1, len(table.carats) - 1)
+    weight = (position - below)[..., None]
+
+    return table.mm[rows, below] * (1 - weight) + table.mm[rows, above] * weight
+
+
+def get_dimensions(carat, shape):
+    """Get diamond (width, height) in mm"""
+    width, height = lookup_dimensions(carat, shape)[0]
+    return float(width), float(height)
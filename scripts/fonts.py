@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Font Registry for the Video Generators
+Resolves font files once per process and keeps loaded faces per size
+
+The generators ask for a logical face ('regular', 'bold', 'helvetica')
+instead of a hard-coded macOS path. Each face has an ordered list of
+candidate files; the first one found wins:
+
+1. Absolute paths (macOS system fonts)
+2. File names found in the search directories - CARATCOMPARE_FONT_DIR,
+   the project's assets/fonts folder (empty unless you add fonts), then
+   the usual fontconfig locations
+3. `fc-match`, when fontconfig is installed
+4. Pillow's built-in font
+
+Resolution happens once (on first use or via preload()), so a frame never
+pays for a failed filesystem lookup.
+"""
+
+import os
+import shutil
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import ImageFont
+
+PROJECT_ROOT = Path(__file__).parent.parent
+LOCAL_FONT_DIR = PROJECT_ROOT / 'assets' / 'fonts'  # no fonts ship here; drop .ttf files in to use them
+
+FONT_DIRS = [
+    LOCAL_FONT_DIR,
+    Path.home() / '.local' / 'share' / 'fonts',
+    Path.home() / '.fonts',
+    Path('/usr/local/share/fonts'),
+    Path('/usr/share/fonts'),
+    Path('/Library/Fonts'),
+    Path('/System/Library/Fonts'),
+    Path('C:/Windows/Fonts'),
+]
+
+FACES = {
+    'regular': {
+        'paths': [
+            '/System/Library/Fonts/Supplemental/Arial.ttf',
+            '/Library/Fonts/Arial.ttf',
+        ],
+        'files': [
+            'Arial.ttf', 'arial.ttf', 'LiberationSans-Regular.ttf', 'Arimo-Regular.ttf',
+            'DejaVuSans.ttf', 'NotoSans-Regular.ttf', 'FreeSans.ttf',
+        ],
+        'fontconfig': 'Arial',
+    },
+    'bold': {
+        'paths': [
+            '/System/Library/Fonts/Supplemental/Arial Bold.ttf',
+            '/Library/Fonts/Arial Bold.ttf',
+        ],
+        'files': [
+            'Arial Bold.ttf', 'Arial_Bold.ttf', 'arialbd.ttf', 'LiberationSans-Bold.ttf',
+            'Arimo-Bold.ttf', 'DejaVuSans-Bold.ttf', 'NotoSans-Bold.ttf', 'FreeSansBold.ttf',
+        ],
+        'fontconfig': 'Arial:bold',
+    },
+    'helvetica': {
+        'paths': [
+            '/System/Library/Fonts/Helvetica.ttc',
+        ],
+        'files': [
+            'Helvetica.ttc', 'Helvetica.ttf', 'Arial.ttf', 'arial.ttf', 'LiberationSans-Regular.ttf',
+            'Arimo-Regular.ttf', 'DejaVuSans.ttf', 'NotoSans-Regular.ttf', 'FreeSans.ttf',
+        ],
+        'fontconfig': 'Helvetica',
+    },
+}
+
+
+def _search_dirs():
+    dirs = []
+    if os.getenv('CARATCOMPARE_FONT_DIR'):
+        dirs.append(Path(os.environ['CARATCOMPARE_FONT_DIR']))
+    return dirs + FONT_DIRS
+
+
+@lru_cache(maxsize=1)
+def _font_index():
+    """Map font file name -> path for every font in the search directories"""
+    index = {}
+    for directory in _search_dirs():
+        if not directory.is_dir():
+            continue
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.lower().endswith(('.ttf', '.ttc', '.otf')):
+                    index.setdefault(name, os.path.join(root, name))
+    return index
+
+
+def _fc_match(pattern):
+    """Ask fontconfig for the best match, or None"""
+    if not shutil.which('fc-match'):
+        return None
+    try:
+        result = subprocess.run(['fc-match', '-f', '%{file}', pattern],
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    path = result.stdout.strip()
+    return path if path and os.path.isfile(path) else None
+
+
+@lru_cache(maxsize=None)
+def font_path(face):
+    """Resolve a logical face to a font file, or None for Pillow's built-in font"""
+    spec = FACES[face]
+
+    for path in spec['paths']:
+        if os.path.isfile(path):
+            return path
+
+    index = _font_index()
+    for name in spec['files']:
+        if name in index:
+            return index[name]
+
+    return _fc_match(spec['fontconfig'])
+
+
+@lru_cache(maxsize=128)
+def get_font(face, size):
+    """Loaded FreeTypeFont for (face, size), shared by every caller"""
+    path = font_path(face)
+    if path:
+        return ImageFont.truetype(path, size)
+
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow < 10.1 has no scalable built-in font
+        return ImageFont.load_default()
+
+
+def preload(sizes=(), faces=None):
+    """Resolve every face up front and optionally load the given sizes"""
+    for face in faces or FACES:
+        path = font_path(face)
+        for size in sizes:
+            get_font(face, size)
+        if path is None:
+            print(f"⚠ No font file found for '{face}', using Pillow's built-in font")
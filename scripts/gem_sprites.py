@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Gem Sprite Factory for the Video Generators
+Draws each procedural diamond once per (style, shape, size, color)
+
+The generators draw their diamonds in code: a stack of translucent
+ellipses, facet lines and a highlight. The same 10 shapes x 16 carats x 2
+colors come up again and again across a batch, so sprites are memoized
+here instead of being redrawn for every video.
+
+Styles (one per generator look):
+    'brilliant'  generate_final_video.py - glow, layered body, facets, highlight
+    'gem'        generate_videos_v2.py - lighter three-layer gem
+    'faceted'    generate_premium_video.py - brilliant with star facets and
+                 table for round, plus heart and oval cuts
+    'simple'     generate_premium_video_elevenlabs.py - brilliant for round,
+                 layered circle for everything else
+
+Shapes a style doesn't draw specially share one cache entry, so a
+shape-agnostic style caches one sprite per size and color. Returned images
+are shared; treat them as read-only.
+
+Usage:
+    diamond = gem_sprite('brilliant', 'round', 120, CYAN)
+    pregenerate('gem', px_per_mm=270 / 17.9, colors=(CYAN, MAGENTA), measure='max')
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from dimensions import load_table, lookup_dimensions
+
+GEM_CACHE_SIZE = 1024
+
+
+def hex_to_rgb(hex_color):
+    """Convert hex color to RGB tuple"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def heart_outline(center, radius, points=360):
+    """Heart polygon around `center` as a flat [x0, y0, x1, y1, ...] list"""
+    angle = np.radians(np.arange(points))
+    x = 16 * np.sin(angle) ** 3
+    y = -(13 * np.cos(angle) - 5 * np.cos(2 * angle) - 2 * np.cos(3 * angle) - np.cos(4 * angle))
+    scale = radius / 20
+    return np.column_stack((center + x * scale, center + y * scale)).ravel().tolist()
+
+
+def _layered_body(draw, size_px, rgb):
+    """Outer glow plus ten ellipses fading towards the centre"""
+    for i in range(5, 0, -1):
+        alpha = 30 + (i * 10)
+        offset = 5 - i
+        draw.ellipse([offset, offset, size_px-offset, size_px-offset],
+                     fill=tuple(list(rgb) + [alpha]))
+
+    for i in range(10):
+        offset = i * (size_px // 40)
+        alpha = 255 - (i * 15)
+        draw.ellipse([offset, offset, size_px-offset, size_px-offset],
+                     fill=tuple(list(rgb) + [alpha]))
+
+
+def _highlight(draw, size_px):
+    h_size = size_px // 5
+    h_pos = size_px // 4
+    draw.ellipse([h_pos, h_pos, h_pos + h_size, h_pos + h_size],
+                 fill=(255, 255, 255, 200))
+
+
+def _draw_brilliant(draw, size_px, rgb):
+    center = size_px // 2
+    _layered_body(draw, size_px, rgb)
+
+    facets = [
+        [(center, 0), (center, size_px)],
+        [(0, center), (size_px, center)],
+        [(0, 0), (size_px, size_px)],
+        [(size_px, 0), (0, size_px)],
+    ]
+    for line in facets:
+        draw.line(line, fill=(255, 255, 255, 60), width=2)
+
+    _highlight(draw, size_px)
+
+
+def _draw_star_brilliant(draw, size_px, rgb):
+    center = size_px // 2
+    _layered_body(draw, size_px, rgb)
+
+    # Brilliant cut facets
+    facet_lines = [
+        [(center, 0), (center, size_px)],  # Vertical
+        [(0, center), (size_px, center)],  # Horizontal
+        [(0, 0), (size_px, size_px)],      # Diagonal 1
+        [(size_px, 0), (0, size_px)],      # Diagonal 2
+        [(center, 0), (0, center)],        # Star facets
+        [(center, 0), (size_px, center)],
+        [(center, size_px), (0, center)],
+        [(center, size_px), (size_px, center)],
+    ]
+    for line in facet_lines:
+        draw.line(line, fill=(255, 255, 255, 60), width=2)
+
+    # Table (top flat surface)
+    table_size = size_px // 3
+    table_offset = (size_px - table_size) // 2
+    draw.ellipse([table_offset, table_offset,
+                  table_offset + table_size, table_offset + table_size],
+                 fill=(255, 255, 255, 100))
+
+    _highlight(draw, size_px)
+
+
+def _draw_heart(draw, size_px, rgb):
+    center = size_px // 2
+    points = heart_outline(center, size_px // 2)
+    draw.polygon(points, fill=tuple(list(rgb) + [200]))
+    draw.polygon(points, outline=tuple(list(rgb) + [255]), width=3)
+
+    # Sparkle
+    draw.ellipse([center-10, center-20, center+10, center],
+                 fill=(255, 255, 255, 180))
+
+
+def _draw_oval(draw, size_px, rgb):
+    center = size_px // 2
+    width_ratio = 0.7
+    w = int(size_px * width_ratio)
+    offset_x = (size_px - w) // 2
+
+    for i in range(5):
+        offset = i * 2
+        alpha = 255 - (i * 30)
+        draw.ellipse([offset_x + offset, offset,
+                      size_px - offset_x - offset, size_px - offset],
+                     fill=tuple(list(rgb) + [alpha]))
+
+    # Facet lines
+    draw.line([(center, 0), (center, size_px)],
+              fill=(255, 255, 255, 80), width=2)
+    draw.line([(offset_x, center), (size_px - offset_x, center)],
+              fill=(255, 255, 255, 80), width=2)
+
+
+def _draw_circle(draw, size_px, rgb):
+    for i in range(5):
+        offset = i * 3
+        alpha = 255 - (i * 30)
+        draw.ellipse([offset, offset, size_px-offset, size_px-offset],
+                     fill=tuple(list(rgb) + [alpha]))
+
+
+def _draw_gem(draw, size_px, rgb):
+    center = size_px // 2
+
+    # Outer glow
+    draw.ellipse([2, 2, size_px-2, size_px-2], fill=tuple(list(rgb) + [60]))
+
+    # Main gem body with gradient effect
+    for i in range(3):
+        offset = i * 2
+        alpha = 255 - (i * 30)
+        draw.ellipse([offset, offset, size_px-offset, size_px-offset],
+                     fill=tuple(list(rgb) + [alpha]))
+
+    # Facet lines for sparkle
+    draw.line([(0, center), (size_px, center)], fill=(255, 255, 255, 100), width=2)
+    draw.line([(center, 0), (center, size_px)], fill=(255, 255, 255, 100), width=2)
+    draw.line([(0, 0), (size_px, size_px)], fill=(255, 255, 255, 80), width=1)
+    draw.line([(0, size_px), (size_px, 0)], fill=(255, 255, 255, 80), width=1)
+
+    # Highlight spot for shine
+    highlight_size = size_px // 4
+    highlight_pos = size_px // 3
+    draw.ellipse([highlight_pos, highlight_pos,
+                  highlight_pos + highlight_size, highlight_pos + highlight_size],
+                 fill=(255, 255, 255, 180))
+
+
+# style -> {shape: drawing function}; the None entry covers every other shape
+STYLES = {
+    'brilliant': {None: _draw_brilliant},
+    'gem': {None: _draw_gem},
+    'faceted': {'round': _draw_star_brilliant, 'heart': _draw_heart, 'oval': _draw_oval,
+                None: _draw_circle},
+    'simple': {'round': _draw_brilliant, None: _draw_circle},
+}
+
+
+@lru_cache(maxsize=GEM_CACHE_SIZE)
+def _render(style, variant, size_px, color):
+    img = Image.new('RGBA', (size_px, size_px), (0, 0, 0, 0))
+    STYLES[style][variant](ImageDraw.Draw(img), size_px, hex_to_rgb(color))
+    return img
+
+
+def gem_sprite(style, shape, size_px, color):
+    """Procedural diamond sprite, drawn once per distinct (style, shape, size, color)"""
+    try:
+        shapes = STYLES[style]
+    except KeyError:
+        raise ValueError(f"Unknown gem style: {style} (expected one of {', '.join(STYLES)})") from None
+    shape = shape.lower() if shape else None
+    variant = shape if shape in shapes else None
+    return _render(style, variant, int(size_px), color)
+
+
+def atlas_sizes(px_per_mm, measure='width'):
+    """
+    Pixel size of every table shape at every table carat
+
+    Args:
+        px_per_mm: Scale the generator draws at (dime pixels / 17.9mm)
+        measure: 'width' or 'max' (larger of width and height), as the generator sizes gems
+
+    Returns:
+        Dict of shape -> array of pixel sizes, one per table carat
+    """
+    table = load_table()
+    shapes = np.repeat(table.shapes, len(table.carats))
+    carats = np.tile(table.carats, len(table.shapes))
+    mm = lookup_dimensions(carats, shapes)
+    extent = mm[:, 0] if measure == 'width' else mm.max(axis=1)
+    sizes = (extent * px_per_mm).astype(int).reshape(len(table.shapes), len(table.carats))
+    return dict(zip(table.shapes, sizes))
+
+
+def pregenerate(style, px_per_mm, colors, measure='width'):
+    """Draw the full shape x carat x color atlas for a style; returns the number of entries"""
+    drawn = set()
+    for shape, sizes in atlas_sizes(px_per_mm, measure).items():
+        for size_px in sizes:
+            for color in colors:
+                gem_sprite(style, shape, size_px, color)
+                drawn.add((shape, int(size_px), color))
+    return len(drawn)
@@ -3,39 +3,75 @@
 Final Diamond Comparison Video Generator
 Professional layout for YouTube Shorts & TikTok
 
-Timeline:
+Timeline (intro and outro last as long as their narration):
 - 0-3s: Logo fade in/out
-- 3-10s: Text + narration intro
-- 10-16s: Dime + diamonds appear vertically with measurements
-- 16-20s: Outro + CTA
+- Text + narration intro
+- 5s: Dime + diamonds appear vertically with measurements
+- Outro + CTA narration
 
 Usage:
     ELEVENLABS_API_KEY="your_key" python3 scripts/generate_final_video.py 1.0 princess 2.0 heart
+    ELEVENLABS_API_KEY="your_key" python3 scripts/generate_final_video.py --batch comparisons.txt
+    ELEVENLABS_API_KEY="your_key" python3 scripts/generate_final_video.py --catalog --limit 100
 """
 
 import os
 import sys
-import json
-import numpy as np
+from functools import partial
 from pathlib import Path
-from moviepy import VideoClip, AudioFileClip, ImageClip
-from PIL import Image, ImageDraw, ImageFont
-from elevenlabs import VoiceSettings
-from elevenlabs.client import ElevenLabs
-import tempfile
+from PIL import Image, ImageDraw
+
+from asset_cache import load_image
+from dimensions import get_dimensions
+from fonts import get_font, preload
+from gem_sprites import gem_sprite
+from batch_render import run_batch, run_queue, warm_worker
+from catalog import CATALOG_LIMIT, catalog, parse_shard, shard
+from job_manifest import Manifest, atomic_output, file_digest, input_hash
+from narration_cache import SENTENCE_GAP, WORD_GAP, ElevenLabsEngine, NarrationCache, engine_from_env, wav_duration
+from narration_prefetch import NarrationPrefetcher
+from scene_schedule import Cue, schedule
+from text_render import render_text
+from scene_engine import Scene, Timeline, fade, ramp
+from segment_render import render_segments, render_timeline
+from video_writer import BACKENDS, DEFAULT_BACKEND, PROFILES, write_video
+from work_queue import WorkQueue
 
 # Configuration
 PROJECT_ROOT = Path(__file__).parent.parent
 OUTPUT_DIR = PROJECT_ROOT / 'generated_videos'
-DATA_FILE = PROJECT_ROOT / 'data' / 'diamond-sizes.json'
 DIME_IMAGE = PROJECT_ROOT / 'us-dime.png'
 LOGO_SVG = PROJECT_ROOT / 'public' / 'svg' / 'Logo 3.svg'
+MANIFEST_PATH = OUTPUT_DIR / 'render_manifest.jsonl'
+
+# Bump when the layout, timing or on-screen text changes, so --batch re-renders every video
+TEMPLATE_VERSION = 1
+
+# Narration - Rachel voice, professional & trustworthy
+NARRATOR = ElevenLabsEngine(
+    voice_id="21m00Tcm4TlvDq8ikWAM",  # Rachel
+    model_id="eleven_turbo_v2_5",
+    voice_settings={
+        'stability': 0.6,  # More stable for professional sound
+        'similarity_boost': 0.8,
+        'style': 0.0,
+        'use_speaker_boost': True,
+    },
+)
+OUTRO_SCRIPT = "To see more diamond size and shape comparisons, visit caratcompare.co, or check the description for links to high-quality diamond outlets."
 
 # Video settings
 WIDTH = 1080
 HEIGHT = 1920
 FPS = 30
 
+# Scene timing (seconds): narrated scenes last exactly as long as their narration
+LOGO_DURATION = 3  # Logo fade in/out
+COMPARISON_HOLD = 5  # Diamonds build in over 1.5s, then hold
+TEXT_FADE = 1.5  # Intro/outro text fade-in; the shortest a narrated scene can be
+NARRATION_LEAD = 0.3  # Text starts fading in before the voice
+NARRATION_TAIL = 0.5  # Pause after the voice before the next scene
+
 # Brand colors
 CYAN = '#07F4FF'
 MAGENTA = '#FA06FF'
@@ -48,63 +84,10 @@ def hex_to_rgb(hex_color):
     hex_color = hex_color.lstrip('#')
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
-def load_diamond_data():
-    """Load diamond dimensions from JSON"""
-    with open(DATA_FILE, 'r') as f:
-        return json.load(f)
-
-def get_dimensions(carat, shape, data):
-    """Get diamond dimensions in mm"""
-    carat_key = f"{carat:.2f}"
-    shape_data = data.get(shape.lower(), {})
-    dims = shape_data.get(carat_key, {"width": 5.0, "height": 5.0})
-    return dims['width'], dims['height']
-
-def create_diamond_graphic(size_px, color):
-    """Create professional diamond graphic"""
-    img = Image.new('RGBA', (size_px, size_px), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    center = size_px // 2
-    rgb = hex_to_rgb(color)
-
-    # Outer glow
-    for i in range(5, 0, -1):
-        alpha = 30 + (i * 10)
-        offset = 5 - i
-        draw.ellipse([offset, offset, size_px-offset, size_px-offset],
-                    fill=tuple(list(rgb) + [alpha]))
-
-    # Main body with layers
-    for i in range(10):
-        offset = i * (size_px // 40)
-        alpha = 255 - (i * 15)
-        draw.ellipse([offset, offset, size_px-offset, size_px-offset],
-                    fill=tuple(list(rgb) + [alpha]))
-
-    # Facet lines
-    facets = [
-        [(center, 0), (center, size_px)],
-        [(0, center), (size_px, center)],
-        [(0, 0), (size_px, size_px)],
-        [(size_px, 0), (0, size_px)],
-    ]
-    for line in facets:
-        draw.line(line, fill=(255, 255, 255, 60), width=2)
-
-    # Highlight
-    h_size = size_px // 5
-    h_pos = size_px // 4
-    draw.ellipse([h_pos, h_pos, h_pos + h_size, h_pos + h_size],
-                fill=(255, 255, 255, 200))
-
-    return img
-
 def load_dime(target_px):
     """Load real dime photo"""
     try:
-        dime = Image.open(DIME_IMAGE).convert('RGBA')
-        dime.thumbnail((target_px, target_px), Image.Resampling.LANCZOS)
-        return dime
+        return load_image(DIME_IMAGE, (target_px, target_px))
     except:
         # Fallback
         img = Image.new('RGBA', (target_px, target_px), (0, 0, 0, 0))
@@ -113,58 +96,10 @@ def load_dime(target_px):
         return img
 
 def create_text_layer(text, font_size, color=WHITE, y_position=100, bold=True, max_width=None):
-    """Create text overlay with optional wrapping"""
-    img = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-
-    try:
-        font_name = "/System/Library/Fonts/Supplemental/Arial Bold.ttf" if bold else "/System/Library/Fonts/Supplemental/Arial.ttf"
-        font = ImageFont.truetype(font_name, font_size)
-    except:
-        font = ImageFont.load_default()
-
-    # Word wrap if needed
-    if max_width:
-        words = text.split()
-        lines = []
-        current_line = []
-
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            if bbox[2] - bbox[0] <= max_width:
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                current_line = [word]
-        if current_line:
-            lines.append(' '.join(current_line))
-
-        # Draw multi-line text
-        y = y_position
-        for line in lines:
-            bbox = draw.textbbox((0, 0), line, font=font)
-            text_width = bbox[2] - bbox[0]
-            x = (WIDTH - text_width) // 2
-
-            # Shadow
-            draw.text((x + 3, y + 3), line, fill=(0, 0, 0, 200), font=font)
-            # Main text
-            draw.text((x, y), line, fill=hex_to_rgb(color) + (255,), font=font)
-            y += font_size + 10
-    else:
-        # Single line
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        x = (WIDTH - text_width) // 2
-
-        # Shadow
-        draw.text((x + 3, y_position + 3), text, fill=(0, 0, 0, 200), font=font)
-        # Main text
-        draw.text((x, y_position), text, fill=hex_to_rgb(color) + (255,), font=font)
-
-    return img
+    """Create centred text with shadow and optional wrapping; returns (sprite, paste position)"""
+    sprite, (dx, dy) = render_text(text, 'bold' if bold else 'regular', font_size, color,
+                                   max_width=max_width, shadow_offset=3)
+    return sprite, (WIDTH // 2 + dx, y_position + dy)
 
 def load_logo_as_image(target_height=200):
     """Load and convert SVG logo to PNG"""
@@ -173,10 +108,7 @@ def load_logo_as_image(target_height=200):
     img = Image.new('RGBA', (600, target_height), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
 
-    try:
-        font = ImageFont.truetype("/System/Library/Fonts/Supplemental/Arial Bold.ttf", 80)
-    except:
-        font = ImageFont.load_default()
+    font = get_font('bold', 80)
 
     text = "CARAT COMPARE"
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -194,275 +126,238 @@ def load_logo_as_image(target_height=200):
 
     return img
 
-def generate_narration(carat1, shape1, carat2, shape2):
-    """Generate professional voiceover using ElevenLabs"""
-
-    api_key = os.getenv('ELEVENLABS_API_KEY')
-    if not api_key:
-        print("❌ ERROR: ELEVENLABS_API_KEY not set!")
-        sys.exit(1)
-
-    # Script
+def narration_segments(carat1, shape1, carat2, shape2):
+    """Templated narration segments: (text, pause after) pairs, or text for a sentence"""
     shape1_text = f"{shape1} cut" if shape1.lower() not in ['round', 'heart'] else f"{shape1} shaped" if shape1.lower() == 'heart' else shape1
     shape2_text = f"{shape2} cut" if shape2.lower() not in ['round', 'heart'] else f"{shape2} shaped" if shape2.lower() == 'heart' else shape2
 
-    intro = f"Let's compare the size of a {carat1} carat {shape1_text} diamond to the size of a {carat2} carat {shape2_text} diamond. We'll use a US dime for the size comparison."
-    outro = "To see more diamond size and shape comparisons, visit caratcompare.co, or check the description for links to high-quality diamond outlets."
+    # Fixed phrases are shared by every video and each diamond phrase by
+    # every video that features it, so only unseen phrases hit the API
+    return [
+        ("Let's compare the size of", WORD_GAP),
+        (f"a {carat1} carat {shape1_text} diamond", WORD_GAP),
+        ("to the size of", WORD_GAP),
+        (f"a {carat2} carat {shape2_text} diamond", SENTENCE_GAP),
+        "We'll use a US dime for the size comparison.",
+        OUTRO_SCRIPT,
+    ]
+
+def generate_narration(carat1, shape1, carat2, shape2):
+    """Generate professional voiceover using ElevenLabs (each phrase synthesized once, then cached)"""
 
-    full_script = intro + " " + outro
+    # Script
+    segments = narration_segments(carat1, shape1, carat2, shape2)
+    compare, diamond1, to, diamond2, dime, outro = [s if isinstance(s, str) else s[0] for s in segments]
+    intro = f"{compare} {diamond1} {to} {diamond2}. {dime}"
 
     print(f"   Script: '{intro}'")
-    print(f"   Characters: {len(full_script)}")
-
-    client = ElevenLabs(api_key=api_key)
+    print(f"   Characters: {len(intro) + 1 + len(outro)}")
+
+    # One cue per scene: logo, intro text, comparison, outro
+    cues = [
+        Cue(minimum=LOGO_DURATION),
+        Cue(segments[:5], minimum=TEXT_FADE, lead=NARRATION_LEAD, tail=NARRATION_TAIL),
+        Cue(minimum=COMPARISON_HOLD),
+        Cue(segments[5:], minimum=TEXT_FADE, lead=NARRATION_LEAD, tail=NARRATION_TAIL),
+    ]
 
+    cache = NarrationCache(engine_from_env(NARRATOR))
     try:
-        # Using Rachel voice - professional & trustworthy
-        audio_generator = client.text_to_speech.convert(
-            voice_id="21m00Tcm4TlvDq8ikWAM",  # Rachel
-            text=full_script,
-            model_id="eleven_turbo_v2_5",
-            voice_settings=VoiceSettings(
-                stability=0.6,  # More stable for professional sound
-                similarity_boost=0.8,
-                style=0.0,
-                use_speaker_boost=True,
-            ),
-        )
-
-        temp_audio = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-        for chunk in audio_generator:
-            if chunk:
-                temp_audio.write(chunk)
-        temp_audio.close()
-
-        return temp_audio.name, intro, outro
-
+        plan = schedule(cache, cues, FPS)
     except Exception as e:
-        print(f"❌ ElevenLabs Error: {e}")
-        sys.exit(1)
+        # Raised, not exited: in --batch and --queue this runs in a pool worker
+        raise RuntimeError(f"ElevenLabs error: {e}") from e
 
-def generate_video(carat1, shape1, carat2, shape2, output_path):
-    """Generate final professional video"""
+    print(f"   Narration cache: {cache.hits} cached, {cache.misses} synthesized")
+    return plan, intro, outro
 
-    print(f"\n{'='*60}")
-    print(f"Generating Professional Video")
-    print(f"{carat1}ct {shape1.upper()} vs {carat2}ct {shape2.upper()}")
-    print(f"{'='*60}\n")
+def build_timeline(carat1, shape1, carat2, shape2, intro_duration=7, comparison_duration=COMPARISON_HOLD,
+                   outro_duration=5, verbose=False):
+    """Build the scene timeline for one comparison (video only)"""
 
-    try:
-        # Load data
-        diamond_data = load_diamond_data()
-        width1_mm, _ = get_dimensions(carat1, shape1, diamond_data)
-        width2_mm, _ = get_dimensions(carat2, shape2, diamond_data)
-
-        # Sizing - VERTICAL LAYOUT
-        DIME_MM = 17.9
-        DIME_PX = 280
-        SCALE = DIME_PX / DIME_MM
-        diamond1_px = int(width1_mm * SCALE)
-        diamond2_px = int(width2_mm * SCALE)
+    # Look up dimensions
+    width1_mm, _ = get_dimensions(carat1, shape1)
+    width2_mm, _ = get_dimensions(carat2, shape2)
+
+    # Sizing - VERTICAL LAYOUT
+    DIME_MM = 17.9
+    DIME_PX = 280
+    SCALE = DIME_PX / DIME_MM
+    diamond1_px = int(width1_mm * SCALE)
+    diamond2_px = int(width2_mm * SCALE)
 
+    if verbose:
         print(f"📐 Vertical Layout:")
         print(f"   Diamond 1: {width1_mm:.1f}mm → {diamond1_px}px (TOP)")
         print(f"   Dime: {DIME_MM}mm → {DIME_PX}px (MIDDLE)")
         print(f"   Diamond 2: {width2_mm:.1f}mm → {diamond2_px}px (BOTTOM)\n")
-
-        # Create assets
         print("🎨 Creating assets...")
-        logo = load_logo_as_image(200)
-        dime = load_dime(DIME_PX)
-        diamond1 = create_diamond_graphic(diamond1_px, CYAN)
-        diamond2 = create_diamond_graphic(diamond2_px, MAGENTA)
 
-        bg_black = Image.new('RGB', (WIDTH, HEIGHT), hex_to_rgb(BLACK))
-        bg_dark = Image.new('RGB', (WIDTH, HEIGHT), hex_to_rgb(BACKGROUND))
+    # Create assets
+    logo = load_logo_as_image(200)
+    dime = load_dime(DIME_PX)
+    diamond1 = gem_sprite('brilliant', shape1, diamond1_px, CYAN)
+    diamond2 = gem_sprite('brilliant', shape2, diamond2_px, MAGENTA)
+
+    bg_black = Image.new('RGB', (WIDTH, HEIGHT), hex_to_rgb(BLACK))
+    bg_dark = Image.new('RGB', (WIDTH, HEIGHT), hex_to_rgb(BACKGROUND))
+
+    # Timeline (scene lengths come from the narration schedule):
+    # Logo fade in/out
+    # Intro text + narration
+    # Visual comparison
+    # Outro text + narration
+
+    # LOGO INTRO (black background)
+    logo_scene = Scene(bg_black, duration=LOGO_DURATION, shared=True)
+    logo_scene.add(logo, ((WIDTH - logo.width) // 2, (HEIGHT - logo.height) // 2),
+                   opacity=fade(0, 1, out_at=2))
+
+    # INTRO TEXT + NARRATION
+    intro_scene = Scene(bg_dark, duration=intro_duration)
+    intro_fade = ramp(0, 1.5)
+
+    # Wrap text for readability
+    shape1_text = f"{shape1} cut" if shape1.lower() not in ['round', 'heart'] else f"{shape1} shaped" if shape1.lower() == 'heart' else shape1
+    shape2_text = f"{shape2} cut" if shape2.lower() not in ['round', 'heart'] else f"{shape2} shaped" if shape2.lower() == 'heart' else shape2
+
+    text = create_text_layer(
+        f"Let's compare the size of a {carat1} carat {shape1_text} diamond to a {carat2} carat {shape2_text} diamond.",
+        50, WHITE, HEIGHT//2 - 150, bold=False, max_width=WIDTH - 100
+    )
+    text2 = create_text_layer(
+        "We'll use a US dime for the size comparison.",
+        45, WHITE, HEIGHT//2 + 100, bold=False
+    )
+    intro_scene.add(*text, opacity=intro_fade)
+    intro_scene.add(*text2, opacity=intro_fade)
+
+    # VISUAL COMPARISON (vertical layout)
+    # Elements fade in one after another over the first 1.5s
+    comparison_scene = Scene(bg_dark, duration=comparison_duration)
+
+    # Vertical positions
+    y_center = HEIGHT // 2
+    spacing = 320
+
+    # Dime in center
+    dime_x = (WIDTH - dime.width) // 2
+    dime_y = y_center - (dime.height // 2)
+
+    # Diamond 1 above
+    d1_y = dime_y - spacing - (diamond1.height // 2)
+    d1_x = (WIDTH - diamond1.width) // 2
+
+    # Diamond 2 below
+    d2_y = dime_y + dime.height + spacing - (diamond2.height // 2)
+    d2_x = (WIDTH - diamond2.width) // 2
+
+    # Dime
+    comparison_scene.add(dime, (dime_x, dime_y), opacity=ramp(0.3, 0.45))
+
+    # Dime label
+    label_dime = create_text_layer("US DIME", 35, WHITE, dime_y + dime.height + 20)
+    label_dime_mm = create_text_layer("17.9mm", 40, WHITE, dime_y + dime.height + 70, bold=True)
+    comparison_scene.add(*label_dime, start=0.75)
+    comparison_scene.add(*label_dime_mm, start=0.75)
+
+    # Diamond 1 (above)
+    d1_fade = ramp(0.75, 0.45)
+    comparison_scene.add(diamond1, (d1_x, d1_y), opacity=d1_fade)
+    for layer in [
+        create_text_layer(f"{carat1:.1f}ct", 55, CYAN, d1_y - 100),
+        create_text_layer(shape1.upper(), 40, CYAN, d1_y - 40),
+        create_text_layer(f"{width1_mm:.1f}mm", 35, WHITE, d1_y + diamond1.height + 10),
+    ]:
+        comparison_scene.add(*layer, opacity=d1_fade)
+
+    # Diamond 2 (below)
+    d2_fade = ramp(1.05, 0.45)
+    comparison_scene.add(diamond2, (d2_x, d2_y), opacity=d2_fade)
+    for layer in [
+        create_text_layer(f"{carat2:.1f}ct", 55, MAGENTA, d2_y - 100),
+        create_text_layer(shape2.upper(), 40, MAGENTA, d2_y - 40),
+        create_text_layer(f"{width2_mm:.1f}mm", 35, WHITE, d2_y + diamond2.height + 10),
+    ]:
+        comparison_scene.add(*layer, opacity=d2_fade)
+
+    # OUTRO
+    outro_scene = Scene(bg_dark, duration=outro_duration, shared=True)
+    outro_fade = ramp(0, 1.5)
+    for layer in [
+        create_text_layer("See more comparisons at", 50, WHITE, HEIGHT//2 - 120),
+        create_text_layer("caratcompare.co", 70, CYAN, HEIGHT//2 - 20, bold=True),
+        create_text_layer("Check description for", 45, WHITE, HEIGHT//2 + 80),
+        create_text_layer("high-quality diamond outlets", 45, WHITE, HEIGHT//2 + 140),
+    ]:
+        outro_scene.add(*layer, opacity=outro_fade)
+
+    return Timeline([logo_scene, intro_scene, comparison_scene, outro_scene], FPS)
+
+def generate_video(carat1, shape1, carat2, shape2, output_path, workers=1, backend=DEFAULT_BACKEND,
+                   threads=None, logger='bar', profile=None, templates=False):
+    """
+    Generate final professional video, rendering scenes on `workers` processes
+
+    With `templates`, the logo and outro segments are encoded once and
+    reused from the template cache (see segment_render.py).
+    """
 
+    print(f"\n{'='*60}")
+    print(f"Generating Professional Video")
+    print(f"{carat1}ct {shape1.upper()} vs {carat2}ct {shape2.upper()}")
+    print(f"{'='*60}\n")
+
+    try:
         # Generate narration
         print("🎙️  Generating narration...")
-        audio_path, intro_text, outro_text = generate_narration(carat1, shape1, carat2, shape2)
-        narration = AudioFileClip(audio_path)
-
-        # Calculate timing
-        intro_duration = 7  # Text + narration intro
-        comparison_duration = 6  # Visual comparison
-        outro_duration = 5  # Outro text
-        total_duration = 3 + intro_duration + comparison_duration + outro_duration
-
-        print(f"   Audio length: {narration.duration:.1f}s")
-        print(f"   Video length: {total_duration}s\n")
-
-        def make_frame(t):
-            """Generate frame at time t"""
-
-            # Timeline:
-            # 0-3s: Logo fade in/out
-            # 3-10s: Intro text + narration
-            # 10-16s: Visual comparison
-            # 16-21s: Outro text
-
-            if t < 3:
-                # LOGO INTRO (black background)
-                frame_pil = bg_black.copy()
-
-                if t < 1:
-                    # Fade in
-                    alpha = int((t / 1) * 255)
-                elif t < 2:
-                    # Hold
-                    alpha = 255
-                else:
-                    # Fade out
-                    alpha = int((1 - (t - 2)) * 255)
-
-                # Center logo
-                logo_copy = logo.copy()
-                logo_copy.putalpha(alpha)
-                logo_x = (WIDTH - logo.width) // 2
-                logo_y = (HEIGHT - logo.height) // 2
-
-                frame_pil.paste(logo_copy, (logo_x, logo_y), logo_copy)
-                return np.array(frame_pil)
-
-            elif t < 3 + intro_duration:
-                # INTRO TEXT + NARRATION
-                frame_pil = bg_dark.copy()
-                progress = (t - 3) / 1.5
-                alpha = min(255, int(progress * 255))
-
-                # Wrap text for readability
-                shape1_text = f"{shape1} cut" if shape1.lower() not in ['round', 'heart'] else f"{shape1} shaped" if shape1.lower() == 'heart' else shape1
-                shape2_text = f"{shape2} cut" if shape2.lower() not in ['round', 'heart'] else f"{shape2} shaped" if shape2.lower() == 'heart' else shape2
-
-                text = create_text_layer(
-                    f"Let's compare the size of a {carat1} carat {shape1_text} diamond to a {carat2} carat {shape2_text} diamond.",
-                    50, WHITE, HEIGHT//2 - 150, bold=False, max_width=WIDTH - 100
-                )
-                text2 = create_text_layer(
-                    "We'll use a US dime for the size comparison.",
-                    45, WHITE, HEIGHT//2 + 100, bold=False
-                )
-
-                text.putalpha(alpha)
-                text2.putalpha(alpha)
-
-                frame_pil.paste(text, (0, 0), text)
-                frame_pil.paste(text2, (0, 0), text2)
-                return np.array(frame_pil)
-
-            elif t < 3 + intro_duration + comparison_duration:
-                # VISUAL COMPARISON (vertical layout)
-                frame_pil = bg_dark.copy()
-
-                progress = (t - (3 + intro_duration)) / 1.5
-                alpha = min(255, int(progress * 255))
-
-                # Vertical positions
-                y_center = HEIGHT // 2
-                spacing = 320
-
-                # Dime in center
-                dime_x = (WIDTH - dime.width) // 2
-                dime_y = y_center - (dime.height // 2)
-
-                # Diamond 1 above
-                d1_y = dime_y - spacing - (diamond1.height // 2)
-                d1_x = (WIDTH - diamond1.width) // 2
-
-                # Diamond 2 below
-                d2_y = dime_y + dime.height + spacing - (diamond2.height // 2)
-                d2_x = (WIDTH - diamond2.width) // 2
-
-                # Paste dime
-                if progress > 0.2:
-                    dime_alpha = min(255, int((progress - 0.2) / 0.3 * 255))
-                    dime_copy = dime.copy()
-                    dime_copy.putalpha(dime_alpha)
-                    frame_pil.paste(dime_copy, (dime_x, dime_y), dime_copy)
-
-                    # Dime label
-                    if progress > 0.5:
-                        label_dime = create_text_layer("US DIME", 35, WHITE, dime_y + dime.height + 20)
-                        label_dime_mm = create_text_layer("17.9mm", 40, WHITE, dime_y + dime.height + 70, bold=True)
-                        label_dime.putalpha(dime_alpha)
-                        label_dime_mm.putalpha(dime_alpha)
-                        frame_pil.paste(label_dime, (0, 0), label_dime)
-                        frame_pil.paste(label_dime_mm, (0, 0), label_dime_mm)
-
-                # Paste diamond 1 (above)
-                if progress > 0.5:
-                    d1_alpha = min(255, int((progress - 0.5) / 0.3 * 255))
-                    d1_copy = diamond1.copy()
-                    d1_copy.putalpha(d1_alpha)
-                    frame_pil.paste(d1_copy, (d1_x, d1_y), d1_copy)
-
-                    # Labels
-                    label1 = create_text_layer(f"{carat1:.1f}ct", 55, CYAN, d1_y - 100)
-                    label1_shape = create_text_layer(shape1.upper(), 40, CYAN, d1_y - 40)
-                    label1_mm = create_text_layer(f"{width1_mm:.1f}mm", 35, WHITE, d1_y + diamond1.height + 10)
-                    label1.putalpha(d1_alpha)
-                    label1_shape.putalpha(d1_alpha)
-                    label1_mm.putalpha(d1_alpha)
-                    frame_pil.paste(label1, (0, 0), label1)
-                    frame_pil.paste(label1_shape, (0, 0), label1_shape)
-                    frame_pil.paste(label1_mm, (0, 0), label1_mm)
-
-                # Paste diamond 2 (below)
-                if progress > 0.7:
-                    d2_alpha = min(255, int((progress - 0.7) / 0.3 * 255))
-                    d2_copy = diamond2.copy()
-                    d2_copy.putalpha(d2_alpha)
-                    frame_pil.paste(d2_copy, (d2_x, d2_y), d2_copy)
-
-                    # Labels
-                    label2 = create_text_layer(f"{carat2:.1f}ct", 55, MAGENTA, d2_y - 100)
-                    label2_shape = create_text_layer(shape2.upper(), 40, MAGENTA, d2_y - 40)
-                    label2_mm = create_text_layer(f"{width2_mm:.1f}mm", 35, WHITE, d2_y + diamond2.height + 10)
-                    label2.putalpha(d2_alpha)
-                    label2_shape.putalpha(d2_alpha)
-                    label2_mm.putalpha(d2_alpha)
-                    frame_pil.paste(label2, (0, 0), label2)
-                    frame_pil.paste(label2_shape, (0, 0), label2_shape)
-                    frame_pil.paste(label2_mm, (0, 0), label2_mm)
-
-                return np.array(frame_pil)
-
-            else:
-                # OUTRO
-                frame_pil = bg_dark.copy()
-                progress = (t - (3 + intro_duration + comparison_duration)) / 1.5
-                alpha = min(255, int(progress * 255))
-
-                cta1 = create_text_layer("See more comparisons at", 50, WHITE, HEIGHT//2 - 120)
-                cta2 = create_text_layer("caratcompare.co", 70, CYAN, HEIGHT//2 - 20, bold=True)
-                cta3 = create_text_layer("Check description for", 45, WHITE, HEIGHT//2 + 80)
-                cta4 = create_text_layer("high-quality diamond outlets", 45, WHITE, HEIGHT//2 + 140)
-
-                for layer in [cta1, cta2, cta3, cta4]:
-                    layer.putalpha(alpha)
-
-                for layer in [cta1, cta2, cta3, cta4]:
-                    frame_pil.paste(layer, (0, 0), layer)
-
-                return np.array(frame_pil)
+        plan, intro_text, outro_text = generate_narration(carat1, shape1, carat2, shape2)
+        audio_path = plan.audio_path
+
+        # Scene lengths follow the measured narration
+        _, intro_duration, comparison_duration, outro_duration = plan.durations
+        total_duration = plan.duration
+
+        print(f"   Audio length: {wav_duration(audio_path):.1f}s")
+        print(f"   Video length: {total_duration:.1f}s "
+              f"(logo {LOGO_DURATION}s, intro {intro_duration:.1f}s, "
+              f"comparison {comparison_duration:.1f}s, outro {outro_duration:.1f}s)\n")
+
+        timeline_args = (carat1, shape1, carat2, shape2, intro_duration, comparison_duration, outro_duration)
+        timeline = build_timeline(*timeline_args, verbose=True)
 
         # Render
         print("🎬 Rendering video...")
-        video = VideoClip(make_frame, duration=total_duration)
-        final_video = video.with_audio(narration)
-        final_video.write_videofile(
-            str(output_path),
-            fps=FPS,
-            codec='libx264',
-            audio_codec='aac',
-            preset='medium'
-        )
+        if workers > 1:
+            # One scene per worker, joined with stream copy
+            render_segments(build_timeline, timeline_args, output_path, FPS,
+                            audio_path=audio_path, workers=workers, backend=backend, profile=profile,
+                            templates=templates)
+        elif templates:
+            # Only the comparison-specific scenes are encoded
+            render_timeline(timeline, output_path, FPS, audio_path=audio_path, backend=backend,
+                            threads=threads, profile=profile)
+        else:
+            write_video(
+                timeline.make_frame,
+                timeline.duration,
+                output_path,
+                fps=FPS,
+                audio_path=audio_path,
+                backend=backend,
+                audio_codec='aac',
+                preset='medium',
+                threads=threads,
+                logger=logger,
+                profile=profile,
+                frame_key=timeline.frame_key
+            )
 
         os.unlink(audio_path)
 
         print(f"\n✅ SUCCESS!")
         print(f"📁 {output_path}")
-        print(f"⏱️  {total_duration}s")
+        print(f"⏱️  {total_duration:.1f}s")
         print(f"📏 {output_path.stat().st_size / 1024:.0f}KB\n")
 
         return True
@@ -473,27 +368,162 @@ def generate_video(carat1, shape1, carat2, shape2, output_path):
         traceback.print_exc()
         return False
 
-def main():
-    if len(sys.argv) != 5:
-        print("Usage: python3 generate_final_video.py <carat1> <shape1> <carat2> <shape2>")
-        print("Example: python3 generate_final_video.py 1.0 princess 2.0 heart")
-        sys.exit(1)
+def output_path_for(comparison):
+    """Where a comparison's video is written"""
+    carat1, shape1, carat2, shape2 = comparison
+    return OUTPUT_DIR / f"final_{carat1}-{shape1}-vs-{carat2}-{shape2}.mp4"
+
+def job_hash(comparison, backend=DEFAULT_BACKEND, profile=None):
+    """Hash of everything a comparison's video is made from, voice included"""
+    carat1, shape1, carat2, shape2 = comparison
+    engine = engine_from_env(NARRATOR)
+    return input_hash({
+        'dimensions': [get_dimensions(carat1, shape1), get_dimensions(carat2, shape2)],
+        'script': narration_segments(carat1, shape1, carat2, shape2),
+        'voice': {'engine': engine.name, 'params': engine.key()},
+        'template': TEMPLATE_VERSION,
+        'assets': {'dime': file_digest(DIME_IMAGE) if DIME_IMAGE.exists() else None},
+        'video': [WIDTH, HEIGHT, FPS],
+        'encoder': {'backend': backend, 'profile': profile},
+    })
+
+def render_comparison(comparison, threads=4, quiet=False, backend=DEFAULT_BACKEND, profile=None,
+                      templates=False):
+    """Render one comparison in a batch worker and record it in the manifest; returns its output filename"""
+    carat1, shape1, carat2, shape2 = comparison
+    output_path = output_path_for(comparison)
+    with atomic_output(output_path) as tmp_path:
+        if not generate_video(carat1, shape1, carat2, shape2, tmp_path, backend=backend,
+                              threads=threads, logger=None if quiet else 'bar', profile=profile,
+                              templates=templates):
+            raise RuntimeError(f"render failed: {output_path.name}")
+
+    Manifest(MANIFEST_PATH).record(output_path.stem, job_hash(comparison, backend, profile), [output_path])
+    return output_path.name
+
+def read_batch(path):
+    """Comparisons from a text file, one 'carat1 shape1 carat2 shape2' per line (# comments)"""
+    comparisons = []
+    with open(path) as f:
+        for line in f:
+            fields = line.split('#')[0].split()
+            if not fields:
+                continue
+            if len(fields) != 4:
+                raise ValueError(f"{path}: expected 'carat1 shape1 carat2 shape2', got {line.strip()!r}")
+            carat1, shape1, carat2, shape2 = fields
+            comparisons.append((float(carat1), shape1.lower(), float(carat2), shape2.lower()))
+    return comparisons
+
+def generate_batch(comparisons, workers=None, backend=DEFAULT_BACKEND, tts_concurrency=4, profile=None,
+                   templates=False, shard_spec=None, queue_path=None):
+    """
+    Render many comparisons, synthesizing narration ahead of the render workers
+
+    Several nodes sharing OUTPUT_DIR can split the work: `shard_spec`
+    (index, count) takes every count-th comparison, `queue_path` pulls
+    comparisons from a shared WorkQueue instead (narration is then
+    synthesized by each render through the cache rather than prefetched).
+    """
+    if shard_spec:
+        comparisons = list(shard(comparisons, *shard_spec))
+        print(f"Shard {shard_spec[0]}/{shard_spec[1]}: {len(comparisons)} comparisons")
+
+    # Skip videos already rendered from the same inputs
+    manifest = Manifest(MANIFEST_PATH)
+    if not (shard_spec or queue_path):
+        manifest.compact()  # only safe while no other node is appending
+    pending = []
+    for comparison in comparisons:
+        name = output_path_for(comparison).stem
+        comparison_hash = job_hash(comparison, backend, profile)
+        if manifest.is_current(name, comparison_hash):
+            print(f"⊘ Skipping (up to date): {name}")
+        else:
+            pending.append((f"{name}@{comparison_hash[:16]}", comparison))
+
+    render_job = partial(render_comparison, backend=backend, profile=profile, templates=templates)
+    if queue_path:
+        # Every node seeds the same jobs; keys already queued are left alone
+        queue = WorkQueue(queue_path)
+        queue.add(pending)
+        progress = run_queue(render_job, queue, workers=workers, warmup=warm_worker)
+        queue.close()
+        return progress
+
+    prefetcher = NarrationPrefetcher(engine_from_env(NARRATOR), concurrency=tts_concurrency)
+    progress = run_batch(render_job, [comparison for _, comparison in pending],
+                         workers=workers,
+                         warmup=warm_worker,
+                         prefetch=lambda job: prefetcher.prefetch(narration_segments(*job)))
+    print(prefetcher.summary())
+    return progress
 
-    carat1 = float(sys.argv[1])
-    shape1 = sys.argv[2].lower()
-    carat2 = float(sys.argv[3])
-    shape2 = sys.argv[4].lower()
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Generate one professional comparison video",
+        epilog="Example: python3 generate_final_video.py 1.0 princess 2.0 heart"
+    )
+    parser.add_argument('carat1', type=float, nargs='?')
+    parser.add_argument('shape1', nargs='?')
+    parser.add_argument('carat2', type=float, nargs='?')
+    parser.add_argument('shape2', nargs='?')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Render scenes in parallel processes (default: one per CPU core, 1 = in-process); "
+                             "with --batch or --catalog, videos rendered in parallel")
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="Video writer: direct ffmpeg pipe or MoviePy (default: %(default)s)")
+    parser.add_argument('--profile', choices=PROFILES, default=None,
+                        help="Encoder profile (default: x264 defaults at preset medium)")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="Render every comparison in FILE ('carat1 shape1 carat2 shape2' per line)")
+    parser.add_argument('--catalog', action='store_true',
+                        help="Render the site's comparison catalog in priority order")
+    parser.add_argument('--limit', type=int, default=CATALOG_LIMIT,
+                        help="With --catalog, only the first N comparisons (default: %(default)s)")
+    parser.add_argument('--shard', type=parse_shard, default=None, metavar='i/N',
+                        help="With --batch or --catalog, render only every N-th comparison, starting at the i-th")
+    parser.add_argument('--queue', metavar='DB',
+                        help="With --batch or --catalog, pull comparisons from a shared SQLite work queue")
+    parser.add_argument('--tts-concurrency', type=int, default=4,
+                        help="Narration requests in flight during --batch (default: %(default)s)")
+    parser.add_argument('--template', action='store_true',
+                        help="Reuse the pre-encoded logo and outro segments; only the comparison is rendered")
+    args = parser.parse_args()
+
+    if args.batch or args.catalog:
+        OUTPUT_DIR.mkdir(exist_ok=True)
+        if args.catalog:
+            comparisons = [entry.comparison for entry in catalog(args.limit)]
+        else:
+            comparisons = read_batch(args.batch)
+        progress = generate_batch(comparisons, workers=args.workers, backend=args.backend,
+                                  tts_concurrency=args.tts_concurrency, profile=args.profile,
+                                  templates=args.template, shard_spec=args.shard, queue_path=args.queue)
+        sys.exit(1 if progress.failed else 0)
+    if args.shape2 is None:
+        parser.error("give carat1 shape1 carat2 shape2, --batch FILE or --catalog")
+
+    carat1 = args.carat1
+    shape1 = args.shape1.lower()
+    carat2 = args.carat2
+    shape2 = args.shape2.lower()
 
     OUTPUT_DIR.mkdir(exist_ok=True)
+    preload()
     output_filename = f"final_{carat1}-{shape1}-vs-{carat2}-{shape2}.mp4"
     output_path = OUTPUT_DIR / output_filename
 
-    success = generate_video(carat1, shape1, carat2, shape2, output_path)
+    success = generate_video(carat1, shape1, carat2, shape2, output_path, workers=args.workers,
+                             backend=args.backend, profile=args.profile, templates=args.template)
 
-    if success:
-        print("=" * 60)
-        print("🎉 Professional video ready for YouTube Shorts & TikTok!")
-        print("=" * 60)
+    if not success:
+        sys.exit(1)
+    print("=" * 60)
+    print("🎉 Professional video ready for YouTube Shorts & TikTok!")
+    print("=" * 60)
 
 if __name__ == '__main__':
     main()
@@ -8,19 +8,27 @@ Requirements:
 """
 
 import os
-import json
-import numpy as np
+from functools import partial
 from pathlib import Path
-from moviepy import VideoClip, CompositeVideoClip
-from PIL import Image, ImageDraw, ImageFont
-import cairosvg
-from io import BytesIO
+from PIL import Image
+
+from asset_cache import rasterize_svg
+from batch_render import run_batch, run_queue, warm_worker
+from catalog import CATALOG_LIMIT, catalog, parse_shard, shard
+from dimensions import get_dimensions
+from fonts import preload
+from job_manifest import Manifest, atomic_output, file_digest, input_hash
+from metadata_engine import compact_metadata, display_carat, generate_batch, video_slug, write_metadata
+from text_render import render_text
+from scene_engine import Scene, Timeline, fade, ramp, slide
+from segment_render import render_timeline
+from video_writer import BACKENDS, DEFAULT_BACKEND, PROFILES, write_video
+from work_queue import WorkQueue
 
 # Configuration
 PROJECT_ROOT = Path(__file__).parent.parent
 OUTPUT_DIR = PROJECT_ROOT / 'generated_videos'
 ASSETS_DIR = PROJECT_ROOT / 'public'
-DATA_FILE = PROJECT_ROOT / 'data' / 'diamond-sizes.json'
 
 # Video settings
 WIDTH = 1080  # For YouTube Shorts (vertical)
@@ -28,62 +36,81 @@ HEIGHT = 1920
 FPS = 30
 DURATION = 20  # 20 seconds total
 
+# Bump when the layout, timing or fixed text changes, so the manifest re-renders every video
+TEMPLATE_VERSION = 1
+MANIFEST_PATH = OUTPUT_DIR / 'render_manifest.jsonl'
+METADATA_PATH = OUTPUT_DIR / 'metadata.jsonl'
+
 # Colors (matching your brand)
 CYAN = '#07F4FF'
 MAGENTA = '#FA06FF'
 BACKGROUND = '#252525'
 WHITE = '#FFFFFF'
 
-def load_diamond_data():
-    """Load diamond dimensions from JSON"""
-    with open(DATA_FILE, 'r') as f:
-        return json.load(f)
+# High-volume comparisons to test
+PILOT_COMPARISONS = [
+    # Popular round comparisons
+    (0.5, 'round', 1.0, 'round'),
+    (0.75, 'round', 1.0, 'round'),
+    (1.0, 'round', 1.5, 'round'),
+    (1.0, 'round', 2.0, 'round'),
+    (1.5, 'round', 2.0, 'round'),
+
+    # Shape comparisons (same carat)
+    (1.0, 'round', 1.0, 'oval'),
+    (1.0, 'round', 1.0, 'princess'),
+    (1.0, 'round', 1.0, 'cushion'),
+    (1.5, 'round', 1.5, 'oval'),
+    (2.0, 'round', 2.0, 'oval'),
+
+    # Popular fancy shapes
+    (1.0, 'oval', 1.5, 'oval'),
+    (1.0, 'oval', 2.0, 'oval'),
+    (1.0, 'cushion', 1.5, 'cushion'),
+    (1.0, 'princess', 1.5, 'princess'),
+
+    # Budget comparisons
+    (0.25, 'round', 0.5, 'round'),
+    (0.5, 'round', 0.75, 'round'),
+
+    # Premium comparisons
+    (2.0, 'round', 3.0, 'round'),
+    (3.0, 'round', 4.0, 'round'),
+
+    # Mixed
+    (1.0, 'pear', 1.5, 'pear'),
+    (1.0, 'emerald', 1.5, 'emerald'),
+]
 
 def svg_to_image(svg_path, size=(400, 400)):
-    """Convert SVG to PIL Image"""
-    png_data = cairosvg.svg2png(url=str(svg_path), output_width=size[0], output_height=size[1])
-    return Image.open(BytesIO(png_data)).convert('RGBA')
-
-def create_text_image(text, font_size=80, color=WHITE, size=(WIDTH, 200)):
-    """Create an image with text"""
-    img = Image.new('RGBA', size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-
-    # Try to load a nice font, fall back to default
-    try:
-        font = ImageFont.truetype('/System/Library/Fonts/Helvetica.ttc', font_size)
-    except:
-        font = ImageFont.load_default()
-
-    # Center the text
-    bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-    x = (size[0] - text_width) // 2
-    y = (size[1] - text_height) // 2
-
-    draw.text((x, y), text, font=font, fill=color)
-    return img
+    """Convert SVG to PIL Image (rasterized once per size, see asset_cache.py)"""
+    return rasterize_svg(svg_path, size)
+
+def create_text_image(text, font_size=80, color=WHITE, center=(WIDTH // 2, 100)):
+    """Create a text sprite centred on `center`; returns (sprite, paste position)"""
+    sprite, _ = render_text(text, 'helvetica', font_size, color)
+    return sprite, (center[0] - sprite.width // 2, center[1] - sprite.height // 2)
+
+def diamond_label(carat, shape, width_mm):
+    """On-screen label under a diamond"""
+    return f"{display_carat(carat)}ct {shape.capitalize()}\n{width_mm:.1f}mm"
+
+def asset_paths(shape1, shape2):
+    """SVG files a comparison video is drawn from"""
+    return {
+        'logo': ASSETS_DIR / 'svg' / 'Logo 3.svg',
+        'dime': ASSETS_DIR / 'svg' / 'Dime.svg',
+        'diamond1': ASSETS_DIR / 'svg' / 'diamonds' / f'{shape1.capitalize()}.svg',
+        'diamond2': ASSETS_DIR / 'svg' / 'diamonds' / f'{shape2.capitalize()}.svg',
+    }
 
 def create_background():
     """Create dark background"""
     img = Image.new('RGB', (WIDTH, HEIGHT), BACKGROUND)
     return img
 
-def get_dimensions(carat, shape, diamond_data):
-    """Get diamond dimensions for given carat and shape"""
-    carat_key = f"{carat:.2f}"
-    shape_data = diamond_data.get(shape, {})
-    dims = shape_data.get(carat_key, {'width': 5.0, 'height': 5.0})
-    return dims['width'], dims['height']
-
-def format_carat(carat):
-    """Format carat for display (1.0 -> 1, 1.5 -> 1.5, 0.75 -> 0.75)"""
-    if carat % 1 == 0 or carat % 1 == 0.5:
-        return f"{carat:.1f}"
-    return f"{carat:.2f}"
-
-def generate_comparison_video(carat1, shape1, carat2, shape2, output_path):
+def generate_comparison_video(carat1, shape1, carat2, shape2, output_path, threads=4, logger='bar',
+                              backend=DEFAULT_BACKEND, preset='medium', profile=None, templates=False):
     """
     Generate a single comparison video
 
@@ -93,13 +120,18 @@ def generate_comparison_video(carat1, shape1, carat2, shape2, output_path):
         carat2: Second diamond carat size
         shape2: Second diamond shape
         output_path: Where to save the video
+        threads: x264 encoder threads
+        logger: Progress logger ('bar' or None)
+        backend: Video writer ('ffmpeg' or 'moviepy')
+        preset: x264 preset
+        profile: Encoder profile (draft/batch/archive), overrides `preset`
+        templates: Reuse the pre-encoded intro and outro (see segment_render.py)
     """
     print(f"Generating: {carat1}ct {shape1} vs {carat2}ct {shape2}")
 
-    # Load data
-    diamond_data = load_diamond_data()
-    width1, height1 = get_dimensions(carat1, shape1, diamond_data)
-    width2, height2 = get_dimensions(carat2, shape2, diamond_data)
+    # Look up dimensions
+    width1, height1 = get_dimensions(carat1, shape1)
+    width2, height2 = get_dimensions(carat2, shape2)
 
     # Calculate pixel sizes (scale factor for visibility)
     SCALE = 15  # pixels per mm
@@ -111,10 +143,11 @@ def generate_comparison_video(carat1, shape1, carat2, shape2, output_path):
     bg = create_background()
 
     # Load and resize assets
-    logo_path = ASSETS_DIR / 'svg' / 'Logo 3.svg'
-    dime_path = ASSETS_DIR / 'svg' / 'Dime.svg'
-    diamond1_path = ASSETS_DIR / 'svg' / 'diamonds' / f'{shape1.capitalize()}.svg'
-    diamond2_path = ASSETS_DIR / 'svg' / 'diamonds' / f'{shape2.capitalize()}.svg'
+    assets = asset_paths(shape1, shape2)
+    logo_path = assets['logo']
+    dime_path = assets['dime']
+    diamond1_path = assets['diamond1']
+    diamond2_path = assets['diamond2']
 
     logo = svg_to_image(logo_path, (400, 400))
     dime = svg_to_image(dime_path, (dime_px, dime_px))
@@ -126,291 +159,203 @@ def generate_comparison_video(carat1, shape1, carat2, shape2, output_path):
     # 3-15s: Comparison (dime + diamonds)
     # 15-20s: Outro (website URL)
 
-    clips = []
-
     # --- INTRO: Logo (0-3s) ---
-    def make_logo_frame(t):
-        """Create frame with fading logo"""
-        frame = bg.copy()
-
-        # Fade in/out
-        if t < 0.5:
-            alpha = int(255 * (t / 0.5))
-        elif t > 2.5:
-            alpha = int(255 * (1 - (t - 2.5) / 0.5))
-        else:
-            alpha = 255
-
-        # Paste logo in center
-        logo_with_alpha = logo.copy()
-        logo_with_alpha.putalpha(alpha)
-
-        x = (WIDTH - logo.size[0]) // 2
-        y = (HEIGHT - logo.size[1]) // 2
-        frame.paste(logo_with_alpha, (x, y), logo_with_alpha)
-
-        return np.array(frame)
-
-    intro_clip = VideoClip(make_logo_frame, duration=3)
-    clips.append(intro_clip)
+    intro = Scene(bg, duration=3, shared=True)
+    intro.add(
+        logo,
+        ((WIDTH - logo.size[0]) // 2, (HEIGHT - logo.size[1]) // 2),
+        opacity=fade(0, 0.5, out_at=2.5)
+    )
 
     # --- MAIN: Comparison (3-15s) ---
-    def make_comparison_frame(t):
-        """Create frame with dime and diamonds"""
-        frame = bg.copy()
-
-        # Slide-in animation (0-1s of this clip)
-        slide_progress = min(t, 1.0)
-
-        # Dime in center
-        dime_x = (WIDTH - dime.size[0]) // 2
-        dime_y = (HEIGHT - dime.size[1]) // 2
-        frame.paste(dime, (dime_x, dime_y), dime)
-
-        # Left diamond (slides from left)
-        d1_x = int((WIDTH // 4 - diamond1_img.size[0] // 2) * slide_progress - diamond1_img.size[0] * (1 - slide_progress))
-        d1_y = dime_y + (dime.size[1] - diamond1_img.size[1]) // 2
-        if d1_x + diamond1_img.size[0] > 0:  # Only draw if visible
-            frame.paste(diamond1_img, (d1_x, d1_y), diamond1_img)
-
-        # Right diamond (slides from right)
-        d2_x_final = 3 * WIDTH // 4 - diamond2_img.size[0] // 2
-        d2_x = int(d2_x_final * slide_progress + WIDTH * (1 - slide_progress))
-        d2_y = dime_y + (dime.size[1] - diamond2_img.size[1]) // 2
-        if d2_x < WIDTH:  # Only draw if visible
-            frame.paste(diamond2_img, (d2_x, d2_y), diamond2_img)
-
-        # Add text labels (appear after slide-in)
-        if t > 1:
-            text_alpha = int(min(255, 255 * (t - 1)))
-
-            # Left diamond label
-            label1 = create_text_image(
-                f"{format_carat(carat1)}ct {shape1.capitalize()}\n{width1:.1f}mm",
-                font_size=50,
-                color=CYAN
-            )
-            label1.putalpha(text_alpha)
-            frame.paste(label1, (WIDTH // 4 - label1.size[0] // 2, d1_y - 150), label1)
-
-            # Right diamond label
-            label2 = create_text_image(
-                f"{format_carat(carat2)}ct {shape2.capitalize()}\n{width2:.1f}mm",
-                font_size=50,
-                color=MAGENTA
-            )
-            label2.putalpha(text_alpha)
-            frame.paste(label2, (3 * WIDTH // 4 - label2.size[0] // 2, d2_y - 150), label2)
-
-        return np.array(frame)
-
-    comparison_clip = VideoClip(make_comparison_frame, duration=12).set_start(3)
-    clips.append(comparison_clip)
+    comparison = Scene(bg, duration=12)
+
+    # Dime in center
+    dime_x = (WIDTH - dime.size[0]) // 2
+    dime_y = (HEIGHT - dime.size[1]) // 2
+    comparison.add(dime, (dime_x, dime_y))
+
+    # Slide-in animation (0-1s of this scene)
+    slide_progress = ramp(0, 1.0)
+
+    # Left diamond (slides from left)
+    d1_y = dime_y + (dime.size[1] - diamond1_img.size[1]) // 2
+    comparison.add(diamond1_img, slide(
+        (-diamond1_img.size[0], d1_y),
+        (WIDTH // 4 - diamond1_img.size[0] // 2, d1_y),
+        slide_progress
+    ))
+
+    # Right diamond (slides from right)
+    d2_y = dime_y + (dime.size[1] - diamond2_img.size[1]) // 2
+    comparison.add(diamond2_img, slide(
+        (WIDTH, d2_y),
+        (3 * WIDTH // 4 - diamond2_img.size[0] // 2, d2_y),
+        slide_progress
+    ))
+
+    # Add text labels (appear after slide-in)
+    label1 = create_text_image(
+        diamond_label(carat1, shape1, width1),
+        font_size=50,
+        color=CYAN,
+        center=(WIDTH // 4, d1_y - 50)
+    )
+    label2 = create_text_image(
+        diamond_label(carat2, shape2, width2),
+        font_size=50,
+        color=MAGENTA,
+        center=(3 * WIDTH // 4, d2_y - 50)
+    )
+    comparison.add(*label1, opacity=ramp(1, 1))
+    comparison.add(*label2, opacity=ramp(1, 1))
 
     # --- OUTRO: Website URL (15-20s) ---
-    def make_outro_frame(t):
-        """Create frame with website URL"""
-        frame = bg.copy()
-
-        # Fade in
-        alpha = int(min(255, 255 * t))
-
-        # Main text
-        url_text = create_text_image("CaratCompare.co", font_size=90, color=WHITE)
-        url_text.putalpha(alpha)
-        frame.paste(url_text, (WIDTH // 2 - url_text.size[0] // 2, HEIGHT // 2 - 100), url_text)
-
-        # Subtext
-        sub_text = create_text_image("Compare 1,200+ Diamond Sizes", font_size=50, color=WHITE)
-        sub_text.putalpha(alpha)
-        frame.paste(sub_text, (WIDTH // 2 - sub_text.size[0] // 2, HEIGHT // 2 + 50), sub_text)
-
-        # CTA
-        cta_text = create_text_image("Link in Description ↓", font_size=45, color=CYAN)
-        cta_text.putalpha(alpha)
-        frame.paste(cta_text, (WIDTH // 2 - cta_text.size[0] // 2, HEIGHT // 2 + 200), cta_text)
-
-        return np.array(frame)
-
-    outro_clip = VideoClip(make_outro_frame, duration=5).set_start(15)
-    clips.append(outro_clip)
-
-    # Composite and render
-    final = CompositeVideoClip(clips, size=(WIDTH, HEIGHT))
+    outro = Scene(bg, duration=5, shared=True)
+    outro_fade = ramp(0, 1)
+
+    url_text = create_text_image("CaratCompare.co", font_size=90, color=WHITE,
+                                 center=(WIDTH // 2, HEIGHT // 2))
+    sub_text = create_text_image("Compare 1,200+ Diamond Sizes", font_size=50, color=WHITE,
+                                 center=(WIDTH // 2, HEIGHT // 2 + 150))
+    cta_text = create_text_image("Link in Description ↓", font_size=45, color=CYAN,
+                                 center=(WIDTH // 2, HEIGHT // 2 + 300))
+    outro.add(*url_text, opacity=outro_fade)
+    outro.add(*sub_text, opacity=outro_fade)
+    outro.add(*cta_text, opacity=outro_fade)
+
+    # Render
+    timeline = Timeline([intro, comparison, outro], FPS)
 
     # Write video
-    final.write_videofile(
-        str(output_path),
-        fps=FPS,
-        codec='libx264',
-        audio=False,
-        preset='medium',
-        threads=4
-    )
+    if templates:
+        # Intro and outro are the same in every video; only the comparison is encoded
+        render_timeline(timeline, output_path, FPS, preset=preset, backend=backend,
+                        threads=threads, profile=profile)
+    else:
+        write_video(
+            timeline.make_frame,
+            timeline.duration,
+            output_path,
+            fps=FPS,
+            backend=backend,
+            preset=preset,
+            threads=threads,
+            logger=logger,
+            profile=profile,
+            frame_key=timeline.frame_key
+        )
 
     print(f"✓ Saved: {output_path}")
 
-def generate_metadata(carat1, shape1, carat2, shape2, slug):
-    """Generate YouTube metadata (title, description, tags)"""
-
-    # Format carats
-    c1 = format_carat(carat1)
-    c2 = format_carat(carat2)
-    s1 = shape1.capitalize()
-    s2 = shape2.capitalize()
-
-    # Title (max 100 chars for YouTube)
-    title = f"{c1}ct {s1} vs {c2}ct {s2} Diamond Size Comparison #Shorts"
-
-    # Build affiliate URLs
-    def build_affiliate_url(retailer, carat, shape):
-        if retailer == 'bluenile':
-            return f"https://www.bluenile.com/diamond-search?CaratFrom={carat}&CaratTo={carat}&Shape={shape}-cut&a_aid=6938679a08145&a_cid=55e51e63"
-        elif retailer == 'jamesallen':
-            return f"https://www.jamesallen.com/loose-diamonds/all-diamonds/?Shape={shape}-cut&CaratFrom={carat}&CaratTo={carat}&a_aid=6938679a08145&a_cid=dfef9309"
-        else:  # brilliant earth
-            urls = {
-                'round': 'https://brilliantearth.sjv.io/MAZ2YN',
-                'oval': 'https://brilliantearth.sjv.io/kO59Pv',
-                'cushion': 'https://brilliantearth.sjv.io/xLBrq3',
-                'pear': 'https://brilliantearth.sjv.io/POoRqM',
-                'princess': 'https://brilliantearth.sjv.io/e1Dex6',
-                'emerald': 'https://brilliantearth.sjv.io/GKaOY6',
-                'marquise': 'https://brilliantearth.sjv.io/VxnAjJ',
-                'radiant': 'https://brilliantearth.sjv.io/Z62Le0',
-                'asscher': 'https://brilliantearth.sjv.io/o4A5ge',
-                'heart': 'https://brilliantearth.sjv.io/BnjOV0',
-            }
-            return urls.get(shape.lower(), urls['round'])
-
-    # Load diamond dimensions for description
-    diamond_data = load_diamond_data()
-    width1, height1 = get_dimensions(carat1, shape1, diamond_data)
-    width2, height2 = get_dimensions(carat2, shape2, diamond_data)
-
-    # Description
-    description = f"""Compare {c1} carat {s1} vs {c2} carat {s2} diamonds side-by-side!
-
-See the actual size difference with precise measurements. Perfect for engagement ring shopping.
-
-📏 MEASUREMENTS:
-• {c1}ct {s1}: {width1:.1f}mm × {height1:.1f}mm
-• {c2}ct {s2}: {width2:.1f}mm × {height2:.1f}mm
-
-💍 SHOP CERTIFIED DIAMONDS:
-💎 Blue Nile: {build_affiliate_url('bluenile', carat1, shape1)}
-💎 James Allen: {build_affiliate_url('jamesallen', carat1, shape1)}
-💎 Brilliant Earth: {build_affiliate_url('brilliantearth', shape1)}
-
-🔗 FULL INTERACTIVE TOOL:
-https://www.caratcompare.co/compare/{slug}
-
-Compare over 1,200 diamond sizes at CaratCompare.co - the ultimate diamond size comparison tool!
-
-#diamondsize #engagementring #diamondcomparison #{shape1}diamond #{shape2}diamond #caratsize #diamondshopping #bridetobe #proposal #weddingring
-
----
-Disclosure: Affiliate links above support this channel at no extra cost to you."""
-
-    # Tags
-    tags = [
-        'diamond size',
-        'diamond comparison',
-        f'{shape1} diamond',
-        f'{shape2} diamond',
-        f'{c1} carat diamond',
-        f'{c2} carat diamond',
-        'engagement ring',
-        'diamond shopping',
-        'carat compare',
-        'diamond size chart',
-        'how big is diamond',
-        'diamond actual size'
-    ]
-
-    return {
-        'title': title,
-        'description': description,
-        'tags': tags[:15],  # YouTube max 15 tags
-        'category': '26'  # Howto & Style
-    }
+def job_hash(comparison, backend=DEFAULT_BACKEND, profile=None):
+    """Hash of everything a comparison's video is made from (metadata lives in metadata.jsonl, not the render)"""
+    carat1, shape1, carat2, shape2 = comparison
+    dims1 = get_dimensions(carat1, shape1)
+    dims2 = get_dimensions(carat2, shape2)
+    return input_hash({
+        'dimensions': [dims1, dims2],
+        'labels': [diamond_label(carat1, shape1, dims1[0]), diamond_label(carat2, shape2, dims2[0])],
+        'template': TEMPLATE_VERSION,
+        'assets': {name: file_digest(path) for name, path in asset_paths(shape1, shape2).items()},
+        'video': [WIDTH, HEIGHT, FPS],
+        'encoder': {'backend': backend, 'profile': profile},
+    })
+
+def render_comparison(comparison, threads=4, quiet=False, backend=DEFAULT_BACKEND, profile=None,
+                      templates=False):
+    """Render one comparison video and record it in the manifest; returns the slug"""
+    carat1, shape1, carat2, shape2 = comparison
+    slug = video_slug(carat1, shape1, carat2, shape2)
+
+    # Write under a temporary name first, so a crash never leaves a partial file
+    video_path = OUTPUT_DIR / f"{slug}.mp4"
+    with atomic_output(video_path) as tmp_path:
+        generate_comparison_video(carat1, shape1, carat2, shape2, tmp_path,
+                                  threads=threads, logger=None if quiet else 'bar', backend=backend,
+                                  profile=profile, templates=templates)
+
+    Manifest(MANIFEST_PATH).record(slug, job_hash(comparison, backend, profile), [video_path])
+    return slug
+
+def generate_pilot_videos(workers=None, backend=DEFAULT_BACKEND, profile=None, templates=False,
+                          comparisons=PILOT_COMPARISONS, shard_spec=None, queue_path=None):
+    """
+    Generate the 20 pilot videos (or `comparisons`), spread across `workers` processes
 
-def generate_pilot_videos():
-    """Generate 20 pilot videos for testing"""
+    Several nodes sharing OUTPUT_DIR can split the work: `shard_spec`
+    (index, count) takes every count-th comparison, `queue_path` pulls
+    comparisons from a shared WorkQueue instead.
+    """
 
     # Create output directory
     OUTPUT_DIR.mkdir(exist_ok=True)
 
-    # High-volume comparisons to test
-    comparisons = [
-        # Popular round comparisons
-        (0.5, 'round', 1.0, 'round'),
-        (0.75, 'round', 1.0, 'round'),
-        (1.0, 'round', 1.5, 'round'),
-        (1.0, 'round', 2.0, 'round'),
-        (1.5, 'round', 2.0, 'round'),
-
-        # Shape comparisons (same carat)
-        (1.0, 'round', 1.0, 'oval'),
-        (1.0, 'round', 1.0, 'princess'),
-        (1.0, 'round', 1.0, 'cushion'),
-        (1.5, 'round', 1.5, 'oval'),
-        (2.0, 'round', 2.0, 'oval'),
-
-        # Popular fancy shapes
-        (1.0, 'oval', 1.5, 'oval'),
-        (1.0, 'oval', 2.0, 'oval'),
-        (1.0, 'cushion', 1.5, 'cushion'),
-        (1.0, 'princess', 1.5, 'princess'),
-
-        # Budget comparisons
-        (0.25, 'round', 0.5, 'round'),
-        (0.5, 'round', 0.75, 'round'),
-
-        # Premium comparisons
-        (2.0, 'round', 3.0, 'round'),
-        (3.0, 'round', 4.0, 'round'),
-
-        # Mixed
-        (1.0, 'pear', 1.5, 'pear'),
-        (1.0, 'emerald', 1.5, 'emerald'),
-    ]
-
-    # Generate each video
-    for i, (carat1, shape1, carat2, shape2) in enumerate(comparisons, 1):
-        # Create slug
-        c1 = format_carat(carat1)
-        c2 = format_carat(carat2)
-        slug = f"{c1}-{shape1}-vs-{c2}-{shape2}"
-
-        # Output path
-        video_path = OUTPUT_DIR / f"{slug}.mp4"
-
-        # Skip if already exists
-        if video_path.exists():
-            print(f"⊘ Skipping (exists): {slug}")
-            continue
-
-        # Generate video
-        try:
-            generate_comparison_video(carat1, shape1, carat2, shape2, video_path)
-
-            # Save metadata
-            metadata = generate_metadata(carat1, shape1, carat2, shape2, slug)
-            metadata_path = OUTPUT_DIR / f"{slug}_metadata.json"
-            with open(metadata_path, 'w') as f:
-                json.dump(metadata, f, indent=2)
-
-            print(f"✓ Completed {i}/{len(comparisons)}: {slug}")
-
-        except Exception as e:
-            print(f"✗ Error generating {slug}: {e}")
-            continue
+    # Metadata for every comparison in one pass; all nodes write the same entries
+    write_metadata(generate_batch(comparisons), METADATA_PATH)
+
+    if shard_spec:
+        comparisons = list(shard(comparisons, *shard_spec))
+        print(f"Shard {shard_spec[0]}/{shard_spec[1]}: {len(comparisons)} comparisons")
+
+    # Skip videos already rendered from the same inputs
+    manifest = Manifest(MANIFEST_PATH)
+    if not (shard_spec or queue_path):
+        manifest.compact()  # only safe while no other node is appending
+        compact_metadata(METADATA_PATH)
+    pending = []
+    for comparison in comparisons:
+        slug = video_slug(*comparison)
+        comparison_hash = job_hash(comparison, backend, profile)
+        if manifest.is_current(slug, comparison_hash):
+            print(f"⊘ Skipping (up to date): {slug}")
+        else:
+            pending.append((f"{slug}@{comparison_hash[:16]}", comparison))
+
+    render_job = partial(render_comparison, backend=backend, profile=profile, templates=templates)
+    if queue_path:
+        # Every node seeds the same jobs; keys already queued are left alone
+        queue = WorkQueue(queue_path)
+        queue.add(pending)
+        run_queue(render_job, queue, workers=workers, warmup=warm_worker, warmup_args=((45, 50, 90),))
+        queue.close()
+        return
+
+    # Generate videos in parallel
+    run_batch(render_job, [comparison for _, comparison in pending], workers=workers,
+              warmup=warm_worker, warmup_args=((45, 50, 90),))
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate diamond comparison videos")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Parallel render processes (default: one per CPU core)")
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="Video writer: direct ffmpeg pipe or MoviePy (default: %(default)s)")
+    parser.add_argument('--profile', choices=PROFILES, default=None,
+                        help="Encoder profile (default: x264 defaults at preset medium)")
+    parser.add_argument('--template', action='store_true',
+                        help="Reuse the pre-encoded intro and outro segments; only the comparison is rendered")
+    parser.add_argument('--catalog', action='store_true',
+                        help="Render the site's comparison catalog in priority order instead of the pilots")
+    parser.add_argument('--limit', type=int, default=CATALOG_LIMIT,
+                        help="With --catalog, only the first N comparisons (default: %(default)s)")
+    parser.add_argument('--shard', type=parse_shard, default=None, metavar='i/N',
+                        help="Render only every N-th comparison, starting at the i-th (static split across nodes)")
+    parser.add_argument('--queue', metavar='DB',
+                        help="Pull comparisons from a shared SQLite work queue (dynamic split across nodes)")
+    args = parser.parse_args()
+
     print("Diamond Comparison Video Generator")
     print("=" * 50)
-    generate_pilot_videos()
+    preload()
+    comparisons = PILOT_COMPARISONS
+    if args.catalog:
+        comparisons = [entry.comparison for entry in catalog(args.limit)]
+    generate_pilot_videos(workers=args.workers, backend=args.backend, profile=args.profile,
+                          templates=args.template, comparisons=comparisons, shard_spec=args.shard,
+                          queue_path=args.queue)
     print("\n✓ All done! Videos saved to:", OUTPUT_DIR)
     print("\nNext steps:")
     print("1. Review videos in generated_videos/")
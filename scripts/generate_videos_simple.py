@@ -12,12 +12,14 @@ import json
 import numpy as np
 from pathlib import Path
 from moviepy import VideoClip, CompositeVideoClip
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+
+from dimensions import get_dimensions
+from fonts import get_font, preload
 
 # Configuration
 PROJECT_ROOT = Path(__file__).parent.parent
 OUTPUT_DIR = PROJECT_ROOT / 'generated_videos'
-DATA_FILE = PROJECT_ROOT / 'data' / 'diamond-sizes.json'
 
 # Video settings
 WIDTH = 1080
@@ -31,11 +33,6 @@ MAGENTA = '#FA06FF'
 BACKGROUND = '#252525'
 WHITE = '#FFFFFF'
 
-def load_diamond_data():
-    """Load diamond dimensions from JSON"""
-    with open(DATA_FILE, 'r') as f:
-        return json.load(f)
-
 def hex_to_rgb(hex_color):
     """Convert hex color to RGB tuple"""
     hex_color = hex_color.lstrip('#')
@@ -46,14 +43,7 @@ def create_text_image(text, font_size=80, color=WHITE, size=(WIDTH, 200), bold=F
     img = Image.new('RGBA', size, (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
 
-    # Try to load a nice font
-    try:
-        if bold:
-            font = ImageFont.truetype('/System/Library/Fonts/Helvetica.ttc', font_size)
-        else:
-            font = ImageFont.truetype('/System/Library/Fonts/Helvetica.ttc', font_size)
-    except:
-        font = ImageFont.load_default()
+    font = get_font('helvetica', font_size)
 
     # Center the text
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -92,13 +82,6 @@ def create_circle(diameter, color, label=None):
 
     return img
 
-def get_dimensions(carat, shape, diamond_data):
-    """Get diamond dimensions"""
-    carat_key = f"{carat:.2f}"
-    shape_data = diamond_data.get(shape, {})
-    dims = shape_data.get(carat_key, {'width': 5.0, 'height': 5.0})
-    return dims['width'], dims['height']
-
 def format_carat(carat):
     """Format carat for display"""
     if carat % 1 == 0 or carat % 1 == 0.5:
@@ -109,10 +92,9 @@ def generate_comparison_video(carat1, shape1, carat2, shape2, output_path):
     """Generate a single comparison video using simple circles"""
     print(f"Generating: {carat1}ct {shape1} vs {carat2}ct {shape2}")
 
-    # Load data
-    diamond_data = load_diamond_data()
-    width1, height1 = get_dimensions(carat1, shape1, diamond_data)
-    width2, height2 = get_dimensions(carat2, shape2, diamond_data)
+    # Look up dimensions
+    width1, height1 = get_dimensions(carat1, shape1)
+    width2, height2 = get_dimensions(carat2, shape2)
 
     # CRITICAL: Scale to show ACCURATE sizes relative to dime
     # Dime is 17.9mm, we want it to be a good size on screen
@@ -283,9 +265,8 @@ def generate_metadata(carat1, shape1, carat2, shape2, slug):
             }
             return urls.get(shape.lower(), urls['round'])
 
-    diamond_data = load_diamond_data()
-    width1, height1 = get_dimensions(carat1, shape1, diamond_data)
-    width2, height2 = get_dimensions(carat2, shape2, diamond_data)
+    width1, height1 = get_dimensions(carat1, shape1)
+    width2, height2 = get_dimensions(carat2, shape2)
 
     description = f"""Compare {c1} carat {s1} vs {c2} carat {s2} diamonds side-by-side!
 
@@ -370,5 +351,6 @@ def generate_pilot_videos():
 if __name__ == '__main__':
     print("Diamond Comparison Video Generator (Simplified)")
     print("=" * 50)
+    preload()
     generate_pilot_videos()
     print("\n✓ All done! Videos saved to:", OUTPUT_DIR)
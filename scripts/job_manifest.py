@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Render Job Manifest
+Records what every finished video was rendered from, so batches only redo what changed
+
+Checking whether the .mp4 exists isn't enough to skip a job: a crash
+mid-write leaves a truncated file that would be skipped forever, and a
+failed metadata write leaves the video and its JSON out of sync. Instead
+each job has an input hash (dimensions, on-screen and narration text,
+template version, asset files, encoder settings) and, once all of its
+outputs are written, a line in an append-only JSONL manifest:
+
+    {"job": "1.0-round-vs-1.5-round", "hash": "...", "outputs": {"1.0-round-vs-1.5-round.mp4": 81234, ...}}
+
+A job is current when its latest line has the same hash and every output
+still exists with the recorded size. Outputs are written to a temporary
+name and renamed into place, so a crash leaves either the old file or
+none - never a partial one. After a data or brand tweak only the jobs
+whose inputs changed are rendered again.
+
+Each line is appended with a single write, so batch workers can record
+their own jobs concurrently.
+
+Usage:
+    manifest = Manifest(OUTPUT_DIR / 'render_manifest.jsonl')
+    job_hash = input_hash({'dimensions': ..., 'profile': profile})
+    if not manifest.is_current(slug, job_hash):
+        with atomic_output(video_path) as tmp_path:
+            render(tmp_path)
+        manifest.record(slug, job_hash, [video_path, metadata_path])
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+
+def input_hash(inputs):
+    """Stable hash of a JSON-serializable description of a job's inputs"""
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def file_digest(path):
+    """sha256 of a file's contents (assets rarely change within one run)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def atomic_output(path):
+    """
+    Yield a temporary path next to `path`; it replaces `path` only if the block succeeds
+
+    The temporary name keeps the extension so ffmpeg still picks the right
+    container.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=f".partial{path.suffix}")
+    os.close(fd)
+    os.chmod(tmp_path, 0o644)  # mkstemp's 0600 would carry over to the output
+    try:
+        yield Path(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def write_json(path, data):
+    """json.dump to `path` atomically"""
+    with atomic_output(path) as tmp_path:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+class Manifest:
+    """Append-only JSONL log of finished jobs; the latest line per job wins"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self.lines = 0
+        self.load()
+
+    def load(self):
+        """Read the manifest, skipping a torn last line from a crash"""
+        self.entries = {}
+        self.lines = 0
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    self.lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.entries[entry['job']] = entry
+        except FileNotFoundError:
+            pass
+        return self.entries
+
+    def is_current(self, job, job_hash):
+        """True if `job` was rendered from these inputs and its outputs are intact"""
+        entry = self.entries.get(job)
+        if entry is None or entry['hash'] != job_hash:
+            return False
+        for name, size in entry['outputs'].items():
+            try:
+                if (self.path.parent / name).stat().st_size != size:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+
+    def record(self, job, job_hash, outputs):
+        """Append a line for a finished job; `outputs` are paths next to the manifest"""
+        entry = {
+            'job': job,
+            'hash': job_hash,
+            'outputs': {Path(p).name: Path(p).stat().st_size for p in outputs},
+            'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        line = (json.dumps(entry) + '\n').encode()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)  # one write per line, so concurrent workers don't interleave
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self.entries[job] = entry
+        self.lines += 1
+
+    def compact(self):
+        """
+        Rewrite the manifest with only the latest line per job
+
+        Call it only while no worker is recording.
+        """
+        self.load()
+        if self.lines <= len(self.entries):
+            return
+        with atomic_output(self.path) as tmp_path:
+            with open(tmp_path, 'w') as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry) + '\n')
+        self.lines = len(self.entries)
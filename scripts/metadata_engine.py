@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+YouTube Metadata Engine
+Titles, descriptions and tags for a whole batch in one pass, kept in one JSONL file
+
+generate_metadata() used to rebuild the description f-string, define the
+affiliate URL builder and its Brilliant Earth table, and look up both
+diamonds' dimensions again for every video. Here the templates are
+parsed once at import, each (carat, shape) gets its affiliate links built
+once, and a batch looks up every comparison's dimensions in a single
+vectorized call.
+
+Entries are keyed by the video's file name (video_slug(), e.g.
+1.0-round-vs-1.5-round). The link to the comparison page uses the site's
+own slug (catalog.comparison_slug(), e.g. 1-round-vs-1.5-round).
+
+Instead of a _metadata.json file next to every video, a batch writes one
+generated_videos/metadata.jsonl with a line per video:
+
+    {"slug": "1.0-round-vs-1.5-round", "title": "...", "description": "...", "tags": [...], "category": "26"}
+
+The uploader reads it once (and still falls back to old _metadata.json
+files). Like the render manifest, the file is append-only: a batch
+appends a line for each new or changed entry with a single write, so
+shards and queue nodes sharing generated_videos/ never overwrite each
+other, and the last line per slug wins. compact_metadata() drops the
+superseded lines; call it only while nothing else is writing.
+
+Usage:
+    entries = generate_batch(comparisons)          # {slug: metadata}
+    write_metadata(entries)                        # append to generated_videos/metadata.jsonl
+    metadata = MetadataStore().get(video_path.stem)
+
+    python3 scripts/metadata_engine.py             # metadata for the whole catalog
+    python3 scripts/metadata_engine.py --compact   # ...then drop superseded lines
+"""
+
+import argparse
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from string import Formatter
+
+import numpy as np
+
+from catalog import CATALOG_LIMIT, catalog, comparison_slug
+from dimensions import lookup_dimensions
+from job_manifest import atomic_output
+
+PROJECT_ROOT = Path(__file__).parent.parent
+METADATA_FILE = PROJECT_ROOT / 'generated_videos' / 'metadata.jsonl'
+
+CATEGORY = '26'  # Howto & Style
+MAX_TAGS = 15  # YouTube max 15 tags
+
+# Title (max 100 chars for YouTube)
+TITLE = "{c1}ct {s1} vs {c2}ct {s2} Diamond Size Comparison #Shorts"
+
+DESCRIPTION = """Compare {c1} carat {s1} vs {c2} carat {s2} diamonds side-by-side!
+
+See the actual size difference with precise measurements. Perfect for engagement ring shopping.
+
+📏 MEASUREMENTS:
+• {c1}ct {s1}: {width1}mm × {height1}mm
+• {c2}ct {s2}: {width2}mm × {height2}mm
+
+💍 SHOP CERTIFIED DIAMONDS:
+💎 Blue Nile: {bluenile}
+💎 James Allen: {jamesallen}
+💎 Brilliant Earth: {brilliantearth}
+
+🔗 FULL INTERACTIVE TOOL:
+https://www.caratcompare.co/compare/{site_slug}
+
+Compare over 1,200 diamond sizes at CaratCompare.co - the ultimate diamond size comparison tool!
+
+#diamondsize #engagementring #diamondcomparison #{shape1}diamond #{shape2}diamond #caratsize #diamondshopping #bridetobe #proposal #weddingring
+
+---
+Disclosure: Affiliate links above support this channel at no extra cost to you."""
+
+TAGS = (
+    'diamond size',
+    'diamond comparison',
+    '{shape1} diamond',
+    '{shape2} diamond',
+    '{c1} carat diamond',
+    '{c2} carat diamond',
+    'engagement ring',
+    'diamond shopping',
+    'carat compare',
+    'diamond size chart',
+    'how big is diamond',
+    'diamond actual size',
+)
+
+# Affiliate links for the first diamond of a comparison
+BLUE_NILE_URL = ("https://www.bluenile.com/diamond-search?CaratFrom={carat}&CaratTo={carat}&Shape={shape}-cut"
+                 "&a_aid=6938679a08145&a_cid=55e51e63")
+JAMES_ALLEN_URL = ("https://www.jamesallen.com/loose-diamonds/all-diamonds/?Shape={shape}-cut&CaratFrom={carat}"
+                   "&CaratTo={carat}&a_aid=6938679a08145&a_cid=dfef9309")
+BRILLIANT_EARTH_URLS = {
+    'round': 'https://brilliantearth.sjv.io/MAZ2YN',
+    'oval': 'https://brilliantearth.sjv.io/kO59Pv',
+    'cushion': 'https://brilliantearth.sjv.io/xLBrq3',
+    'pear': 'https://brilliantearth.sjv.io/POoRqM',
+    'princess': 'https://brilliantearth.sjv.io/e1Dex6',
+    'emerald': 'https://brilliantearth.sjv.io/GKaOY6',
+    'marquise': 'https://brilliantearth.sjv.io/VxnAjJ',
+    'radiant': 'https://brilliantearth.sjv.io/Z62Le0',
+    'asscher': 'https://brilliantearth.sjv.io/o4A5ge',
+    'heart': 'https://brilliantearth.sjv.io/BnjOV0',
+}
+
+
+def compile_template(template):
+    """
+    Parse a `{field}` template once; returns render(fields) -> str
+
+    Values are substituted as they are, so numbers must be formatted
+    beforehand; format specs and conversions are rejected.
+    """
+    parts = list(Formatter().parse(template))  # (literal, field, spec, conversion)
+    for _, field, spec, conversion in parts:
+        if spec or conversion:
+            raise ValueError(f"format {field!r} before rendering instead of using a format spec")
+
+    def render(fields):
+        return ''.join(literal if field is None else literal + fields[field]
+                       for literal, field, _, _ in parts)
+
+    return render
+
+
+_title = compile_template(TITLE)
+_description = compile_template(DESCRIPTION)
+_tags = [compile_template(tag) for tag in TAGS]
+
+
+def display_carat(carat):
+    """Carat as shown in titles and video file names (1.0 -> 1.0, 1.5 -> 1.5, 0.75 -> 0.75)"""
+    if carat % 1 == 0 or carat % 1 == 0.5:
+        return f"{carat:.1f}"
+    return f"{carat:.2f}"
+
+
+def video_slug(carat1, shape1, carat2, shape2):
+    """Video file name without .mp4, e.g. 1.0-round-vs-1.5-round (not the site slug, see catalog.py)"""
+    return f"{display_carat(carat1)}-{shape1}-vs-{display_carat(carat2)}-{shape2}"
+
+
+@lru_cache(maxsize=None)
+def affiliate_links(carat, shape):
+    """Shop links for one diamond, built once per (carat, shape)"""
+    return {
+        'bluenile': BLUE_NILE_URL.format(carat=carat, shape=shape),
+        'jamesallen': JAMES_ALLEN_URL.format(carat=carat, shape=shape),
+        'brilliantearth': BRILLIANT_EARTH_URLS.get(shape.lower(), BRILLIANT_EARTH_URLS['round']),
+    }
+
+
+def generate_batch(comparisons, slugs=None):
+    """
+    Metadata for many comparisons at once
+
+    Args:
+        comparisons: (carat1, shape1, carat2, shape2) tuples
+        slugs: Key per comparison (default: video_slug)
+
+    Returns:
+        {slug: {'title', 'description', 'tags', 'category'}} in input order
+    """
+    comparisons = list(comparisons)
+    if not comparisons:
+        return {}
+    if slugs is None:
+        slugs = [video_slug(*comparison) for comparison in comparisons]
+    carats1, shapes1, carats2, shapes2 = zip(*comparisons)
+
+    # Every dimension in two table lookups, formatted in one pass each
+    sizes1 = np.char.mod('%.1f', lookup_dimensions(carats1, shapes1))
+    sizes2 = np.char.mod('%.1f', lookup_dimensions(carats2, shapes2))
+    carat_text = {carat: display_carat(carat) for carat in set(carats1) | set(carats2)}
+
+    entries = {}
+    for i, (carat1, shape1, carat2, shape2) in enumerate(comparisons):
+        fields = {
+            'c1': carat_text[carat1], 'c2': carat_text[carat2],
+            's1': shape1.capitalize(), 's2': shape2.capitalize(),
+            'shape1': shape1, 'shape2': shape2,
+            'width1': sizes1[i, 0], 'height1': sizes1[i, 1],
+            'width2': sizes2[i, 0], 'height2': sizes2[i, 1],
+            'site_slug': comparison_slug(carat1, shape1, carat2, shape2),
+            **affiliate_links(carat1, shape1),
+        }
+        entries[slugs[i]] = {
+            'title': _title(fields),
+            'description': _description(fields),
+            'tags': [tag(fields) for tag in _tags][:MAX_TAGS],
+            'category': CATEGORY,
+        }
+    return entries
+
+
+def generate_metadata(carat1, shape1, carat2, shape2, slug):
+    """Generate YouTube metadata (title, description, tags) for one comparison"""
+    return generate_batch([(carat1, shape1, carat2, shape2)], [slug])[slug]
+
+
+class MetadataStore:
+    """Video metadata from metadata.jsonl, with old per-video _metadata.json files as a fallback"""
+
+    def __init__(self, path=METADATA_FILE):
+        self.path = Path(path)
+        self.entries = read_metadata(self.path)
+
+    def get(self, slug):
+        """Metadata for a video, or None if there is none"""
+        metadata = self.entries.get(slug)
+        if metadata is None:
+            legacy = self.path.with_name(f"{slug}_metadata.json")
+            if legacy.exists():
+                with open(legacy) as f:
+                    metadata = json.load(f)
+        return metadata
+
+
+def _read_lines(path):
+    """({slug: metadata}, line count) from a metadata JSONL file, skipping a torn last line"""
+    entries, lines = {}, 0
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                entries[entry.pop('slug')] = entry
+    except FileNotFoundError:
+        pass
+    return entries, lines
+
+
+def read_metadata(path=METADATA_FILE):
+    """{slug: metadata} from a metadata JSONL file; the last line per slug wins"""
+    return _read_lines(path)[0]
+
+
+def _line(slug, metadata):
+    return json.dumps({'slug': slug, **metadata}, ensure_ascii=False) + '\n'
+
+
+def write_metadata(entries, path=METADATA_FILE):
+    """Append a line for each entry of {slug: metadata} that is new or changed; returns how many"""
+    path = Path(path)
+    current = read_metadata(path)
+    lines = [_line(slug, metadata) for slug, metadata in entries.items() if current.get(slug) != metadata]
+    if not lines:
+        return 0
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        for line in lines:
+            os.write(fd, line.encode('utf-8'))  # one write per line, so concurrent nodes don't interleave
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return len(lines)
+
+
+def compact_metadata(path=METADATA_FILE):
+    """
+    Rewrite the metadata file with only the latest line per slug
+
+    Call it only while nothing else is writing metadata.
+    """
+    entries, lines = _read_lines(path)
+    if lines <= len(entries):
+        return
+    with atomic_output(path) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for slug, metadata in entries.items():
+                f.write(_line(slug, metadata))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write YouTube metadata for the comparison catalog")
+    parser.add_argument('--limit', type=int, default=CATALOG_LIMIT,
+                        help="Only the first N comparisons (default: %(default)s)")
+    parser.add_argument('--output', type=Path, default=METADATA_FILE, help="JSONL file (default: %(default)s)")
+    parser.add_argument('--compact', action='store_true',
+                        help="Then drop superseded lines (only while no render or upload is running)")
+    args = parser.parse_args()
+
+    entries = generate_batch(entry.comparison for entry in catalog(args.limit))
+    written = write_metadata(entries, args.output)
+    print(f"✓ Metadata for {len(entries)} comparisons: {written} new or changed, "
+          f"{len(entries) - written} already in {args.output}")
+    if args.compact:
+        compact_metadata(args.output)
+        print(f"✓ Compacted {args.output} ({len(read_metadata(args.output))} videos)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Narration Cache for the Video Generators
+Synthesizes each distinct phrase once and keeps the decoded audio
+
+Every video's narration is assembled from templated segments: fixed
+phrases ("Let's compare the size of", the outro) and the variable diamond
+phrases ("a 1.0 carat princess cut diamond"). Each segment is looked up by
+a hash of (engine, voice, model, voice settings, text); only misses go to
+the TTS service, so the whole catalog needs one call per distinct phrase
+(160 carat/shape phrases plus the fixed ones) rather than one per video.
+
+Segments are decoded once to 44.1kHz mono 16-bit WAV with leading and
+trailing silence trimmed, then joined sample-accurately with the `wave`
+module using explicit pauses - no re-encode needed.
+
+The cache lives in .cache/narration (or CARATCOMPARE_CACHE_DIR) and is
+trimmed to CARATCOMPARE_NARRATION_CACHE_MB (default 500) by evicting the
+least recently used files.
+
+Engines:
+    ElevenLabsEngine  ElevenLabs API (needs ELEVENLABS_API_KEY; ELEVENLABS_BASE_URL
+                      points it at another server, e.g. a local fake for tests)
+    GTTSEngine        Google Translate TTS via gTTS
+    StubEngine        Offline tone, ~0.4s per word - for tests and dry runs
+
+Setting CARATCOMPARE_TTS=stub swaps the stub in for any generator.
+
+Usage:
+    cache = NarrationCache(ElevenLabsEngine(voice_id=RACHEL))
+    audio_path = cache.narrate([
+        ("Let's compare the size of", WORD_GAP),
+        ("a 1.0 carat round diamond", SENTENCE_GAP),
+        OUTRO,
+    ])   # temporary .wav, caller deletes
+"""
+
+import hashlib
+import io
+import json
+import os
+import subprocess
+import tempfile
+import wave
+from pathlib import Path
+
+import numpy as np
+from moviepy.config import FFMPEG_BINARY
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = Path(os.environ.get('CARATCOMPARE_CACHE_DIR', PROJECT_ROOT / '.cache')) / 'narration'
+MAX_CACHE_BYTES = int(os.environ.get('CARATCOMPARE_NARRATION_CACHE_MB', 500)) * 1024 * 1024
+
+SAMPLE_RATE = 44100
+AUDIO_FORMAT = 'wav-44100-mono-s16-trimmed'  # part of the cache key
+
+# Pauses inserted after a segment, in seconds
+WORD_GAP = 0.08  # between phrases of one sentence
+SENTENCE_GAP = 0.35  # between sentences (the default for plain text segments)
+
+# Trim silence below -50dB from both ends of every segment
+TRIM_FILTER = ('silenceremove=start_periods=1:start_threshold=-50dB,areverse,'
+               'silenceremove=start_periods=1:start_threshold=-50dB,areverse')
+
+
+class ElevenLabsEngine:
+    """ElevenLabs text-to-speech"""
+
+    name = 'elevenlabs'
+
+    def __init__(self, voice_id, model_id='eleven_turbo_v2_5', voice_settings=None, **options):
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.voice_settings = dict(voice_settings or {})
+        self.options = options  # extra convert() arguments, e.g. output_format
+        self._client = None
+
+    def key(self):
+        return {'voice_id': self.voice_id, 'model_id': self.model_id,
+                'voice_settings': self.voice_settings, 'options': self.options}
+
+    def synthesize(self, text):
+        """Encoded audio (mp3) for `text`"""
+        from elevenlabs import VoiceSettings
+        from elevenlabs.client import ElevenLabs
+
+        api_key = os.getenv('ELEVENLABS_API_KEY')
+        if not api_key:
+            raise RuntimeError("ELEVENLABS_API_KEY not set")
+
+        if self._client is None:
+            # One client per engine keeps the HTTP connection alive between phrases
+            self._client = ElevenLabs(api_key=api_key, base_url=os.getenv('ELEVENLABS_BASE_URL') or None)
+        audio_generator = self._client.text_to_speech.convert(
+            voice_id=self.voice_id,
+            text=text,
+            model_id=self.model_id,
+            voice_settings=VoiceSettings(**self.voice_settings),
+            **self.options
+        )
+        return b''.join(chunk for chunk in audio_generator if chunk)
+
+
+class GTTSEngine:
+    """Google Translate text-to-speech"""
+
+    name = 'gtts'
+
+    def __init__(self, lang='en', slow=False):
+        self.lang = lang
+        self.slow = slow
+
+    def key(self):
+        return {'lang': self.lang, 'slow': self.slow}
+
+    def synthesize(self, text):
+        """Encoded audio (mp3) for `text`"""
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.lang, slow=self.slow).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class StubEngine:
+    """Offline stand-in: a quiet tone lasting ~`seconds_per_word` per word"""
+
+    name = 'stub'
+
+    def __init__(self, seconds_per_word=0.4, frequency=220.0):
+        self.seconds_per_word = seconds_per_word
+        self.frequency = frequency
+
+    def key(self):
+        return {'seconds_per_word': self.seconds_per_word, 'frequency': self.frequency}
+
+    def synthesize(self, text):
+        """WAV bytes whose length scales with the word count"""
+        seconds = max(1, len(text.split())) * self.seconds_per_word
+        t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+        samples = (0.1 * 32767 * np.sin(2 * np.pi * self.frequency * t)).astype('<i2')
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(SAMPLE_RATE)
+            f.writeframes(samples.tobytes())
+        return buffer.getvalue()
+
+
+def engine_from_env(default):
+    """`default`, unless CARATCOMPARE_TTS=stub asks for the offline stub"""
+    if os.environ.get('CARATCOMPARE_TTS', '').lower() == 'stub':
+        return StubEngine()
+    return default
+
+
+def cache_key(engine, text):
+    """Content address for one synthesized part"""
+    payload = json.dumps({'engine': engine.name, 'params': engine.key(), 'text': text,
+                          'format': AUDIO_FORMAT}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def decode_to_wav(audio, wav_path):
+    """Decode any ffmpeg-readable audio bytes to trimmed 44.1kHz mono 16-bit WAV"""
+    cmd = [FFMPEG_BINARY, '-y', '-loglevel', 'error', '-i', 'pipe:0', '-af', TRIM_FILTER,
+           '-ar', str(SAMPLE_RATE), '-ac', '1', '-c:a', 'pcm_s16le', '-f', 'wav', str(wav_path)]
+    result = subprocess.run(cmd, input=audio, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise IOError(f"ffmpeg could not decode narration: {result.stderr.decode(errors='replace').strip()}")
+
+
+def wav_duration(path):
+    """Length of a WAV file in seconds"""
+    with wave.open(str(path), 'rb') as f:
+        return f.getnframes() / f.getframerate()
+
+
+def join_wavs(paths, output_path, gaps=SENTENCE_GAP, lead=0.0):
+    """
+    Concatenate WAVs sample-accurately
+
+    Args:
+        paths: WAV files sharing one sample format
+        output_path: Destination .wav
+        gaps: Seconds of silence after each file but the last (a list, or one value for all)
+        lead: Seconds of silence before the first file
+    """
+    if not isinstance(gaps, (list, tuple)):
+        gaps = [gaps] * (len(paths) - 1)
+    gaps = [lead] + list(gaps)
+    params = None
+    with wave.open(str(output_path), 'wb') as out:
+        for i, path in enumerate(paths):
+            with wave.open(str(path), 'rb') as part:
+                if params is None:
+                    params = part.getparams()
+                    out.setparams(params)
+                elif part.getparams()[:3] != params[:3]:
+                    raise ValueError(f"{path}: sample format differs from {paths[0]}")
+                if gaps[i] > 0:
+                    silence = int(round(gaps[i] * params.framerate)) * params.nchannels * params.sampwidth
+                    out.writeframes(b'\0' * silence)
+                out.writeframes(part.readframes(part.getnframes()))
+    return output_path
+
+
+class NarrationCache:
+    """Disk cache of decoded narration parts for one TTS engine"""
+
+    def __init__(self, engine, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.engine = engine
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def entry(self, text):
+        """Where the decoded WAV for `text` lives (whether or not it exists yet)"""
+        return self.cache_dir / f"{self.engine.name}-{cache_key(self.engine, text)[:32]}.wav"
+
+    def cached(self, text):
+        """Decoded WAV for `text` if it is already cached, else None"""
+        wav_path = self.entry(text)
+        try:
+            os.utime(wav_path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        self.hits += 1
+        return wav_path
+
+    def path(self, text):
+        """Decoded WAV for `text`, synthesizing it only on a cache miss"""
+        wav_path = self.cached(text)
+        if wav_path is None:
+            self.misses += 1
+            wav_path = self.store(text, self.engine.synthesize(text))
+        return wav_path
+
+    def store(self, text, audio):
+        """Decode synthesized `audio` for `text` into the cache; returns the WAV path"""
+        wav_path = self.entry(text)
+
+        # Decode next to the cache entry, then publish atomically
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.wav.tmp')
+        os.close(fd)
+        try:
+            decode_to_wav(audio, tmp_path)
+            os.replace(tmp_path, wav_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self.evict()
+        return wav_path
+
+    def narrate(self, segments):
+        """
+        Join the cached audio for each segment into a new temporary WAV; returns its path
+
+        Segments are plain text (followed by a SENTENCE_GAP pause) or
+        (text, pause after in seconds) pairs.
+        """
+        segments = [(s, SENTENCE_GAP) if isinstance(s, str) else s for s in segments]
+        part_paths = [self.path(text) for text, _ in segments]
+        fd, output_path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        return join_wavs(part_paths, output_path, [pause for _, pause in segments[:-1]])
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for path in self.cache_dir.glob('*.wav'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # evicted by another worker
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
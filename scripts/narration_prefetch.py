@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Narration Prefetcher for Batch Runs
+Synthesizes narration ahead of the renderer so network time overlaps rendering
+
+Without it every video blocks on its TTS calls before the first frame is
+drawn. The prefetcher keeps up to `concurrency` synthesis requests in
+flight on an asyncio loop and fills the NarrationCache; batch_render hands
+each video to a render worker as soon as its phrases are cached, so the
+worker's own narration step is a local join of cache hits.
+
+Phrases shared between videos (the fixed template segments, a diamond
+that appears in several comparisons) are requested once even while
+in flight. Rate limits (429), server errors and dropped connections are
+retried with exponential backoff and jitter; anything else fails the video
+straight away.
+
+Point ELEVENLABS_BASE_URL at a local server to run a batch against a fake
+ElevenLabs API.
+
+Usage:
+    prefetcher = NarrationPrefetcher(engine, concurrency=4)
+    run_batch(render_job, comparisons,
+              prefetch=lambda job: prefetcher.prefetch(narration_segments(*job)))
+"""
+
+import asyncio
+import random
+
+from narration_cache import CACHE_DIR, NarrationCache
+
+# HTTP statuses worth retrying: timeouts, rate limiting, server trouble
+RETRY_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+def is_transient(error):
+    """Whether a synthesis error is worth retrying"""
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        return status in RETRY_STATUS
+    # Network failures: socket errors, or httpx transport errors from the ElevenLabs SDK
+    return isinstance(error, (OSError, TimeoutError)) or type(error).__module__.startswith('httpx')
+
+
+def retry_delay(error, attempt, backoff):
+    """Seconds to wait before retry `attempt` (0-based); honours Retry-After"""
+    headers = getattr(error, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after') or headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+
+
+class NarrationPrefetcher:
+    """Fills a NarrationCache with concurrent, retried synthesis requests"""
+
+    def __init__(self, engine, cache_dir=CACHE_DIR, concurrency=4, retries=4, backoff=1.0):
+        self.cache = NarrationCache(engine, cache_dir)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.synthesized = 0
+        self.retried = 0
+        self._slots = None
+        self._phrases = {}  # text -> task, so shared phrases are fetched once
+
+    async def prefetch(self, segments):
+        """Make sure every segment (text or (text, pause)) of one narration is cached"""
+        texts = [s if isinstance(s, str) else s[0] for s in segments]
+        await asyncio.gather(*(self.phrase(text) for text in texts))
+
+    async def phrase(self, text):
+        """Cached WAV path for `text`, synthesizing it if needed"""
+        task = self._phrases.get(text)
+        if task is None:
+            task = self._phrases[text] = asyncio.ensure_future(self._fetch(text))
+        return await task
+
+    async def _fetch(self, text):
+        wav_path = self.cache.cached(text)
+        if wav_path is not None:
+            return wav_path
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        async with self._slots:
+            audio = await self._synthesize(text)
+        self.synthesized += 1
+        return await asyncio.to_thread(self.cache.store, text, audio)
+
+    async def _synthesize(self, text):
+        """engine.synthesize on a worker thread, retrying transient failures"""
+        for attempt in range(self.retries + 1):
+            try:
+                return await asyncio.to_thread(self.cache.engine.synthesize, text)
+            except Exception as e:
+                if attempt == self.retries or not is_transient(e):
+                    raise
+                delay = retry_delay(e, attempt, self.backoff)
+                self.retried += 1
+                status = getattr(e, 'status_code', None)
+                reason = f"HTTP {status}" if status else type(e).__name__
+                print(f"   ⚠ TTS {reason} for '{text}' - retry {attempt + 1}/{self.retries} in {delay:.1f}s",
+                      flush=True)
+                await asyncio.sleep(delay)
+
+    def summary(self):
+        """One line of prefetch totals"""
+        return (f"Narration: {self.cache.hits} phrases cached, {self.synthesized} synthesized, "
+                f"{self.retried} retries")
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Render-to-Upload Pipeline
+Uploads each video as soon as it is rendered, keeping only a few on disk
+
+Rendering the whole catalog into generated_videos/ and then running
+upload_to_youtube.py means the first upload waits for the last render
+and every video sits on disk at once. Here the render workers and the
+uploader run together: each finished video is handed to the upload
+scheduler through a queue, and once YouTube has confirmed it (and the
+upload ledger has recorded it) the files can be deleted or moved to an
+archive folder.
+
+The pipeline holds at most `buffer` videos between render and confirmed
+upload. When the uploads fall behind (they usually do, the API quota
+allows 6 a day by default) rendering pauses until an upload frees a
+slot, so disk use stays bounded however long the backlog is. When the
+day's quota is spent the run stops (or waits for the reset with --wait);
+videos already rendered stay on disk and go up first on the next run.
+
+Comparisons already in the upload ledger are skipped, and videos already
+rendered from the same inputs (render manifest) go straight to the
+uploader.
+
+Usage:
+    python3 scripts/publish_pipeline.py                                   # the pilot comparisons
+    python3 scripts/publish_pipeline.py --catalog --limit 100 --after-upload delete
+    python3 scripts/publish_pipeline.py --catalog --wait --after-upload archive  # runs across quota days
+"""
+
+import argparse
+import queue
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import generate_videos
+from batch_render import default_workers, encoder_threads, warm_worker
+from catalog import CATALOG_LIMIT, catalog
+from fonts import preload
+from generate_videos import PILOT_COMPARISONS, job_hash, render_comparison, video_slug
+from job_manifest import Manifest
+from metadata_engine import MetadataStore, compact_metadata, generate_batch, write_metadata
+from upload_ledger import UploadLedger
+from upload_scheduler import DAILY_QUOTA, QuotaBucket, UploadScheduler, describe_plan
+from upload_to_youtube import LEDGER_FILE, QUOTA_FILE, get_credentials, upload_job
+from video_writer import BACKENDS, DEFAULT_BACKEND, PROFILES
+
+ARCHIVE_DIR = generate_videos.OUTPUT_DIR / 'uploaded'
+AFTER_UPLOAD = ('keep', 'delete', 'archive')
+
+
+def video_files(video_path):
+    """The video and its metadata file (videos rendered before metadata.jsonl had one)"""
+    return [video_path, video_path.with_name(f"{video_path.stem}_metadata.json")]
+
+
+def clean_up(video_path, after_upload, archive_dir=ARCHIVE_DIR):
+    """Delete or archive an uploaded video and its metadata"""
+    if after_upload == 'delete':
+        for path in video_files(video_path):
+            path.unlink(missing_ok=True)
+    elif after_upload == 'archive':
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        for path in video_files(video_path):
+            if path.exists():
+                shutil.move(path, archive_dir / path.name)
+
+
+class RenderFeed:
+    """
+    Renders comparisons on a process pool and yields each finished video
+
+    At most `buffer` videos are rendering or waiting for their upload;
+    `release(video_path)` frees a video's slot once its upload is settled
+    or put off until the quota resets (releasing twice is harmless).
+    """
+
+    def __init__(self, render_job, jobs, workers, buffer):
+        self.render_job = render_job
+        self.jobs = jobs  # (comparison, already rendered?)
+        self.workers = workers
+        self.slots = threading.Semaphore(buffer)
+        self.ready = queue.Queue()
+        self.stopped = threading.Event()
+        self.failed = []
+        self._holding = set()  # videos yielded whose slot is still taken
+        self._lock = threading.Lock()
+        self._drained = False
+        self._thread = threading.Thread(target=self._feed, daemon=True)
+
+    def __iter__(self):
+        self._thread.start()
+        while True:
+            video_path = self.ready.get()
+            if video_path is None:
+                self._drained = True
+                return
+            yield video_path
+
+    def _feed(self):
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker,
+                                 initargs=((45, 50, 90),)) as pool:
+            for comparison, rendered in self.jobs:
+                # Backpressure: wait until an upload frees a slot
+                while not self.slots.acquire(timeout=1):
+                    if self.stopped.is_set():
+                        break
+                if self.stopped.is_set():
+                    break
+                if rendered:
+                    self._hand_over(generate_videos.OUTPUT_DIR / f"{video_slug(*comparison)}.mp4")
+                    continue
+                future = pool.submit(self.render_job, comparison)
+                future.add_done_callback(partial(self._rendered, comparison))
+            if self.stopped.is_set():
+                pool.shutdown(wait=True, cancel_futures=True)
+        self.ready.put(None)
+
+    def _rendered(self, comparison, future):
+        if future.cancelled():
+            return
+        slug = video_slug(*comparison)
+        try:
+            future.result()
+        except Exception as e:
+            print(f"✗ Render failed: {slug} - {e}", flush=True)
+            self.failed.append((slug, str(e)))
+            self.slots.release()
+            return
+        print(f"🎬 Rendered {slug}", flush=True)
+        self._hand_over(generate_videos.OUTPUT_DIR / f"{slug}.mp4")
+
+    def _hand_over(self, video_path):
+        with self._lock:
+            self._holding.add(video_path)
+        self.ready.put(video_path)
+
+    def release(self, video_path):
+        """A video no longer needs its slot (uploaded, failed, or waiting for the quota)"""
+        with self._lock:
+            if video_path not in self._holding:
+                return
+            self._holding.remove(video_path)
+        self.slots.release()
+
+    def stop(self):
+        """Stop rendering; waits for the renders in progress, which stay on disk"""
+        self.stopped.set()
+        while not self._drained:
+            self._drained = self.ready.get() is None
+        self._thread.join()
+
+
+def publish(comparisons, workers=None, upload_workers=2, buffer=None, after_upload='keep',
+            archive_dir=ARCHIVE_DIR, daily_quota=DAILY_QUOTA, wait=False, backend=DEFAULT_BACKEND,
+            profile=None, templates=False):
+    """
+    Render and upload comparisons in one pipeline
+
+    Args:
+        comparisons: (carat1, shape1, carat2, shape2) tuples in upload order
+        workers: Render processes (default: one per core)
+        upload_workers: Uploads running at once
+        buffer: Videos allowed between render and confirmed upload (default: 2 per upload worker;
+            at least `upload_workers`, or uploads would wait on renders that can't start)
+        after_upload: 'keep', 'delete' or 'archive' the files once the upload is confirmed
+        archive_dir: Where 'archive' moves them
+        daily_quota: The project's YouTube API quota in units per day
+        wait: Keep running across quota resets
+        backend, profile, templates: Render settings, as in generate_videos.py
+    """
+    workers = workers or default_workers()
+    buffer = buffer or 2 * upload_workers
+    if buffer < upload_workers:
+        raise ValueError(f"buffer ({buffer}) must be at least upload_workers ({upload_workers})")
+    generate_videos.OUTPUT_DIR.mkdir(exist_ok=True)
+
+    ledger = UploadLedger(LEDGER_FILE)
+    manifest = Manifest(generate_videos.MANIFEST_PATH)
+    manifest.compact()
+    compact_metadata(generate_videos.METADATA_PATH)
+    write_metadata(generate_batch(comparisons), generate_videos.METADATA_PATH)
+    jobs, uploaded = [], 0
+    for comparison in comparisons:
+        slug = video_slug(*comparison)
+        if ledger.uploaded(slug):
+            uploaded += 1
+            continue
+        comparison_hash = job_hash(comparison, backend, profile)
+        jobs.append((comparison, manifest.is_current(slug, comparison_hash)))
+    jobs.sort(key=lambda job: not job[1])  # videos rendered by an earlier run go up first
+    rendered = sum(1 for _, ready in jobs if ready)
+    print(f"{len(comparisons)} comparisons: {uploaded} already uploaded, {rendered} rendered and waiting, "
+          f"{len(jobs) - rendered} to render")
+    if not jobs:
+        print("✓ Nothing new to publish")
+        return
+
+    bucket = QuotaBucket(daily_quota, QUOTA_FILE)
+    print(describe_plan(bucket, len(jobs)))
+    print(f"Rendering on {workers} workers, uploading on {upload_workers}, "
+          f"at most {buffer} videos waiting for upload\n")
+
+    render_job = partial(render_comparison, threads=encoder_threads(workers), quiet=True,
+                         backend=backend, profile=profile, templates=templates)
+    feed = RenderFeed(render_job, jobs, workers, buffer)
+    upload = upload_job(get_credentials(), ledger, MetadataStore(generate_videos.METADATA_PATH), quiet=True)
+
+    def upload_and_release(video_path):
+        # A quota error also frees the slot: the scheduler keeps the path and retries it after the reset
+        try:
+            video_id = upload(video_path)
+        except Exception:
+            feed.release(video_path)
+            raise
+        clean_up(video_path, after_upload, archive_dir)
+        feed.release(video_path)
+        return video_id
+
+    scheduler = UploadScheduler(upload_and_release, bucket, workers=upload_workers, wait=wait,
+                                name=lambda path: path.stem)
+    progress, left = scheduler.run(feed, total=len(jobs))
+    feed.stop()
+
+    published = progress.done - len(progress.failed)
+    print(f"✓ Published {published} videos")
+    for slug, error in feed.failed:
+        print(f"✗ Render failed: {slug} - {error}")
+    if len(jobs) > published:
+        print(f"⏸ {len(jobs) - published} comparisons left - run again to continue"
+              + ("" if wait else " after the quota reset, or use --wait"))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Render comparison videos and upload each one as soon as it's done")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Parallel render processes (default: one per CPU core)")
+    parser.add_argument('--upload-workers', type=int, default=2, help="Uploads running at once (default: %(default)s)")
+    parser.add_argument('--buffer', type=int, default=None,
+                        help="Videos allowed between render and confirmed upload (default: 2 per upload worker)")
+    parser.add_argument('--after-upload', choices=AFTER_UPLOAD, default='keep',
+                        help="What to do with a video's files once its upload is confirmed (default: %(default)s)")
+    parser.add_argument('--archive-dir', type=Path, default=ARCHIVE_DIR,
+                        help="Where --after-upload archive moves files (default: %(default)s)")
+    parser.add_argument('--catalog', action='store_true',
+                        help="Publish the site's comparison catalog in priority order instead of the pilots")
+    parser.add_argument('--limit', type=int, default=CATALOG_LIMIT,
+                        help="With --catalog, only the first N comparisons (default: %(default)s)")
+    parser.add_argument('--quota', type=int, default=DAILY_QUOTA,
+                        help="Daily API quota in units (default: %(default)s)")
+    parser.add_argument('--wait', action='store_true',
+                        help="Wait for quota resets instead of stopping when the quota is spent")
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="Video writer: direct ffmpeg pipe or MoviePy (default: %(default)s)")
+    parser.add_argument('--profile', choices=PROFILES, default=None,
+                        help="Encoder profile (default: x264 defaults at preset medium)")
+    parser.add_argument('--template', action='store_true',
+                        help="Reuse the pre-encoded intro and outro segments; only the comparison is rendered")
+    args = parser.parse_args()
+    if args.buffer is not None and args.buffer < args.upload_workers:
+        parser.error("--buffer must be at least --upload-workers")
+
+    print("Render-to-Upload Pipeline")
+    print("=" * 50)
+    preload()
+    comparisons = PILOT_COMPARISONS
+    if args.catalog:
+        comparisons = [entry.comparison for entry in catalog(args.limit)]
+    publish(comparisons, workers=args.workers, upload_workers=args.upload_workers, buffer=args.buffer,
+            after_upload=args.after_upload, archive_dir=args.archive_dir, daily_quota=args.quota,
+            wait=args.wait, backend=args.backend, profile=args.profile, templates=args.template)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Scene Engine for the Video Generators
+Precomposes the static part of each scene once and only blends the
+moving or fading layers per frame
+
+Each video is a Timeline of Scenes. A Scene is a background plus layers;
+layers whose position, opacity and scale are constants are baked into the
+scene's static base the first time it renders. Animated layers are blended
+on top of that base in the timeline's reusable FrameBuffer (see
+compositor.py), and when their state (position, opacity, scale) is
+unchanged from the previous frame the previous frame is returned as-is, so
+holds and settled scenes cost nothing to render.
+
+Static layers are always drawn beneath animated ones.
+
+Usage:
+    intro = Scene(bg, duration=3)
+    intro.add(logo, (x, y), opacity=fade(0, 0.5, out_at=2.5))
+
+    timeline = Timeline([intro, comparison, outro], fps=30)
+    clip = VideoClip(timeline.make_frame, duration=timeline.duration)
+
+`Timeline.frame_key(t)` tells which frames are identical without drawing
+them, so writers can skip repeats (see video_writer.py).
+
+Scenes that look the same in every video (the logo intro, the outro) are
+built with `shared=True`; segment_render.py can then reuse their encoded
+segment across videos, keyed on `Scene.fingerprint()`.
+"""
+
+import hashlib
+from bisect import bisect_right
+
+import numpy as np
+from PIL import Image
+
+from compositor import FrameBuffer, Sprite
+
+
+def ramp(start, length):
+    """Curve rising linearly from 0 at `start` to 1 after `length` seconds"""
+    def value(t):
+        if length <= 0:
+            return 1.0 if t >= start else 0.0
+        return min(1.0, max(0.0, (t - start) / length))
+    return value
+
+
+def fade(start, length, out_at=None, out_length=None):
+    """Opacity curve: fade in from `start`, optionally fade out from `out_at`"""
+    fade_in = ramp(start, length)
+    if out_at is None:
+        return fade_in
+    fade_out = ramp(out_at, out_length if out_length is not None else length)
+
+    def value(t):
+        return min(fade_in(t), 1.0 - fade_out(t))
+    return value
+
+
+def slide(start_pos, end_pos, progress):
+    """Position moving from `start_pos` to `end_pos` along a 0-1 progress curve"""
+    (x0, y0), (x1, y1) = start_pos, end_pos
+
+    def value(t):
+        p = progress(t)
+        return x0 + (x1 - x0) * p, y0 + (y1 - y0) * p
+    return value
+
+
+def _at(value, t):
+    return value(t) if callable(value) else value
+
+
+class Layer:
+    """A sprite placed on a scene, optionally moving, fading or scaling"""
+
+    def __init__(self, image, position, opacity=1.0, scale=1.0, start=0.0):
+        self.image = image
+        self.position = position
+        self.opacity = opacity
+        self.scale = scale
+        self.start = start
+        self._sprite = None
+
+    @property
+    def static(self):
+        """True when the layer looks the same for the whole scene"""
+        if self.start > 0:
+            return False
+        return not any(callable(v) for v in (self.position, self.opacity, self.scale))
+
+    def state(self, t):
+        """Return the (x, y, alpha, scale) the layer is drawn with at time t, or None if hidden"""
+        if t < self.start:
+            return None
+
+        alpha = int(round(255 * min(1.0, max(0.0, _at(self.opacity, t)))))
+        scale = round(_at(self.scale, t), 3)
+        if alpha <= 0 or scale <= 0:
+            return None
+
+        x, y = _at(self.position, t)
+        return int(x), int(y), alpha, scale
+
+    def draw(self, buffer, state):
+        """Blend the layer into a FrameBuffer in the given state"""
+        if state is None:
+            return
+        x, y, alpha, scale = state
+
+        if scale == 1:
+            if self._sprite is None:
+                self._sprite = Sprite(self.image)
+            sprite = self._sprite
+        else:
+            size = (int(self.image.width * scale), int(self.image.height * scale))
+            if size[0] <= 0 or size[1] <= 0:
+                return
+            # Scale around the sprite's centre
+            x += (self.image.width - size[0]) // 2
+            y += (self.image.height - size[1]) // 2
+            sprite = Sprite(self.image.resize(size, Image.Resampling.LANCZOS))
+
+        buffer.blend(sprite, x, y, alpha / 255)
+
+
+class Scene:
+    """One section of the timeline: a background, static layers and animated layers"""
+
+    def __init__(self, background, duration, shared=False):
+        self.background = background
+        self.duration = duration
+        self.shared = shared  # identical in every video, so its encoded segment can be reused
+        self.layers = []
+        self._base = None
+
+    def add(self, image, position, opacity=1.0, scale=1.0, start=0.0):
+        """Add a layer; returns the scene so calls can be chained"""
+        self.layers.append(Layer(image, position, opacity, scale, start))
+        self._base = None
+        return self
+
+    def state(self, t):
+        """Drawing state of every animated layer at scene time t"""
+        return tuple(layer.state(t) for layer in self.layers if not layer.static)
+
+    def fingerprint(self):
+        """Hash of everything that decides the scene's pixels, apart from the animated layers' states"""
+        digest = hashlib.sha256()
+        for image in [self.background] + [layer.image for layer in self.layers]:
+            digest.update(repr((image.mode, image.size)).encode())
+            digest.update(image.tobytes())
+        for layer in self.layers:
+            digest.update(repr((layer.static, layer.start, layer.state(0) if layer.static else None)).encode())
+        return digest.hexdigest()
+
+    def _static_base(self, buffer):
+        """Background with every static layer composited, built once"""
+        if self._base is None:
+            buffer.load(np.asarray(self.background.convert('RGB')))
+            for layer in self.layers:
+                if layer.static:
+                    layer.draw(buffer, layer.state(0))
+            self._base = buffer.pixels.copy()
+            self._base.setflags(write=False)
+        return self._base
+
+    def compose(self, states, buffer):
+        """Compose a frame from `state()` output; returns an RGB ndarray"""
+        base = self._static_base(buffer)
+        if all(state is None for state in states):
+            return base
+
+        buffer.load(base)
+        animated = [layer for layer in self.layers if not layer.static]
+        for layer, state in zip(animated, states):
+            layer.draw(buffer, state)
+        return buffer.pixels
+
+    def render(self, t, buffer):
+        """Frame at scene time t"""
+        return self.compose(self.state(t), buffer)
+
+
+class Timeline:
+    """
+    Scenes played back to back; `make_frame` plugs straight into VideoClip
+
+    The video is `frame_count` frames at `fps`, each scene rounded to whole
+    frames; `duration` is exactly frame_count / fps, so every writer encodes
+    the same number of frames. Frames are mapped to scenes by frame number
+    (`start_frames`), never by comparing float times, so a whole video and
+    its per-scene segments agree on which scene every frame belongs to.
+    """
+
+    def __init__(self, scenes, fps):
+        self.scenes = list(scenes)
+        self.fps = fps
+        self.start_frames = []
+        frame = 0
+        for scene in self.scenes:
+            self.start_frames.append(frame)
+            frame += round(scene.duration * fps)
+        self.frame_count = frame
+        self.starts = [n / fps for n in self.start_frames]
+        self.duration = frame / fps
+        self.buffer = None
+        self._last_key = None
+        self._last_frame = None
+
+    def scene_at_frame(self, n):
+        """Return (index, scene time) for frame number n"""
+        index = max(0, min(bisect_right(self.start_frames, n) - 1, len(self.scenes) - 1))
+        return index, (n - self.start_frames[index]) / self.fps
+
+    def scene_at(self, t):
+        """Return (index, scene time) for timeline time t, snapped to its frame"""
+        return self.scene_at_frame(round(t * self.fps))
+
+    def frame_key_at(self, n):
+        """Hashable description of frame n; equal keys mean identical frames"""
+        index, local_t = self.scene_at_frame(n)
+        return index, self.scenes[index].state(local_t)
+
+    def frame_key(self, t):
+        """frame_key_at() for the frame at timeline time t"""
+        return self.frame_key_at(round(t * self.fps))
+
+    def make_frame(self, t):
+        """Frame at timeline time t (see frame_at)"""
+        return self.frame_at(round(t * self.fps))
+
+    def frame_at(self, n):
+        """
+        Frame number n
+
+        The returned array is the timeline's frame buffer (or a scene's
+        read-only base) and is only valid until the next call.
+        """
+        key = self.frame_key_at(n)
+        scene = self.scenes[key[0]]
+
+        if key != self._last_key:
+            if self.buffer is None:
+                width, height = scene.background.size
+                self.buffer = FrameBuffer(width, height)
+            self._last_frame = scene.compose(key[1], self.buffer)
+            self._last_key = key
+        return self._last_frame
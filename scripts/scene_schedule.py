@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Narration-Driven Scene Scheduler
+Sizes every scene to the narration spoken over it
+
+Scene lengths used to be hard-coded (7s intro, 6s comparison, 5s outro)
+whatever the voice actually said, so most videos carried seconds of dead
+air - frames that still had to be rendered and encoded. Here each scene
+gets a Cue: the narration segments spoken over it, a lead-in before the
+speech, a tail after it and a minimum (its animation time). The segments
+are measured from the NarrationCache, each scene lasts exactly as long as
+its cue needs, and the narration track is assembled with the silence
+placed so every scene's speech starts on cue.
+
+Scene lengths are rounded up to whole frames so scene boundaries, audio
+and segment renders agree.
+
+Usage:
+    plan = schedule(cache, [
+        Cue(minimum=3),                                   # logo, no speech
+        Cue(intro_segments, minimum=1.5, lead=0.3, tail=0.5),
+        Cue(minimum=5),                                   # visual hold
+        Cue([OUTRO], minimum=1.5, lead=0.3, tail=0.5),
+    ], fps=30)
+    plan.durations      # seconds per scene
+    plan.audio_path     # temporary .wav, caller deletes
+"""
+
+import math
+import os
+import tempfile
+from collections import namedtuple
+
+from narration_cache import SENTENCE_GAP, join_wavs, wav_duration
+
+# Narration spoken over one scene, and how much room to leave around it
+Cue = namedtuple('Cue', 'segments minimum lead tail', defaults=((), 0.0, 0.0, 0.0))
+
+Schedule = namedtuple('Schedule', 'durations starts audio_path duration')
+
+
+def frames_ceil(seconds, fps):
+    """`seconds` rounded up to a whole number of frames"""
+    return math.ceil(round(seconds * fps, 6)) / fps
+
+
+def schedule(cache, cues, fps):
+    """
+    Scene durations and a matching narration track
+
+    Args:
+        cache: NarrationCache to measure (and synthesize) the segments with
+        cues: One Cue per scene, in timeline order; segments are text or (text, pause) pairs
+        fps: Frame rate the scenes are rounded to
+
+    Returns:
+        Schedule with per-scene durations and start times, the joined WAV path
+        (None if no cue has speech) and the total duration
+    """
+    durations, starts, paths, gaps = [], [], [], []
+    lead = None
+    position = 0.0  # end of the last segment written
+    start = 0.0
+
+    for cue in cues:
+        segments = [(s, SENTENCE_GAP) if isinstance(s, str) else s for s in cue.segments]
+        speech = 0.0
+        for i, (text, pause) in enumerate(segments):
+            path = cache.path(text)
+            at = start + cue.lead + speech  # where this segment starts on the timeline
+            if lead is None:
+                lead = at
+            else:
+                gaps.append(at - position)
+            paths.append(path)
+            speech += wav_duration(path)
+            position = start + cue.lead + speech
+            if i < len(segments) - 1:
+                speech += pause
+
+        duration = cue.minimum
+        if segments:
+            duration = max(duration, cue.lead + speech + cue.tail)
+        duration = frames_ceil(duration, fps)
+
+        starts.append(start)
+        durations.append(duration)
+        start += duration
+
+    audio_path = None
+    if paths:
+        fd, audio_path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        join_wavs(paths, audio_path, gaps, lead=lead)
+
+    return Schedule(durations, starts, audio_path, start)
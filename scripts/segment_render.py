@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Parallel Segment Renderer
+Uses every core for a single video
+
+A Timeline already knows its scene boundaries (logo, intro, comparison,
+outro). Each scene becomes a segment that a worker process renders and
+encodes on its own; the segments are then joined with ffmpeg's concat
+demuxer using stream copy (no re-encode) and the narration is muxed in
+last.
+
+Workers can't receive the timeline itself (make_frame closures don't
+pickle), so they rebuild it from a module-level builder function and its
+arguments:
+
+    render_segments(build_timeline, (1.0, 'princess', 2.0, 'heart'),
+                    output_path, fps=30, audio_path=narration_mp3)
+
+Template mode: scenes built with `Scene(..., shared=True)` (the logo
+intro, the outro) look the same in every video. With `templates=True`
+their encoded segment is kept in .cache/templates (or
+CARATCOMPARE_CACHE_DIR) and stitched into later videos as-is, so only
+the comparison-specific scenes are rendered. Templates are keyed on the
+scene's pixels, every frame's layer state and the encoder settings, so a
+brand or timing change renders a fresh template automatically.
+`render_timeline` does the same in-process for batch workers that
+already render one video per core.
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from moviepy.config import FFMPEG_BINARY
+
+from job_manifest import atomic_output
+from video_writer import DEFAULT_BACKEND, encoder_profile, write_video
+
+PROJECT_ROOT = Path(__file__).parent.parent
+TEMPLATE_DIR = Path(os.environ.get('CARATCOMPARE_CACHE_DIR', PROJECT_ROOT / '.cache')) / 'templates'
+
+
+# Part of every template key; bump it to orphan templates cached by older code
+# (2: frames mapped to scenes by frame number, so an edge frame can't come from the next scene)
+TEMPLATE_FORMAT = 2
+
+
+def scene_segments(timeline):
+    """(scene index, start_frame, end_frame) for every scene that has frames"""
+    edges = timeline.start_frames + [timeline.frame_count]
+    return [(i, a, b) for i, (a, b) in enumerate(zip(edges, edges[1:])) if b > a]
+
+
+def segment_bounds(timeline):
+    """Scene boundaries as (start_frame, end_frame) pairs"""
+    return [(a, b) for _, a, b in scene_segments(timeline)]
+
+
+def _encode(timeline, start_frame, end_frame, fps, segment_path, preset, backend, profile, threads):
+    """Encode frames [start_frame, end_frame) of a timeline"""
+
+    def frame_number(t):
+        return start_frame + round(t * fps)
+
+    write_video(
+        lambda t: timeline.frame_at(frame_number(t)),
+        (end_frame - start_frame) / fps,
+        segment_path,
+        fps=fps,
+        backend=backend,
+        preset=preset,
+        threads=threads,
+        logger=None,
+        profile=profile,
+        frame_key=lambda t: timeline.frame_key_at(frame_number(t))
+    )
+    return segment_path
+
+
+def _render_segment(build_timeline, build_args, start_frame, end_frame, fps, segment_path, preset,
+                    backend, profile=None):
+    """Worker: rebuild the timeline and encode frames [start_frame, end_frame)"""
+    return _encode(build_timeline(*build_args), start_frame, end_frame, fps, segment_path,
+                   preset, backend, profile, threads=1)
+
+
+def template_path(timeline, index, start_frame, end_frame, fps, preset, backend, profile):
+    """Template cache entry for a shared scene's segment"""
+    scene = timeline.scenes[index]
+    digest = hashlib.sha256(scene.fingerprint().encode())
+    digest.update(repr((TEMPLATE_FORMAT, fps, end_frame - start_frame, backend,
+                        encoder_profile(profile, preset))).encode())
+    for n in range(start_frame, end_frame):
+        frame_scene, state = timeline.frame_key_at(n)
+        # A frame from a neighbouring scene would bake this video's pixels into every later video
+        if frame_scene != index:
+            raise ValueError(f"frame {n} belongs to scene {frame_scene}, not shared scene {index}")
+        digest.update(repr(state).encode())
+    return TEMPLATE_DIR / f"{digest.hexdigest()[:32]}.mp4"
+
+
+def _publish(segment_path, template):
+    """Copy a freshly encoded segment into the template cache atomically (world-readable, for shared caches)"""
+    with atomic_output(template) as tmp_path:
+        shutil.copyfile(segment_path, tmp_path)
+
+
+def _plan(timeline, fps, work_dir, templates, preset, backend, profile):
+    """
+    Segment paths for the whole video, plus the segments still to encode
+
+    Returns:
+        (segment_paths, pending) where pending holds (start_frame, end_frame,
+        segment_path, template or None) for every segment that isn't cached
+    """
+    if fps != timeline.fps:
+        raise ValueError(f"rendering at {fps} fps, but the timeline is built for {timeline.fps} fps")
+    segment_paths, pending = [], []
+    for index, start, end in scene_segments(timeline):
+        segment_path = work_dir / f"segment_{index:02d}.mp4"
+        template = None
+        if templates and timeline.scenes[index].shared:
+            template = template_path(timeline, index, start, end, fps, preset, backend, profile)
+            if template.exists():
+                segment_paths.append(template)
+                continue
+        segment_paths.append(segment_path)
+        pending.append((start, end, segment_path, template))
+    return segment_paths, pending
+
+
+def concat_segments(segment_paths, output_path, audio_path=None, duration=None):
+    """Join encoded segments with stream copy, optionally muxing in an audio track"""
+    list_path = Path(output_path).with_suffix('.segments.txt')
+    with open(list_path, 'w') as f:
+        for path in segment_paths:
+            escaped = str(Path(path).resolve()).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    cmd = [FFMPEG_BINARY, '-y', '-loglevel', 'error',
+           '-f', 'concat', '-safe', '0', '-i', str(list_path)]
+    if audio_path:
+        cmd += ['-i', str(audio_path), '-map', '0:v', '-map', '1:a', '-c:v', 'copy', '-c:a', 'aac']
+    else:
+        cmd += ['-c', 'copy']
+    if duration is not None:
+        # Audio longer than the video is cut, as in video_writer
+        cmd += ['-t', f'{duration:.3f}']
+    cmd += ['-movflags', '+faststart', str(output_path)]
+
+    try:
+        subprocess.run(cmd, check=True)
+    finally:
+        list_path.unlink(missing_ok=True)
+
+
+def render_segments(build_timeline, build_args, output_path, fps, audio_path=None,
+                    workers=None, preset='medium', backend=DEFAULT_BACKEND, profile=None, templates=False):
+    """
+    Render one video with its scenes encoded in parallel
+
+    Args:
+        build_timeline: Module-level function returning a Timeline
+        build_args: Arguments for build_timeline (must pickle)
+        output_path: Final .mp4 path
+        fps: Frames per second
+        audio_path: Optional narration to mux into the result
+        workers: Worker processes (default: one per core)
+        preset: x264 preset for every segment (must match for stream copy)
+        backend: Video writer used by the workers ('ffmpeg' or 'moviepy')
+        profile: Encoder profile for every segment (overrides `preset`)
+        templates: Reuse (and cache) the encoded segments of shared scenes
+    """
+    timeline = build_timeline(*build_args)
+    work_dir = Path(tempfile.mkdtemp(prefix='segments_'))
+    segment_paths, pending = _plan(timeline, fps, work_dir, templates, preset, backend, profile)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+
+    print(f"   {len(pending)} of {len(segment_paths)} segments on {workers} workers")
+    try:
+        if pending:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_render_segment, build_timeline, build_args, start, end, fps,
+                                segment_path, preset, backend, profile)
+                    for start, end, segment_path, _ in pending
+                ]
+                for future in futures:
+                    future.result()
+            for _, _, segment_path, template in pending:
+                if template is not None:
+                    _publish(segment_path, template)
+
+        concat_segments(segment_paths, output_path, audio_path, duration=timeline.duration)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def render_timeline(timeline, output_path, fps, audio_path=None, preset='medium',
+                    backend=DEFAULT_BACKEND, profile=None, threads=None):
+    """
+    Render one video in this process, reusing cached templates for its shared scenes
+
+    Only the scenes that aren't in the template cache are rendered; the
+    pieces are joined with stream copy like render_segments.
+    """
+    work_dir = Path(tempfile.mkdtemp(prefix='segments_'))
+    segment_paths, pending = _plan(timeline, fps, work_dir, True, preset, backend, profile)
+    try:
+        for start, end, segment_path, template in pending:
+            _encode(timeline, start, end, fps, segment_path, preset, backend, profile, threads)
+            if template is not None:
+                _publish(segment_path, template)
+
+        concat_segments(segment_paths, output_path, audio_path, duration=timeline.duration)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
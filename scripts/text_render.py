@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Cached Text Rendering for the Video Generators
+Rasterizes each label once into a tightly cropped RGBA sprite
+
+render_text() is memoized on (text, face, size, color, wrap width, shadow)
+with an LRU cache, so a label that appears on hundreds of frames - or in
+every video of a batch - is rasterized once. Sprites are cropped to the
+ink of the text and its shadow; the returned offset says where the
+sprite's top-left corner sits relative to the text anchor (horizontal
+centre of the block, top of the first line).
+
+Cached sprites are shared between callers and must not be modified.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+from PIL import Image, ImageDraw
+
+from fonts import get_font
+
+TEXT_CACHE_SIZE = 512
+
+TextSprite = namedtuple('TextSprite', ['image', 'offset'])
+
+
+def _rgba(color):
+    """Accept '#RRGGBB' or an RGB(A) tuple"""
+    if isinstance(color, str):
+        color = color.lstrip('#')
+        color = tuple(int(color[i:i+2], 16) for i in (0, 2, 4))
+    return tuple(color) + (255,) * (4 - len(color))
+
+
+def wrap_lines(text, font, max_width=None):
+    """Split text on newlines and, if max_width is set, word-wrap each line"""
+    if not max_width:
+        return text.split('\n')
+
+    lines = []
+    for paragraph in text.split('\n'):
+        current_line = []
+        for word in paragraph.split():
+            test_line = ' '.join(current_line + [word])
+            bbox = font.getbbox(test_line)
+            if bbox[2] - bbox[0] <= max_width:
+                current_line.append(word)
+            else:
+                if current_line:
+                    lines.append(' '.join(current_line))
+                current_line = [word]
+        if current_line:
+            lines.append(' '.join(current_line))
+    return lines
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(text, face, font_size, color, max_width=None,
+                shadow_offset=0, shadow_color=(0, 0, 0, 200), line_spacing=10):
+    """
+    Rasterize centred (optionally wrapped) text into a cropped sprite
+
+    Args:
+        text: Text to draw; '\\n' starts a new line
+        face: Font registry face ('regular', 'bold', ...)
+        font_size: Font size in pixels
+        color: Text color ('#RRGGBB' or RGB(A) tuple)
+        max_width: Wrap width in pixels, or None for no wrapping
+        shadow_offset: Drop shadow offset in pixels (0 for no shadow)
+        shadow_color: Drop shadow RGBA color
+        line_spacing: Extra pixels between lines
+
+    Returns:
+        TextSprite(image, offset)
+    """
+    font = get_font(face, font_size)
+    lines = wrap_lines(text, font, max_width)
+
+    # Lay lines out around x=0, first line's origin at y=0
+    placed = []
+    for i, line in enumerate(lines):
+        bbox = font.getbbox(line)
+        x = -((bbox[2] - bbox[0] + 1) // 2)
+        y = i * (font_size + line_spacing)
+        placed.append((x, y, line, bbox))
+
+    # Ink extent of every line (and its shadow)
+    left = min(x + bbox[0] for x, y, line, bbox in placed)
+    top = min(y + bbox[1] for x, y, line, bbox in placed)
+    right = max(x + bbox[2] for x, y, line, bbox in placed) + shadow_offset
+    bottom = max(y + bbox[3] for x, y, line, bbox in placed) + shadow_offset
+
+    img = Image.new('RGBA', (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    fill = _rgba(color)
+    for x, y, line, bbox in placed:
+        if shadow_offset:
+            draw.text((x - left + shadow_offset, y - top + shadow_offset), line,
+                      fill=shadow_color, font=font)
+        draw.text((x - left, y - top), line, fill=fill, font=font)
+
+    return TextSprite(img, (left, top))
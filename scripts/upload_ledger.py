@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Upload Ledger
+Remembers every video already on YouTube, so reruns only upload what's new
+
+The uploader used to rewrite the whole upload_log.json after every upload
+and had no memory between runs, so running it again uploaded every video
+in generated_videos/ a second time. The ledger is an append-only JSONL
+file with one line per upload:
+
+    {"slug": "1.0-round-vs-1.5-round", "hash": "...", "video_id": "...", "title": "...", "uploaded": "..."}
+
+`slug` is the video's file name without .mp4 and `hash` the sha256 of its
+contents. On load the lines are indexed by both. A file whose slug is in
+the ledger is skipped without reading it. A new file is hashed only when
+it is about to be uploaded, and is skipped if the same bytes already went
+up under another name.
+
+Each upload appends one line with a single write, so concurrent upload
+threads never rewrite the file. An old upload_log.json is imported the
+first time the ledger is created.
+
+Usage:
+    ledger = UploadLedger(VIDEO_DIR / 'upload_log.jsonl')
+    for video_path in ledger.pending(VIDEO_DIR.glob('*.mp4')):   # catalog priority order
+        ...
+        ledger.record(video_path.stem, file_digest(video_path), video_id, title)
+
+    python3 scripts/upload_ledger.py              # uploaded / pending counts
+    python3 scripts/upload_ledger.py --pending 20 # next 20 videos to upload
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from catalog import catalog
+from job_manifest import atomic_output
+from metadata_engine import video_slug
+
+PROJECT_ROOT = Path(__file__).parent.parent
+VIDEO_DIR = PROJECT_ROOT / 'generated_videos'
+LEDGER_FILE = VIDEO_DIR / 'upload_log.jsonl'
+
+# Generator prefix of a video file name: [final_|premium_]1.0-round-vs-1.5-round
+VIDEO_PREFIX = re.compile(r'^[a-z]+_')
+
+_catalog_rank = None
+
+
+def catalog_rank(slug):
+    """Position of a video's comparison in the site catalog (unknown comparisons sort last)"""
+    global _catalog_rank
+    if _catalog_rank is None:
+        _catalog_rank = {video_slug(*entry.comparison): rank for rank, entry in enumerate(catalog(limit=None))}
+    return _catalog_rank.get(VIDEO_PREFIX.sub('', slug), len(_catalog_rank))
+
+
+class UploadLedger:
+    """Append-only JSONL log of uploaded videos, indexed by slug and content hash"""
+
+    def __init__(self, path=LEDGER_FILE, legacy_log=None):
+        self.path = Path(path)
+        self.by_slug = {}
+        self.by_hash = {}
+        self._lock = threading.Lock()
+        legacy_log = self.path.with_name('upload_log.json') if legacy_log is None else Path(legacy_log)
+        if not self.path.exists() and legacy_log.exists():
+            self._import(legacy_log)
+        self.load()
+
+    def _import(self, legacy_log):
+        """Seed the ledger from an old upload_log.json (no content hashes there)"""
+        with open(legacy_log) as f:
+            uploads = json.load(f)
+        with atomic_output(self.path) as tmp_path:
+            with open(tmp_path, 'w') as f:
+                for upload in uploads:
+                    f.write(json.dumps({'slug': Path(upload['file']).stem, 'hash': None,
+                                        'video_id': upload['video_id'], 'title': upload['title'],
+                                        'uploaded': None}) + '\n')
+        print(f"Imported {len(uploads)} uploads from {legacy_log.name}")
+
+    def load(self):
+        """Read the ledger, skipping a torn last line from a crash"""
+        self.by_slug, self.by_hash = {}, {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._index(entry)
+        except FileNotFoundError:
+            pass
+
+    def _index(self, entry):
+        self.by_slug[entry['slug']] = entry
+        if entry.get('hash'):
+            self.by_hash.setdefault(entry['hash'], entry)
+
+    def __len__(self):
+        return len(self.by_slug)
+
+    def uploaded(self, slug):
+        """Ledger entry of an uploaded video, or None"""
+        return self.by_slug.get(slug)
+
+    def find_hash(self, content_hash):
+        """Ledger entry of a video with these exact contents, or None"""
+        return self.by_hash.get(content_hash)
+
+    def record(self, slug, content_hash, video_id, title, duplicate_of=None):
+        """Append a line for a finished upload (or a file skipped as a copy of `duplicate_of`)"""
+        entry = {
+            'slug': slug,
+            'hash': content_hash,
+            'video_id': video_id,
+            'title': title,
+            'uploaded': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        if duplicate_of:
+            entry['duplicate_of'] = duplicate_of
+        line = (json.dumps(entry) + '\n').encode()
+
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)  # one write per line, so concurrent uploads don't interleave
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._index(entry)
+        return entry
+
+    def pending(self, video_paths):
+        """Videos not uploaded yet, most important comparisons first"""
+        paths = [Path(p) for p in video_paths]
+        # Hidden files are renders still being written (see job_manifest.atomic_output)
+        paths = [p for p in paths if not p.name.startswith('.') and p.stem not in self.by_slug]
+        return sorted(paths, key=lambda p: (catalog_rank(p.stem), p.stem))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the upload ledger")
+    parser.add_argument('--ledger', type=Path, default=LEDGER_FILE, help="Ledger file (default: %(default)s)")
+    parser.add_argument('--pending', type=int, default=0, metavar='N',
+                        help="List the next N videos to upload, in priority order")
+    args = parser.parse_args()
+
+    ledger = UploadLedger(args.ledger)
+    pending = ledger.pending(args.ledger.parent.glob('*.mp4'))
+    print(f"Uploaded: {len(ledger)}  Pending: {len(pending)}")
+    for video_path in pending[:args.pending]:
+        print(f"   {video_path.stem}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Quota-Aware Upload Scheduler
+Uploads several videos at once, as fast as the YouTube API quota allows
+
+A YouTube project gets DAILY_QUOTA units per day, reset at midnight
+Pacific time, and every API call has a fixed cost (videos.insert is
+1,600 units, so the default quota covers 6 uploads a day). A fixed sleep
+between uploads neither keeps within that budget nor uses it well. Here
+the quota is a token bucket: each upload takes its units from the bucket
+before it starts, and the bucket refills to the full quota at every
+reset. Up to `workers` uploads run at once while units are left. When
+the bucket is empty the scheduler either stops (default) or, with
+`wait=True`, sleeps until the reset and carries on, so a long backlog
+drains at the full daily rate without idle gaps.
+
+Units used today are kept in a small JSON file, so several runs on the
+same day share one budget. If the API still answers quotaExceeded (quota
+spent by another tool on the same project), the bucket is emptied and the
+video goes back to the front of the queue.
+
+Usage:
+    bucket = QuotaBucket(path=VIDEO_DIR / 'quota_usage.json')
+    print(describe_plan(bucket, len(jobs)))
+    UploadScheduler(upload_one, bucket, workers=3, wait=True).run(jobs)
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from googleapiclient.errors import HttpError
+
+from batch_render import Progress
+from job_manifest import write_json
+
+# YouTube Data API v3 cost per call, in quota units
+QUOTA_COSTS = {
+    'videos.insert': 1600,
+    'videos.update': 50,
+    'thumbnails.set': 50,
+    'playlistItems.insert': 50,
+    'videos.list': 1,
+}
+
+# Default project quota; raise it with --quota after a quota increase
+DAILY_QUOTA = 10_000
+
+# The quota day starts at midnight Pacific time
+QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+
+_END = object()  # the job iterator is used up
+
+
+def quota_window(now=None):
+    """(quota day, epoch seconds of its reset) for the quota day containing `now`"""
+    local = datetime.fromtimestamp(time.time() if now is None else now, QUOTA_TIMEZONE)
+    reset = datetime.combine(local.date() + timedelta(days=1), datetime.min.time(), QUOTA_TIMEZONE)
+    return local.date().isoformat(), reset.timestamp()
+
+
+def is_quota_exceeded(error):
+    """Whether an API error says the project's daily quota is spent"""
+    if not isinstance(error, HttpError) or error.resp.status != 403:
+        return False
+    content = error.content.decode('utf-8', 'replace') if isinstance(error.content, bytes) else str(error.content)
+    return 'quotaExceeded' in content or 'dailyLimitExceeded' in content
+
+
+class QuotaBucket:
+    """Token bucket of API quota units, refilled to the daily quota at each reset"""
+
+    def __init__(self, daily_quota=DAILY_QUOTA, path=None):
+        self.daily_quota = daily_quota
+        self.path = Path(path) if path else None
+        self._cond = threading.Condition()
+        self.window, self.reset_at = quota_window()
+        self.used = self._load()
+
+    def _load(self):
+        """Units already used in the current quota day by earlier runs"""
+        if self.path is None:
+            return 0
+        try:
+            with open(self.path) as f:
+                usage = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+        return usage['used'] if usage.get('window') == self.window else 0
+
+    def _save(self):
+        if self.path is not None:
+            write_json(self.path, {'window': self.window, 'used': self.used})
+
+    def _refill(self):
+        window, reset_at = quota_window()
+        if window != self.window:
+            self.window, self.reset_at, self.used = window, reset_at, 0
+
+    @property
+    def tokens(self):
+        """Units left in the current quota day"""
+        with self._cond:
+            self._refill()
+            return max(0, self.daily_quota - self.used)
+
+    def acquire(self, units, wait=True):
+        """
+        Take `units` from the bucket
+
+        Blocks until the next reset when the bucket is short, unless
+        `wait` is False; returns whether the units were taken.
+        """
+        if units > self.daily_quota:
+            raise ValueError(f"a {units}-unit call never fits in a {self.daily_quota}-unit quota")
+        with self._cond:
+            while True:
+                self._refill()
+                if self.daily_quota - self.used >= units:
+                    self.used += units
+                    self._save()
+                    return True
+                if not wait:
+                    return False
+                # Wake up periodically in case the clock jumps (suspend, NTP)
+                self._cond.wait(min(max(self.reset_at - time.time(), 0) + 1, 600))
+
+    def exhaust(self):
+        """Treat the rest of today's quota as spent (the API said quotaExceeded)"""
+        with self._cond:
+            self._refill()
+            self.used = max(self.used, self.daily_quota)
+            self._save()
+
+    def plan(self, count, units):
+        """
+        When `count` calls of `units` each can run
+
+        Returns:
+            [(start time, calls)] - what fits now, then one entry per quota day
+        """
+        windows = []
+        available = self.tokens // units
+        start = time.time()
+        reset_at = self.reset_at
+        while count > 0:
+            calls = min(count, available)
+            if calls:
+                windows.append((start, calls))
+            count -= calls
+            start = reset_at
+            _, reset_at = quota_window(reset_at + 1)
+            available = self.daily_quota // units
+        return windows
+
+
+def describe_plan(bucket, count, units=QUOTA_COSTS['videos.insert']):
+    """One-paragraph summary of how the quota spreads `count` uploads"""
+    windows = bucket.plan(count, units)
+    if not windows:
+        return "Nothing to upload"
+    per_day = bucket.daily_quota // units
+    now_calls = windows[0][1] if windows[0][0] <= time.time() else 0
+    lines = [f"Quota: {bucket.tokens:,} of {bucket.daily_quota:,} units left today "
+             f"({units:,} per upload, {per_day} uploads per quota day)"]
+    lines.append(f"   {now_calls} uploads now, {count - now_calls} after the next resets")
+    if len(windows) > 1 or not now_calls:
+        finish = datetime.fromtimestamp(windows[-1][0], QUOTA_TIMEZONE)
+        lines.append(f"   Last batch starts {finish:%Y-%m-%d %H:%M %Z} ({len(windows)} quota day{'s' if len(windows) > 1 else ''})")
+    return '\n'.join(lines)
+
+
+class UploadScheduler:
+    """Runs uploads on a bounded thread pool, each one only once its quota is taken"""
+
+    def __init__(self, upload, bucket, workers=3, cost=QUOTA_COSTS['videos.insert'], wait=False, name=str):
+        self.upload = upload
+        self.bucket = bucket
+        self.workers = workers
+        self.cost = cost
+        self.wait = wait
+        self.name = name
+
+    def run(self, jobs, total=None):
+        """
+        Upload `jobs` in order
+
+        `jobs` can be a list or an iterator that blocks until the next job
+        is ready (a render pipeline; pass `total`, the number of jobs it
+        will yield). The iterator is read on its own thread, one job at a
+        time and only while an upload slot and quota are free, so finished
+        uploads are handled as they finish even while it blocks.
+        `upload(job)` runs on a worker thread and raises on failure.
+        Failed uploads are reported and skipped, except quotaExceeded,
+        which puts the job back and empties the bucket.
+
+        Returns:
+            (Progress, jobs left for a later run); for an iterator, only
+            the left jobs already taken from it
+        """
+        sized = hasattr(jobs, '__len__')
+        if total is None:
+            if not sized:
+                raise TypeError("run() needs total= when jobs is an iterator")
+            total = len(jobs)
+        progress = Progress(total)
+        jobs = iter(jobs)
+
+        # Everything the loop waits for arrives here: ('job', job or _END) or
+        # ('error', exception) from the puller, ('done', future) from a finished upload
+        events = queue.Queue()
+        wanted = threading.Semaphore(0)  # one release = take one more job
+        stopping = threading.Event()
+
+        def pull():
+            while True:
+                wanted.acquire()
+                if stopping.is_set():
+                    return
+                try:
+                    job = next(jobs, _END)
+                except Exception as e:
+                    events.put(('error', e))
+                    return
+                events.put(('job', job))
+                if job is _END:
+                    return
+
+        puller = threading.Thread(target=pull, daemon=True)
+        puller.start()
+
+        ready = deque()  # taken from `jobs` but not uploaded yet
+        running = {}  # future -> (job, start time)
+        pulling = False  # a job has been asked for and hasn't arrived
+        exhausted = False
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            def start(job):
+                future = pool.submit(self.upload, job)
+                running[future] = job, time.time()
+                future.add_done_callback(lambda f: events.put(('done', f)))
+
+            while True:
+                while ready and len(running) < self.workers and self.bucket.acquire(self.cost, wait=False):
+                    start(ready.popleft())
+
+                # Take the next job only when it could start right away
+                if (not exhausted and not pulling and not ready and len(running) < self.workers
+                        and self.bucket.tokens >= self.cost):
+                    wanted.release()
+                    pulling = True
+
+                if not running and not pulling:
+                    if not ready or not self.wait:
+                        break  # every job is done, or the quota is spent
+                    reset = datetime.fromtimestamp(self.bucket.reset_at, QUOTA_TIMEZONE)
+                    print(f"⏸ Daily quota spent - waiting for the reset at {reset:%Y-%m-%d %H:%M %Z}", flush=True)
+                    self.bucket.acquire(self.cost)
+                    start(ready.popleft())
+                    continue
+
+                kind, item = events.get()
+                if kind == 'error':
+                    raise item
+                if kind == 'job':
+                    pulling = False
+                    if item is _END:
+                        exhausted = True
+                    else:
+                        ready.append(item)
+                    continue
+
+                job, started = running.pop(item)
+                seconds = time.time() - started
+                try:
+                    item.result()
+                except Exception as e:
+                    if is_quota_exceeded(e):
+                        print(f"⏸ API reports the quota exceeded - {self.name(job)} goes back in the queue",
+                              flush=True)
+                        self.bucket.exhaust()
+                        ready.appendleft(job)
+                        continue
+                    progress.update(self.name(job), False, seconds, str(e))
+                else:
+                    progress.update(self.name(job), True, seconds)
+
+        stopping.set()
+        wanted.release()
+        puller.join()
+        progress.summary()
+        left = list(ready)
+        if sized and not exhausted:
+            left += list(jobs)
+        return progress, left
@@ -15,26 +15,35 @@ Requirements:
 """
 
 import os
-import json
+import threading
 import time
 from pathlib import Path
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 import pickle
 
+from job_manifest import file_digest
+from metadata_engine import MetadataStore
+from upload_ledger import UploadLedger
+from upload_scheduler import DAILY_QUOTA, QUOTA_COSTS, QuotaBucket, UploadScheduler, describe_plan
+from youtube_upload import ResumableUploader, UploadSessions
+
 # Configuration
 PROJECT_ROOT = Path(__file__).parent.parent
 VIDEO_DIR = PROJECT_ROOT / 'generated_videos'
 CLIENT_SECRETS_FILE = Path(__file__).parent / 'client_secrets.json'
 TOKEN_FILE = Path(__file__).parent / 'token.pickle'
+SESSIONS_FILE = VIDEO_DIR / 'upload_sessions.json'  # unfinished uploads, resumed on the next run
+QUOTA_FILE = VIDEO_DIR / 'quota_usage.json'  # API units used in the current quota day
+LEDGER_FILE = VIDEO_DIR / 'upload_log.jsonl'  # every video uploaded so far
+METADATA_FILE = VIDEO_DIR / 'metadata.jsonl'  # titles, descriptions and tags from the generators
 
 # YouTube API scopes
 SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
 
-def get_authenticated_service():
-    """Authenticate and return YouTube API service"""
+def get_credentials():
+    """Load (or obtain via the browser) OAuth credentials"""
     credentials = None
 
     # Load saved credentials if they exist
@@ -60,21 +69,22 @@ def get_authenticated_service():
         with open(TOKEN_FILE, 'wb') as token:
             pickle.dump(credentials, token)
 
-    return build('youtube', 'v3', credentials=credentials)
+    return credentials
 
-def upload_video(youtube, video_path, metadata):
-    """
-    Upload a single video to YouTube
+def build_service(credentials):
+    """YouTube API service; build one per thread, as the HTTP client isn't thread-safe"""
+    # YOUTUBE_API_ENDPOINT points the client at another server, e.g. a local fake for tests
+    endpoint = os.getenv('YOUTUBE_API_ENDPOINT')
+    return build('youtube', 'v3', credentials=credentials,
+                 client_options={'api_endpoint': endpoint} if endpoint else None)
 
-    Args:
-        youtube: Authenticated YouTube service
-        video_path: Path to video file
-        metadata: Dict with title, description, tags, category
+def get_authenticated_service():
+    """Authenticate and return YouTube API service"""
+    return build_service(get_credentials())
 
-    Returns:
-        Video ID if successful, None otherwise
-    """
-    body = {
+def video_body(metadata):
+    """videos.insert resource for a video's metadata"""
+    return {
         'snippet': {
             'title': metadata['title'],
             'description': metadata['description'],
@@ -88,24 +98,26 @@ def upload_video(youtube, video_path, metadata):
         }
     }
 
-    # Create media upload
-    media = MediaFileUpload(
-        video_path,
-        chunksize=-1,  # Upload in a single request
-        resumable=True,
-        mimetype='video/mp4'
-    )
-
-    # Execute upload
-    request = youtube.videos().insert(
-        part=','.join(body.keys()),
-        body=body,
-        media_body=media
-    )
+def upload_video(youtube, video_path, metadata):
+    """
+    Upload a single video to YouTube
+
+    Args:
+        youtube: Authenticated YouTube service
+        video_path: Path to video file
+        metadata: Dict with title, description, tags, category
+
+    Returns:
+        Video ID if successful, None otherwise
+    """
+    body = video_body(metadata)
+
+    # Chunked upload: retries network errors and resumes an interrupted session
+    uploader = ResumableUploader(youtube, UploadSessions(SESSIONS_FILE))
 
     try:
         print(f"Uploading: {metadata['title']}")
-        response = request.execute()
+        response = uploader.upload(video_path, body)
         video_id = response['id']
         print(f"✓ Uploaded! Video ID: {video_id}")
         print(f"  URL: https://youtube.com/watch?v={video_id}")
@@ -115,16 +127,39 @@ def upload_video(youtube, video_path, metadata):
         print(f"✗ Upload failed: {e}")
         return None
 
-def upload_all_videos(max_uploads=50, delay_seconds=10):
+def upload_job(credentials, ledger, metadata_store, quiet=False):
+    """
+    `upload(video_path)` for UploadScheduler worker threads
+
+    Each thread gets its own API client; metadata comes from
+    `metadata_store`, a finished upload is recorded in `ledger` and its
+    video ID returned. Errors propagate to the scheduler.
+    """
+    sessions = UploadSessions(SESSIONS_FILE)
+    local = threading.local()
+
+    def upload(video_path):
+        if not hasattr(local, 'uploader'):
+            local.uploader = ResumableUploader(build_service(credentials), sessions, quiet=quiet)
+        metadata = metadata_store.get(video_path.stem)
+        response = local.uploader.upload(video_path, video_body(metadata))
+        video_id = response['id']
+        ledger.record(video_path.stem, file_digest(video_path), video_id, metadata['title'])
+        return video_id
+
+    return upload
+
+def upload_all_videos(max_uploads=50, workers=3, daily_quota=DAILY_QUOTA, wait=False):
     """
     Upload all generated videos to YouTube
 
     Args:
         max_uploads: Maximum number of videos to upload (to avoid spam detection)
-        delay_seconds: Delay between uploads
+        workers: Uploads running at once
+        daily_quota: The project's YouTube API quota in units per day
+        wait: Keep running across quota resets until all uploads are done
     """
-    # Get YouTube service
-    youtube = get_authenticated_service()
+    credentials = get_credentials()
 
     # Find all videos
     video_files = sorted(VIDEO_DIR.glob('*.mp4'))
@@ -133,82 +168,97 @@ def upload_all_videos(max_uploads=50, delay_seconds=10):
         print("No videos found in", VIDEO_DIR)
         return
 
-    print(f"Found {len(video_files)} videos")
-    print(f"Will upload max {max_uploads} videos with {delay_seconds}s delay")
-    print("\nStarting in 5 seconds... (Ctrl+C to cancel)")
-    time.sleep(5)
-
-    uploaded_count = 0
-    uploaded_ids = []
-
-    for video_path in video_files[:max_uploads]:
-        # Load metadata
-        metadata_path = video_path.with_name(f"{video_path.stem}_metadata.json")
-
-        if not metadata_path.exists():
-            print(f"⊘ Skipping {video_path.name} - no metadata file")
+    # Videos not in the ledger yet, most important comparisons first
+    ledger = UploadLedger(LEDGER_FILE)
+    metadata_store = MetadataStore(METADATA_FILE)
+    pending = ledger.pending(video_files)
+
+    jobs = []
+    for video_path in pending:
+        if len(jobs) >= max_uploads:
+            break
+        if metadata_store.get(video_path.stem) is None:
+            print(f"⊘ Skipping {video_path.name} - no metadata")
             continue
+        content_hash = file_digest(video_path)
+        duplicate = ledger.find_hash(content_hash)
+        if duplicate:
+            # Same bytes already uploaded under another name; remember so it isn't hashed again
+            print(f"⊘ Skipping {video_path.name} - identical to {duplicate['slug']}")
+            ledger.record(video_path.stem, content_hash, duplicate['video_id'], duplicate['title'],
+                          duplicate_of=duplicate['slug'])
+            continue
+        jobs.append(video_path)
 
-        with open(metadata_path, 'r') as f:
-            metadata = json.load(f)
-
-        # Upload
-        video_id = upload_video(youtube, video_path, metadata)
-
-        if video_id:
-            uploaded_count += 1
-            uploaded_ids.append({
-                'video_id': video_id,
-                'file': video_path.name,
-                'title': metadata['title'],
-                'url': f'https://youtube.com/watch?v={video_id}'
-            })
+    print(f"Found {len(video_files)} videos, {len(ledger)} already uploaded, {len(pending)} pending")
+    if not jobs:
+        print("✓ Nothing new to upload")
+        return
 
-            # Save upload log
-            log_path = VIDEO_DIR / 'upload_log.json'
-            with open(log_path, 'w') as f:
-                json.dump(uploaded_ids, f, indent=2)
+    bucket = QuotaBucket(daily_quota, QUOTA_FILE)
+    print(f"Uploading {len(jobs)} on {workers} workers")
+    print(describe_plan(bucket, len(jobs)))
+    print("\nStarting in 5 seconds... (Ctrl+C to cancel)")
+    time.sleep(5)
 
-        # Delay between uploads (avoid spam detection)
-        if uploaded_count < max_uploads:
-            print(f"Waiting {delay_seconds}s before next upload...\n")
-            time.sleep(delay_seconds)
+    upload = upload_job(credentials, ledger, metadata_store, quiet=workers > 1)
+    scheduler = UploadScheduler(upload, bucket, workers=workers, wait=wait, name=lambda path: path.stem)
+    progress, left = scheduler.run(jobs)
 
-    print("\n" + "=" * 50)
-    print(f"✓ Upload complete! {uploaded_count} videos uploaded")
-    print(f"Upload log saved to: {VIDEO_DIR / 'upload_log.json'}")
+    print(f"✓ Upload complete! {progress.done - len(progress.failed)} videos uploaded")
+    if left:
+        print(f"⏸ {len(left)} videos left for the next quota day - run again after the reset, or use --wait")
+    print(f"Upload log saved to: {LEDGER_FILE}")
 
-def upload_single_video(video_name):
+def upload_single_video(video_name, daily_quota=DAILY_QUOTA):
     """Upload a single video by filename"""
     youtube = get_authenticated_service()
 
     video_path = VIDEO_DIR / f"{video_name}.mp4"
-    metadata_path = VIDEO_DIR / f"{video_name}_metadata.json"
+    metadata = MetadataStore(METADATA_FILE).get(video_name)
 
     if not video_path.exists():
         print(f"Video not found: {video_path}")
         return
 
-    if not metadata_path.exists():
-        print(f"Metadata not found: {metadata_path}")
+    if metadata is None:
+        print(f"Metadata not found for {video_name} in {METADATA_FILE}")
         return
 
-    with open(metadata_path, 'r') as f:
-        metadata = json.load(f)
+    ledger = UploadLedger(LEDGER_FILE)
+    entry = ledger.uploaded(video_name)
+    if entry:
+        print(f"Already uploaded: https://youtube.com/watch?v={entry['video_id']}")
+        return
+
+    if not QuotaBucket(daily_quota, QUOTA_FILE).acquire(QUOTA_COSTS['videos.insert'], wait=False):
+        print("⏸ Today's API quota is spent - try again after midnight Pacific time")
+        return
 
-    upload_video(youtube, video_path, metadata)
+    video_id = upload_video(youtube, video_path, metadata)
+    if video_id:
+        ledger.record(video_name, file_digest(video_path), video_id, metadata['title'])
 
 if __name__ == '__main__':
-    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Upload generated videos to YouTube")
+    parser.add_argument('video', nargs='?', help="Upload just this video (slug name)")
+    parser.add_argument('--max', type=int, default=50, help="Maximum videos per run (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=3, help="Uploads running at once (default: %(default)s)")
+    parser.add_argument('--quota', type=int, default=DAILY_QUOTA,
+                        help="Daily API quota in units (default: %(default)s)")
+    parser.add_argument('--wait', action='store_true',
+                        help="Wait for quota resets instead of stopping when the quota is spent")
+    args = parser.parse_args()
 
     print("YouTube Video Uploader")
     print("=" * 50)
 
-    if len(sys.argv) > 1:
+    if args.video:
         # Upload single video
-        video_name = sys.argv[1]
-        print(f"Uploading single video: {video_name}")
-        upload_single_video(video_name)
+        print(f"Uploading single video: {args.video}")
+        upload_single_video(args.video, daily_quota=args.quota)
     else:
         # Upload all videos
-        upload_all_videos(max_uploads=50, delay_seconds=10)
+        upload_all_videos(max_uploads=args.max, workers=args.workers, daily_quota=args.quota, wait=args.wait)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Video Writers for the Generators
+Encodes a make_frame(t) function with MoviePy or straight through ffmpeg
+
+`VideoClip.write_videofile` wraps every frame in MoviePy's clip machinery
+(get_frame, dtype checks, a `tobytes()` copy, the progress bar) before it
+reaches ffmpeg. The 'ffmpeg' backend skips all of that: frames are written
+as rawvideo from the timeline's own uint8 frame buffer into ffmpeg's stdin,
+with the same libx264 / aac settings the MoviePy path uses.
+
+Encoder profiles bundle the x264 settings for one kind of run - preset,
+CRF, tune, keyframe interval and pixel format:
+
+    draft    fast previews; small, soft and quick to encode
+    batch    the catalog run; tuned for flat graphics with long holds
+    archive  masters; high quality, full-resolution chroma (yuv444p)
+
+Without a profile the writer keeps x264's defaults at the given preset.
+
+Most frames repeat the one before (holds, settled scenes). Given the
+timeline's `frame_key`, the ffmpeg backend sends only frames whose key
+changed and stamps each with its real time, so the output is variable
+frame rate: a hold is one long frame for the encoder instead of 30 copies
+a second. The MoviePy backend ignores frame keys.
+
+Usage:
+    write_video(timeline.make_frame, timeline.duration, output_path, fps=30,
+                audio_path=narration_mp3, backend='ffmpeg', profile='batch')
+
+Compare the two backends on the pilot comparisons with
+`python3 scripts/benchmark_writer.py`, and the profiles with
+`python3 scripts/benchmark_profiles.py`.
+"""
+
+import subprocess
+from collections import namedtuple
+
+import numpy as np
+import proglog
+from moviepy import AudioFileClip, VideoClip
+from moviepy.config import FFMPEG_BINARY
+
+BACKENDS = ('ffmpeg', 'moviepy')
+DEFAULT_BACKEND = 'ffmpeg'
+
+# Frames always sent at the start and end of a deduplicated video. MP4 track
+# durations come from decode timestamps, which x264's B-frame reordering
+# shifts across a gap; a short constant-rate run at each end keeps them right.
+EDGE_FRAMES = 8
+
+# keyframe_interval is in seconds; crf/tune/keyframe_interval of None keep x264's default
+EncoderProfile = namedtuple('EncoderProfile', 'preset crf tune keyframe_interval pix_fmt')
+
+PROFILES = {
+    'draft': EncoderProfile('ultrafast', 30, 'stillimage', 10, 'yuv420p'),
+    'batch': EncoderProfile('veryfast', 23, 'animation', 10, 'yuv420p'),
+    'archive': EncoderProfile('slow', 16, 'animation', 2, 'yuv444p'),
+}
+
+
+def encoder_profile(profile=None, preset='medium'):
+    """EncoderProfile for a profile name; None means x264 defaults at `preset`"""
+    if profile is None:
+        return EncoderProfile(preset, None, None, None, 'yuv420p')
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown encoder profile: {profile} (expected one of {', '.join(PROFILES)})") from None
+
+
+def rate_control_args(settings, fps):
+    """x264 options beyond preset and pixel format for an EncoderProfile"""
+    args = []
+    if settings.crf is not None:
+        args += ['-crf', str(settings.crf)]
+    if settings.tune:
+        args += ['-tune', settings.tune]
+    if settings.keyframe_interval:
+        args += ['-g', str(round(settings.keyframe_interval * fps))]
+    return args
+
+
+class FFmpegPipeWriter:
+    """An ffmpeg process encoding RGB frames written to its stdin"""
+
+    def __init__(self, output_path, size, fps, audio_path=None, codec='libx264',
+                 audio_codec='aac', preset='medium', threads=None, duration=None, profile=None,
+                 timestamps=None):
+        self.output_path = output_path
+        self.width, self.height = size
+        # Frames that aren't already contiguous uint8 are converted into here
+        self._frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+        cmd = [FFMPEG_BINARY, '-y', '-loglevel', 'error',
+               '-f', 'rawvideo', '-vcodec', 'rawvideo',
+               '-s', f'{self.width}x{self.height}', '-pix_fmt', 'rgb24',
+               '-r', f'{fps:.02f}', '-an', '-i', '-']
+        if audio_path:
+            cmd += ['-i', str(audio_path), '-map', '0:v', '-map', '1:a', '-c:a', audio_codec]
+        if timestamps:
+            # Written frames are stamped with their frame number on the timeline; keep those times
+            # (a timescale of one tick per frame keeps the MP4 duration exact)
+            cmd += ['-vf', f"setpts='({timestamps})/(FRAME_RATE*TB)'", '-fps_mode', 'passthrough',
+                    '-video_track_timescale', str(int(fps))]
+        settings = encoder_profile(profile, preset)
+        cmd += ['-c:v', codec, '-preset', settings.preset, *rate_control_args(settings, fps),
+                '-pix_fmt', settings.pix_fmt]
+        if threads:
+            cmd += ['-threads', str(threads)]
+        if duration is not None:
+            # Audio longer than the video is cut, shorter audio leaves silence
+            cmd += ['-t', f'{duration:.3f}']
+        cmd += [str(output_path)]
+
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    def write(self, frame):
+        """Send one (height, width, 3) frame to the encoder"""
+        if frame.dtype != np.uint8 or not frame.flags.c_contiguous:
+            np.copyto(self._frame, frame, casting='unsafe')
+            frame = self._frame
+        try:
+            self.proc.stdin.write(memoryview(frame).cast('B'))
+        except BrokenPipeError:
+            self._fail()
+
+    def close(self):
+        """Flush the encoder and wait for ffmpeg to finish the file"""
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        if self.proc.wait() != 0:
+            self._fail()
+        self.proc.stderr.close()
+
+    def _fail(self):
+        self.proc.kill()
+        error = self.proc.stderr.read().decode(errors='replace').strip()
+        self.proc.wait()
+        raise IOError(f"ffmpeg failed writing {self.output_path}: {error}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.proc.kill()
+            self.proc.wait()
+        return False
+
+
+def changed_frames(frame_key, n_frames, fps):
+    """Indices of the frames whose key differs from the previous frame's, plus the first and last few"""
+    indices = []
+    last = object()
+    for i in range(n_frames):
+        key = frame_key(i / fps)
+        if key != last or i < EDGE_FRAMES or i >= n_frames - EDGE_FRAMES:
+            indices.append(i)
+            last = key
+    return indices
+
+
+def frame_timestamps(indices):
+    """setpts expression mapping the Nth frame written to its frame number, indices[N]"""
+    # Frames are written back to back; each skipped run shifts every later frame
+    terms = ['N']
+    for n in range(1, len(indices)):
+        skipped = indices[n] - indices[n - 1] - 1
+        if skipped:
+            terms.append(f'gte(N,{n})*{skipped}')
+    return '+'.join(terms)
+
+
+def write_ffmpeg(make_frame, duration, output_path, fps, audio_path=None,
+                 codec='libx264', audio_codec='aac', preset='medium', threads=None, logger='bar',
+                 profile=None, frame_key=None):
+    """Encode frames with ffmpeg directly, no MoviePy clips involved"""
+    # Durations are sums of whole-frame scene lengths; int() would drop the last frame to float error
+    n_frames = round(duration * fps)
+    indices = list(range(n_frames))
+    timestamps = None
+    if frame_key is not None and float(fps).is_integer():
+        indices = changed_frames(frame_key, n_frames, fps)
+        if len(indices) < n_frames:
+            timestamps = frame_timestamps(indices)
+
+    first = make_frame(0)
+    height, width = first.shape[:2]
+
+    logger = proglog.default_bar_logger(logger)
+    with FFmpegPipeWriter(output_path, (width, height), fps, audio_path, codec,
+                          audio_codec, preset, threads, duration=n_frames / fps, profile=profile,
+                          timestamps=timestamps) as writer:
+        writer.write(first)
+        for i in logger.iter_bar(frame_index=indices[1:]):
+            writer.write(make_frame(i / fps))
+
+
+def write_moviepy(make_frame, duration, output_path, fps, audio_path=None,
+                  codec='libx264', audio_codec='aac', preset='medium', threads=None, logger='bar',
+                  profile=None, frame_key=None):
+    """Encode frames through VideoClip.write_videofile (every frame; `frame_key` is ignored)"""
+    settings = encoder_profile(profile, preset)
+    clip = VideoClip(make_frame, duration=duration)
+    if audio_path:
+        clip = clip.with_audio(AudioFileClip(str(audio_path)))
+    clip.write_videofile(
+        str(output_path),
+        fps=fps,
+        codec=codec,
+        audio=bool(audio_path),
+        audio_codec=audio_codec if audio_path else None,
+        preset=settings.preset,
+        threads=threads,
+        ffmpeg_params=rate_control_args(settings, fps) or None,
+        pixel_format=settings.pix_fmt,
+        logger=logger
+    )
+
+
+def write_video(make_frame, duration, output_path, fps, audio_path=None, backend=DEFAULT_BACKEND,
+                codec='libx264', audio_codec='aac', preset='medium', threads=None, logger='bar',
+                profile=None, frame_key=None):
+    """
+    Encode make_frame(t) over [0, duration) to output_path
+
+    Args:
+        make_frame: Function returning an RGB uint8 frame for time t
+        duration: Length in seconds
+        output_path: Destination .mp4
+        fps: Frames per second
+        audio_path: Optional audio file muxed in as `audio_codec`
+        backend: 'ffmpeg' (rawvideo pipe) or 'moviepy' (write_videofile)
+        preset: x264 preset, when no profile is given
+        threads: x264 threads (None lets ffmpeg decide)
+        logger: 'bar' for a progress bar, None for silence
+        profile: Encoder profile name from PROFILES (overrides `preset`)
+        frame_key: Optional key(t) function (Timeline.frame_key); frames with the
+            same key as the previous one are skipped and the output is variable frame rate
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    writer = write_ffmpeg if backend == 'ffmpeg' else write_moviepy
+    writer(make_frame, duration, output_path, fps, audio_path=audio_path, codec=codec,
+           audio_codec=audio_codec, preset=preset, threads=threads, logger=logger, profile=profile,
+           frame_key=frame_key)
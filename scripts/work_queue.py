@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Shared Render Work Queue
+Lets several render nodes pull comparisons from one SQLite file
+
+`--shard i/N` splits a batch statically: every node takes every N-th
+comparison, which is enough when the nodes are equally fast and nothing
+crashes. The queue splits it dynamically instead. Each node claims the
+next job by priority and holds a lease on it. The lease is renewed by
+heartbeats while the job renders. If a node dies, its leases expire and
+another node reclaims the jobs. A failing job is retried on another
+claim, up to `max_attempts` times in total.
+
+Every node seeds the queue with the same job list (existing keys are left
+alone), so any node can be started first. Keys include the job's input
+hash, so changing the profile or the template queues fresh jobs rather
+than reusing finished ones.
+
+The database can live on a local disk (several processes on one machine)
+or on a shared filesystem whose locking works with SQLite.
+
+Usage:
+    queue = WorkQueue('/shared/render_queue.sqlite')
+    queue.add((key, comparison) for ...)
+    run_queue(render_job, queue, workers=8)      # see batch_render.py
+
+    python3 scripts/work_queue.py /shared/render_queue.sqlite           # status
+    python3 scripts/work_queue.py /shared/render_queue.sqlite --retry   # requeue failed jobs
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import time
+
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, seq);
+"""
+
+
+def node_name():
+    """Identifies this process in the queue, e.g. render-2:4211"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """Lease-based job queue in a SQLite file"""
+
+    def __init__(self, path, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS, node=None):
+        self.path = str(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.node = node or node_name()
+        # Autocommit; writes that must be atomic take BEGIN IMMEDIATE explicitly
+        self.db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _write(self, sql, params=()):
+        """Run one write statement in its own immediate transaction; returns the row count"""
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            count = self.db.execute(sql, params).rowcount
+            self.db.execute('COMMIT')
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        return count
+
+    def add(self, jobs):
+        """Queue (key, job) pairs in priority order; keys already queued are kept as they are"""
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            seq = self.db.execute('SELECT COALESCE(MAX(seq), -1) + 1 FROM jobs').fetchone()[0]
+            added = 0
+            for key, job in jobs:
+                added += self.db.execute('INSERT OR IGNORE INTO jobs (key, seq, payload, updated) VALUES (?, ?, ?, ?)',
+                                         (key, seq, json.dumps(job), time.time())).rowcount
+                seq += 1
+            self.db.execute('COMMIT')
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        return added
+
+    def claim(self):
+        """Lease the next pending (or expired) job; returns (key, job) or None"""
+        now = time.time()
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            # A job whose node keeps dying with it doesn't get reclaimed forever
+            self.db.execute(
+                "UPDATE jobs SET state = 'failed', error = 'lease expired on the last attempt', updated = ? "
+                "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts))
+            row = self.db.execute(
+                "SELECT key, payload FROM jobs "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+                "ORDER BY seq LIMIT 1", (now,)).fetchone()
+            if row is not None:
+                self.db.execute(
+                    "UPDATE jobs SET state = 'leased', owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated = ? WHERE key = ?",
+                    (self.node, now + self.lease_seconds, now, row[0]))
+            self.db.execute('COMMIT')
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def heartbeat(self, keys):
+        """Extend this node's leases on `keys`; returns how many are still held"""
+        keys = list(keys)
+        if not keys:
+            return 0
+        now = time.time()
+        marks = ','.join('?' * len(keys))
+        return self._write(
+            f"UPDATE jobs SET lease_expires = ?, updated = ? "
+            f"WHERE state = 'leased' AND owner = ? AND key IN ({marks})",
+            (now + self.lease_seconds, now, self.node, *keys))
+
+    def complete(self, key):
+        """Mark a leased job done"""
+        self._write("UPDATE jobs SET state = 'done', lease_expires = NULL, error = NULL, updated = ? "
+                    "WHERE key = ?", (time.time(), key))
+
+    def fail(self, key, error):
+        """Give a failed job back to the queue, or mark it failed once it has used its attempts"""
+        self._write(
+            "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "owner = NULL, lease_expires = NULL, error = ?, updated = ? "
+            "WHERE key = ? AND state = 'leased' AND owner = ?",  # not if another node has reclaimed it
+            (self.max_attempts, str(error), time.time(), key, self.node))
+
+    def retry_failed(self):
+        """Requeue every failed job with fresh attempts; returns how many"""
+        return self._write("UPDATE jobs SET state = 'pending', attempts = 0, updated = ? WHERE state = 'failed'",
+                           (time.time(),))
+
+    def next_expiry(self):
+        """Earliest lease expiry among jobs other nodes hold, or None if there are none"""
+        row = self.db.execute("SELECT MIN(lease_expires) FROM jobs WHERE state = 'leased' AND owner != ?",
+                              (self.node,)).fetchone()
+        return row[0]
+
+    def counts(self):
+        """Number of jobs per state"""
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        for state, count in self.db.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state'):
+            counts[state] = count
+        return counts
+
+    def remaining(self):
+        """Jobs not yet finished (pending or leased)"""
+        counts = self.counts()
+        return counts['pending'] + counts['leased']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or repair a render work queue")
+    parser.add_argument('path', help="Queue database")
+    parser.add_argument('--retry', action='store_true', help="Requeue failed jobs")
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.path)
+    if args.retry:
+        print(f"Requeued {queue.retry_failed()} failed jobs")
+    counts = queue.counts()
+    print(' '.join(f"{state}: {count}" for state, count in counts.items()))
+    for key, owner, expires in queue.db.execute(
+            "SELECT key, owner, lease_expires FROM jobs WHERE state = 'leased' ORDER BY seq"):
+        print(f"   leased {key} by {owner} ({expires - time.time():+.0f}s)")
+    for key, attempts, error in queue.db.execute(
+            "SELECT key, attempts, error FROM jobs WHERE state = 'failed' ORDER BY seq"):
+        print(f"   ✗ {key} after {attempts} attempts: {error}")
+    queue.close()
+
+
+if __name__ == '__main__':
+    main()
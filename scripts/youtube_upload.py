@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Resumable YouTube Upload Engine
+Uploads videos in fixed-size chunks that survive network errors and restarts
+
+A single `request.execute()` sends the whole file in one request, so a
+network blip loses the entire upload. Here the file goes up in CHUNK_SIZE
+pieces through `next_chunk()`. A 5xx response or a dropped connection is
+retried with exponential backoff and jitter. Before each retry the server
+is asked how many bytes it actually has (an empty PUT with
+`Content-Range: bytes */size`, as the resumable protocol specifies), so
+no chunk is sent twice or skipped.
+
+YouTube's resumable session URI is saved in upload_sessions.json as soon
+as the upload starts. A restarted process picks the session up and
+continues from the server's offset instead of starting over. A session is
+only reused for the same file (same size and modification time), and is
+dropped once the upload completes or the server has forgotten it.
+
+Set YOUTUBE_API_ENDPOINT to point the uploader at another server (e.g. a
+local fake upload endpoint for tests).
+
+Usage:
+    uploader = ResumableUploader(youtube, UploadSessions(VIDEO_DIR / 'upload_sessions.json'))
+    video = uploader.upload(video_path, body)   # the inserted video resource
+"""
+
+import http.client
+import json
+import random
+import threading
+import time
+from pathlib import Path
+
+import httplib2
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
+
+from job_manifest import write_json
+
+# Upload chunk size; must be a multiple of 256KB
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Server errors worth retrying; anything else (auth, quota, bad metadata) fails straight away
+RETRY_STATUS = {500, 502, 503, 504}
+RETRY_EXCEPTIONS = (httplib2.HttpLib2Error, http.client.HTTPException, OSError)
+
+# YouTube keeps a resumable session for about a week
+SESSION_MAX_AGE = 6 * 24 * 3600
+
+
+class _FileChunks(MediaFileUpload):
+    """MediaFileUpload that hands each chunk over as bytes rather than a stream slice
+
+    httplib2 silently resends a request once when the server drops the
+    connection; a stream slice is already used up by then, so the resend
+    would carry an empty body and hang until the socket times out.
+    """
+
+    def has_stream(self):
+        return False
+
+
+def is_transient(error):
+    """Whether an upload error is worth retrying"""
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRY_STATUS
+    return isinstance(error, RETRY_EXCEPTIONS)
+
+
+class UploadSessions:
+    """Resumable session URIs by video file, kept in a JSON file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()  # uploads may run on several threads
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _fingerprint(video_path):
+        stat = Path(video_path).stat()
+        return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def get(self, video_path):
+        """Session URI of an unfinished upload of this exact file, or None"""
+        with self._lock:
+            session = self._load().get(Path(video_path).name)
+        if session is None or time.time() - session['started'] > SESSION_MAX_AGE:
+            return None
+        if {'size': session['size'], 'mtime': session['mtime']} != self._fingerprint(video_path):
+            return None  # the file was re-rendered since
+        return session['uri']
+
+    def save(self, video_path, uri):
+        """Remember the session URI of an upload that has started"""
+        with self._lock:
+            sessions = self._load()
+            sessions[Path(video_path).name] = {'uri': uri, 'started': time.time(),
+                                               **self._fingerprint(video_path)}
+            write_json(self.path, sessions)
+
+    def forget(self, video_path):
+        """Drop the session of a finished (or abandoned) upload"""
+        with self._lock:
+            sessions = self._load()
+            if sessions.pop(Path(video_path).name, None) is not None:
+                write_json(self.path, sessions)
+
+
+class ResumableUploader:
+    """Chunked, retried, resumable videos.insert uploads"""
+
+    def __init__(self, youtube, sessions=None, chunk_size=CHUNK_SIZE, retries=8, backoff=1.0, quiet=False):
+        self.youtube = youtube
+        self.sessions = sessions
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.backoff = backoff
+        self.quiet = quiet
+        self._saved = {}  # video path -> session URI already in `sessions`
+
+    def _request(self, video_path, body):
+        media = _FileChunks(str(video_path), chunksize=self.chunk_size, resumable=True,
+                             mimetype='video/mp4')
+        return self.youtube.videos().insert(part=','.join(body.keys()), body=body, media_body=media)
+
+    def upload(self, video_path, body):
+        """
+        Upload one video, resuming an earlier session for the same file if there is one
+
+        Args:
+            video_path: .mp4 to upload
+            body: videos.insert resource (snippet, status)
+
+        Returns:
+            The inserted video resource (its 'id' is the video ID)
+
+        Raises:
+            HttpError for non-retryable responses, or the last error once retries run out
+        """
+        request = self._request(video_path, body)
+        size = Path(video_path).stat().st_size
+        uri = self.sessions.get(video_path) if self.sessions else None
+        self._saved[video_path] = uri
+        resync = False  # ask the server for its offset before the next chunk
+        if uri:
+            # Ask the server where the earlier session got to before sending anything
+            request.resumable_uri = uri
+            resync = True
+            if not self.quiet:
+                print("   ↻ Resuming earlier upload session")
+
+        failures = 0
+        restarted = False
+        last_bytes, last_time = None, time.time()
+        while True:
+            try:
+                if resync:
+                    request.resumable_progress, response = self._server_offset(request, size)
+                    status = None
+                    resync = False
+                else:
+                    status, response = request.next_chunk()
+            except Exception as e:
+                self._remember(video_path, request)
+                expired = isinstance(e, HttpError) and e.resp.status in (404, 410)
+                if expired and request.resumable_uri and not restarted:
+                    # The server no longer knows the session; start a new one
+                    if not self.quiet:
+                        print("   ↻ Upload session expired, starting over")
+                    if self.sessions:
+                        self.sessions.forget(video_path)
+                    request = self._request(video_path, body)
+                    restarted = True
+                    resync = False
+                    continue
+                if failures >= self.retries or not is_transient(e):
+                    raise
+                delay = min(64.0, self.backoff * 2 ** failures) * random.uniform(0.5, 1.5)
+                failures += 1
+                reason = f"HTTP {e.resp.status}" if isinstance(e, HttpError) else type(e).__name__
+                print(f"   ⚠ Upload {reason} - retry {failures}/{self.retries} in {delay:.1f}s", flush=True)
+                resync = request.resumable_uri is not None  # the session may have more (or less) than we sent
+                time.sleep(delay)
+                continue
+
+            failures = 0
+            if response is not None:
+                if self.sessions:
+                    self.sessions.forget(video_path)
+                self._saved.pop(video_path, None)
+                return response
+            self._remember(video_path, request)
+
+            if status is not None and not self.quiet:
+                now = time.time()
+                rate = 0.0 if last_bytes is None else (status.resumable_progress - last_bytes) / max(1e-6, now - last_time)
+                last_bytes, last_time = status.resumable_progress, now
+                print(f"   ▸ {status.progress() * 100:5.1f}% of {size / 1024 / 1024:.1f}MB "
+                      f"({rate / 1024 / 1024:.1f}MB/s)", flush=True)
+
+    @staticmethod
+    def _server_offset(request, size):
+        """
+        Ask the server how many bytes of the upload it has
+
+        Returns:
+            (bytes received, None), or (size, video resource) if the upload already finished
+
+        Raises:
+            HttpError for any other response (404/410: the session is gone)
+        """
+        headers = {'Content-Range': f'bytes */{size}', 'Content-Length': '0'}
+        resp, content = request.http.request(request.resumable_uri, 'PUT', headers=headers)
+        if resp.status in (200, 201):
+            return size, request.postproc(resp, content)
+        if resp.status == 308:
+            received = resp.get('range')  # 'bytes=0-N', absent when nothing arrived yet
+            return (int(received.rsplit('-', 1)[1]) + 1 if received else 0), None
+        raise HttpError(resp, content, uri=request.resumable_uri)
+
+    def _remember(self, video_path, request):
+        """Save the session URI once the server has issued one"""
+        if self.sessions and request.resumable_uri and request.resumable_uri != self._saved.get(video_path):
+            self.sessions.save(video_path, request.resumable_uri)
+            self._saved[video_path] = request.resumable_uri